@@ -15,20 +15,33 @@ ALL_KEYS = ['1', '2', '3', '4']  # NL: welke toetsen meedoen voor alles-uit/aan
 BAUD = 115200
 IDLE_MS = 2000        # NL: na zoveel ms zonder data → animatie tonen
 ANIM_MS = 400         # NL: animatiesnelheid
+LOOP_MS = 5           # NL: korte pauze; per lus wordt toch alles gelezen wat klaarstaat
+RX_SIZE = 32          # NL: vaste ontvangstbuffer → geen nieuw geheugen per ontvangen byte
 
 # ---------- Init ----------
 uart.init(baudrate=BAUD)
 
 # ❗ FIX: GEEN set(...) gebruiken — MicroBitTouchPin is niet hashable.
-# NL: laag zetten van alle pins; dubbele writes zijn onschadelijk
-for p in PIN_MAP.values():
-    try:
-        p.write_digital(0)
-    except:
-        pass
+# NL: laag zetten van alle pins en onthouden wat er op elke pin staat (sleutel = '1'..'4')
+pin_state = {}
+for k in ALL_KEYS:
+    p = PIN_MAP.get(k)
+    if p:
+        try:
+            p.write_digital(0)
+        except:
+            pass
+    pin_state[k] = 0
 
+rx = bytearray(RX_SIZE)
+# NL: optioneel volgnummer voor latentiemetingen: '#<seq>:<code>' → antwoord '@<seq>:<code>'
+in_seq = False        # NL: bezig met de cijfers na '#'
+seq_acc = 0
+seq_next = None       # NL: volgnummer voor de eerstvolgende code
+in_ctrl = False       # NL: vorig teken was '!' (binaire modus van de Arduino; hier niet ondersteund)
+shown = None          # NL: wat er op het display staat (None = animatie of onbekend)
 last_rx_ms = running_time()
-anim_idx = 0
+anim_idx = -1
 anim = [
     Image("00000:00900:00900:00000:00900"),
     Image("00000:00000:00900:00000:00900"),
@@ -36,22 +49,30 @@ anim = [
     Image("00000:00000:00000:00000:00000"),
 ]
 
+def write_pin(key, value):
+    """NL: pin enkel schrijven als de waarde echt verandert"""
+    if pin_state.get(key) != value:
+        p = PIN_MAP.get(key)
+        if p:
+            p.write_digital(value)
+        pin_state[key] = value
+
 def all_off():
     """NL: alle LED-uitgangen uitzetten"""
     for k in ALL_KEYS:
-        p = PIN_MAP.get(k)
-        if p:
-            p.write_digital(0)
+        write_pin(k, 0)
 
 def set_one(key):
     """NL: alleen de LED van 'key' aan, rest uit"""
     for k in ALL_KEYS:
-        p = PIN_MAP.get(k)
-        if p:
-            p.write_digital(1 if k == key else 0)
+        write_pin(k, 1 if k == key else 0)
 
 def show_digit_or_icon(key):
-    """NL: matrix-feedback tonen zonder scroll-blokkering"""
+    """NL: matrix-feedback tonen zonder scroll-blokkering (niets doen als het er al staat)"""
+    global shown
+    if key == shown:
+        return
+    shown = key
     if key in '12345':
         display.show(key)
     elif key == 'X':
@@ -61,15 +82,14 @@ def show_digit_or_icon(key):
 
 def handle_code(code):
     """NL: binnengekomen code verwerken"""
-    global last_rx_ms
+    global last_rx_ms, anim_idx
     last_rx_ms = running_time()
+    anim_idx = -1
 
     if code == 'X':
         # NL: “mens/human” → alles aan
         for k in ALL_KEYS:
-            p = PIN_MAP.get(k)
-            if p:
-                p.write_digital(1)
+            write_pin(k, 1)
         show_digit_or_icon('X')
         return
 
@@ -79,35 +99,77 @@ def handle_code(code):
     else:
         # NL: onbekend → alles uit
         all_off()
-        display.clear()
+        show_digit_or_icon('0')
 
-def read_line():
-    """NL: lees een volledige regel (zonder \r\n) of None"""
-    line = uart.readline()
-    if not line:
-        return None
-    # micro:bit MicroPython varianten: decode of str(...)
-    try:
-        s = line.decode('utf-8', 'ignore').strip()
-    except:
-        try:
-            s = str(line, 'utf-8').strip()
-        except:
-            return None
-    return s if s else None
+def read_newest_code():
+    """
+    NL: lees ALLES wat klaarstaat (in stukken via de vaste buffer) en geef enkel
+    de nieuwste code terug als (code, volgnummer) – of (None, None). Oudere
+    codes zijn al achterhaald: die tonen zou de LED's alleen maar laten
+    achterlopen. Elk teken is een code ('1'..'4', 'X', ...), met of zonder
+    newline erachter; \r, \n en spaties worden overgeslagen. Een code met
+    '#<seq>:' ervoor krijgt dat volgnummer mee (anders None). '!B'/'!T' en
+    bytes vanaf 0x80 (binaire modus, enkel Arduino) worden genegeerd: zonder
+    antwoord blijft de host gewoon tekst sturen.
+    """
+    global in_seq, seq_acc, seq_next, in_ctrl
+    newest = -1
+    newest_seq = None
+    while uart.any():
+        n = uart.readinto(rx)
+        if not n:
+            break
+        for i in range(n):
+            b = rx[i]
+            if in_ctrl or b >= 128:
+                in_ctrl = False
+                continue
+            if b == 33:                      # NL: '!' → stuurteken, volgende byte negeren
+                in_ctrl = True
+                continue
+            if b == 35:                      # NL: '#' → volgnummer begint
+                in_seq = True
+                seq_acc = 0
+                seq_next = None
+                continue
+            if in_seq:
+                if 48 <= b <= 57:            # NL: cijfer
+                    seq_acc = seq_acc * 10 + b - 48
+                    continue
+                in_seq = False
+                if b == 58:                  # NL: ':' → nu volgt de code
+                    seq_next = seq_acc
+                    continue
+            if b > 32:
+                newest = b
+                newest_seq = seq_next
+                seq_next = None
+    if newest < 0:
+        return None, None
+    return chr(newest), newest_seq
+
+def idle_animation(now):
+    """NL: frame volgt uit de verstreken tijd, niet uit het aantal lussen"""
+    global anim_idx, shown
+    idle = now - last_rx_ms - IDLE_MS
+    if idle < 0:
+        return
+    frame = (idle // ANIM_MS) % len(anim)
+    if frame != anim_idx:
+        anim_idx = frame
+        display.show(anim[frame])
+        shown = None
 
 # ---------- Main loop ----------
 while True:
-    s = read_line()
-    if s:
-        # NL: verwacht 1 teken + newline uit de browser ('1'..'4' of 'X')
-        code = s[0]
+    code, seq = read_newest_code()
+    if code is not None:
         handle_code(code)
+        if seq is not None:
+            # NL: bevestiging ná het schakelen (enkel voor de nieuwste code)
+            uart.write('@' + str(seq) + ':' + code + '\n')
+    else:
+        # NL: eenvoudige idle-animatie als er even geen data is
+        idle_animation(running_time())
 
-    # NL: eenvoudige idle-animatie als er even geen data is
-    if running_time() - last_rx_ms > IDLE_MS:
-        if running_time() % ANIM_MS < 50:
-            display.show(anim[anim_idx])
-            anim_idx = (anim_idx + 1) % len(anim)
-
-    sleep(10)  # NL: CPU vriendelijk
+    sleep(LOOP_MS)  # NL: CPU vriendelijk
@@ -10,6 +10,35 @@ const uint8_t N = sizeof(PINS) / sizeof(PINS[0]);
 
 char currentState = '0';
 
+// ===== NL: optioneel volgnummer voor latentiemetingen =====
+// NL: '#<seq>:<code>' (bv. "#42:3\n") → na het schakelen antwoordt de Arduino "@42:3".
+// NL: gewone codes ('0'..'9', 'X') blijven werken zoals altijd (geen antwoord met '@').
+bool inSeq = false;    // NL: bezig met de cijfers na '#'
+bool haveSeq = false;  // NL: de volgende code hoort bij 'seq'
+uint16_t seq = 0;
+
+void ack(char c) {
+  if (!haveSeq) return;
+  haveSeq = false;
+  Serial.print('@');
+  Serial.print(seq);
+  Serial.print(':');
+  Serial.println(c);
+}
+
+// ===== NL: stille binaire modus (onderhandeld door de host) =====
+// NL: '!B' → binaire modus: 1 byte per opdracht, 1 byte bevestiging, geen 🔔-logging.
+// NL: '!T' → terug naar tekstmodus. De Arduino antwoordt met de regel "!B" of "!T",
+// NL: zo weet de host dat deze firmware het kent (oudere firmware zwijgt → tekst blijven).
+// NL: opdrachtbyte: 0x80 = alles uit, 0x80 + n = slot n exclusief, 0xC0 = alles aan.
+// NL: bevestiging: hetzelfde byte terug, of 0xFE als het slot niet bestaat.
+// NL: tekstcodes ('0'..'9', 'X') werken in beide modi; in binaire modus zonder logging.
+const uint8_t CMD_OFF = 0x80;
+const uint8_t CMD_ALL_ON = 0xC0;
+const uint8_t NAK = 0xFE;
+bool quiet = false;    // NL: binaire modus actief → geen leesbare logging
+bool inCtrl = false;   // NL: vorig teken was '!'
+
 void allOff() {
   for (uint8_t i = 0; i < N; i++) digitalWrite(PINS[i], LOW);
 }
@@ -25,6 +54,23 @@ void setExclusive(uint8_t oneBased) {
   }
 }
 
+void handleBinary(uint8_t b) {
+  if (b == CMD_OFF) {
+    currentState = '0';
+    allOff();
+  } else if (b == CMD_ALL_ON) {
+    currentState = 'X';
+    allOn();
+  } else if (b > CMD_OFF && b - CMD_OFF <= N) {
+    currentState = (char)('0' + (b - CMD_OFF));
+    setExclusive(b - CMD_OFF);
+  } else {
+    Serial.write(NAK);
+    return;
+  }
+  Serial.write(b); // NL: bevestiging ná het schakelen
+}
+
 void setup() {
   Serial.begin(115200);
   for (uint8_t i = 0; i < N; i++) pinMode(PINS[i], OUTPUT);
@@ -37,31 +83,75 @@ void setup() {
 void loop() {
   // NL: Lees alle beschikbare bytes en verwerk alleen nuttige tekens
   while (Serial.available() > 0) {
-    char c = Serial.read();
-    if (c == '\r' || c == '\n') continue; // negeer regeleinde
+    uint8_t b = (uint8_t)Serial.read();
+    if (b >= CMD_OFF) {              // NL: binaire opdracht (in tekst komen zulke bytes niet voor)
+      handleBinary(b);
+      continue;
+    }
+    char c = (char)b;
+    if (inCtrl) {                    // NL: '!B' / '!T' → modus wisselen
+      inCtrl = false;
+      if (c == 'B' || c == 'T') {
+        quiet = (c == 'B');
+        Serial.println(quiet ? F("!B") : F("!T"));
+      }
+      continue;
+    }
+    if (c == '!') {
+      inCtrl = true;
+      continue;
+    }
+    if (c == '\r' || c == '\n') { // negeer regeleinde
+      inSeq = false;
+      haveSeq = false;
+      continue;
+    }
+    if (c == '#') {                  // NL: begin van een volgnummer
+      inSeq = true;
+      haveSeq = false;
+      seq = 0;
+      continue;
+    }
+    if (inSeq) {
+      if (c >= '0' && c <= '9') {
+        seq = seq * 10 + (uint16_t)(c - '0');
+        continue;
+      }
+      inSeq = false;
+      haveSeq = (c == ':');
+      if (haveSeq) continue;
+    }
 
     if (c == '0') {
       currentState = c;
-      Serial.println(F("🔔 (Arduino) Code '0' → alles uit."));
+      if (!quiet) Serial.println(F("🔔 (Arduino) Code '0' → alles uit."));
       allOff();
+      ack(c);
     } else if (c == 'X' || c == 'x' || c == '9') {
       currentState = 'X';
-      Serial.println(F("🔔 (Arduino) Code 'X/9' → alles aan."));
+      if (!quiet) Serial.println(F("🔔 (Arduino) Code 'X/9' → alles aan."));
       allOn();
+      ack(c);
     } else if (c >= '1' && c <= '9') {
       uint8_t slot = (uint8_t)(c - '0'); // 1..9
       if (slot <= N) {
         currentState = c;
-        Serial.print(F("🔔 (Arduino) Slot "));
-        Serial.print(slot);
-        Serial.println(F(" → exclusief aan."));
+        if (!quiet) {
+          Serial.print(F("🔔 (Arduino) Slot "));
+          Serial.print(slot);
+          Serial.println(F(" → exclusief aan."));
+        }
         setExclusive(slot);
       } else {
-        Serial.println(F("⚠️ (Arduino) Slot buiten bereik → genegeerd."));
+        if (!quiet) Serial.println(F("⚠️ (Arduino) Slot buiten bereik → genegeerd."));
       }
+      ack(c);
     } else {
-      Serial.print(F("⚠️ (Arduino) Onbekend teken: "));
-      Serial.println(c);
+      if (!quiet) {
+        Serial.print(F("⚠️ (Arduino) Onbekend teken: "));
+        Serial.println(c);
+      }
+      ack(c);
       // toestand ongewijzigd
     }
   }
@@ -2,23 +2,44 @@
 # -*- coding: utf-8 -*-
 """
 HTML Updater Tool (Robbe Wulgaert · AI in de Klas)
-"""
 
-import os, sys, io, time, tkinter as tk
-from tkinter import messagebox, filedialog
+Zonder argumenten: venster (Tk) om één index.html aan te passen.
+Met een manifest: zonder venster, veel index.html-bestanden tegelijk.
+
+    python HTML_Aanpasser.py --manifest klassen.csv [--jobs 8] [--rapport rapport.jsonl] [--proef]
+    python HTML_Aanpasser.py --zelftest     # controleer de splice-engine op lastige HTML
+
+Manifest (CSV met kopregel, of JSON-lijst van objecten), één rij per doel:
+    map            map met index.html (of het pad naar het bestand zelf),
+                   relatief t.o.v. het manifest
+    titel          nieuwe <title>
+    app_titel      tekst voor #app-title
+    uitleg_titel   tekst voor #uitleg-title
+    categorieen    categorieën, gescheiden door '|' (JSON: ook een lijst)
+Lege velden blijven ongewijzigd. Levert een bestand exact dezelfde bytes op,
+dan wordt het niet herschreven en komt er ook geen .bak-bestand bij.
+
+Enkel de tekst binnen de doelelementen wordt vervangen (splice-engine, zonder
+extra pakketten); BeautifulSoup is alleen nog reserve.
+"""
 
-# BeautifulSoup met fallback install
-try:
-    from bs4 import BeautifulSoup, NavigableString
-except ImportError:
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "beautifulsoup4"])
-    from bs4 import BeautifulSoup, NavigableString
+import os, re, sys, io, csv, json, html, time, hashlib, argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 APP_TITLE_ID   = "app-title"    # <h1 id="app-title">Slimme Vuilnisbak</h1>
 UITLEG_TITLE_ID= "uitleg-title" # <h1 id="uitleg-title">Slimme Vuilnisbak</h1>
 CLASS_LIST_ID  = "class-list"   # <ul id="class-list"><li>…</li></ul>
 
+MANIFEST_KEYS = {           # kolomnaam in het manifest → parameter van update_html_file
+    "map": "path", "pad": "path", "path": "path",
+    "titel": "page_title", "title": "page_title",
+    "app_titel": "app_h1", "app_h1": "app_h1",
+    "uitleg_titel": "uitleg_h1", "uitleg_h1": "uitleg_h1",
+    "categorieen": "h2_lines", "categorieën": "h2_lines", "categories": "h2_lines",
+}
+CATEGORY_SEP = "|"
+
 def find_index_html():
     """Zoek index.html naast script of in '4 - HTML-bestanden', anders laat gebruiker kiezen."""
     here = os.path.abspath(os.path.dirname(__file__))
@@ -31,31 +52,292 @@ def find_index_html():
     if os.path.exists(cand2): return cand2
 
     # Laat gebruiker kiezen
+    from tkinter import filedialog
     return filedialog.askopenfilename(
         title="Kies index.html",
         filetypes=[("HTML files", "index.html"), ("Alle bestanden", "*.*")]
     )
 
+# ================== Splice-engine ==================
+# Eén doorloop over de bytes zoekt de doelelementen en onthoudt waar hun inhoud staat
+# (per bestandshash in een cache). Daarna worden enkel die stukken vervangen: de rest
+# van het bestand blijft byte voor byte gelijk. BeautifulSoup is alleen nog reserve
+# voor HTML waarin de elementen niet eenduidig te vinden zijn.
+
+class SpliceError(ValueError):
+    """Doelelementen niet eenduidig te vinden (bv. ontbrekende eindtag, rare quotes)."""
+
+_TOKEN = re.compile(rb"""<!--.*?-->|<![^>]*>|<\?[^>]*>"""
+                    rb"""|<(/?)([A-Za-z][A-Za-z0-9:-]*)((?:[^>"']|"[^"]*"|'[^']*')*)>""", re.S)
+_ATTR = re.compile(rb"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?""")
+_QUOTED_VALUE = re.compile(rb"""=\s*(?:"[^"]*"|'[^']*')""")
+_RAW_TEXT = {b"script", b"style", b"textarea", b"title"}   # inhoud is geen HTML
+_VOID = {b"area", b"base", b"br", b"col", b"embed", b"hr", b"img", b"input",
+         b"link", b"meta", b"param", b"source", b"track", b"wbr"}
+_TARGET_IDS = {APP_TITLE_ID.encode(), UITLEG_TITLE_ID.encode(), CLASS_LIST_ID.encode()}
+_SPAN_CACHE = OrderedDict()     # sha1 van het bestand → posities (zie scan_targets)
+SPAN_CACHE_SIZE = 64
+
+def _attrs(raw):
+    out = {}
+    for m in _ATTR.finditer(raw):
+        out.setdefault(m.group(1).lower(), m.group(2) or m.group(3) or m.group(4) or b"")
+    return out
+
+def scan_targets(data):
+    """
+    Zoek in één doorloop de inhoud-posities (byte-offsets, begin/einde) van <title>,
+    de elementen met id app-title/uitleg-title/class-list en alle h1/h2 (met context
+    .AIapp/.uitleg). Resultaat wordt per bestandshash bewaard.
+    """
+    key = hashlib.sha1(data).hexdigest()
+    hit = _SPAN_CACHE.get(key)
+    if hit is not None:
+        _SPAN_CACHE.move_to_end(key)
+        return hit
+
+    found = {"title": None, "ids": {}, "h1": [], "h2": [], "has_uitleg": False, "unclosed": [],
+             "problem": None}
+    seen = set()        # eerste .AIapp / .uitleg / id telt (zoals soup.find)
+    watched = []        # open elementen die we volgen: [naam, diepte, soorten, begin inhoud]
+    pos = 0
+    while True:
+        m = _TOKEN.search(data, pos)
+        if not m:
+            break
+        pos = m.end()
+        if m.group(2) is None:                      # commentaar, doctype
+            continue
+        name = m.group(2).lower()
+        if m.group(1):                              # eindtag
+            for w in reversed(watched):
+                if w[0] != name:
+                    continue
+                if w[1]:
+                    w[1] -= 1
+                    continue
+                watched.remove(w)
+                span = (w[3], m.start())
+                for kind in w[2]:
+                    if kind == "title":
+                        found["title"] = span
+                    elif kind[0] == "id":
+                        found["ids"][kind[1]] = span
+                    elif kind[0] == "h1":
+                        found["h1"].append(span + kind[1:])
+                    elif kind[0] == "h2":
+                        found["h2"].append(span + kind[1:])
+                break
+            continue
+
+        raw = m.group(3)
+        if found["problem"] is None and re.search(rb"""["']""", _QUOTED_VALUE.sub(b"=", raw)):
+            # bv. <a title=it's>: een browser sluit de tag bij '>', onze regex loopt door
+            # tot de volgende quote en slikt zo de tags erna in
+            found["problem"] = f"quote buiten een attribuutwaarde in <{name.decode()}> (byte {m.start()})"
+        if name in _VOID or raw.rstrip().endswith(b"/"):
+            continue
+        for w in watched:
+            if w[0] == name:
+                w[1] += 1
+        kinds = []
+        if raw.strip():
+            attrs = _attrs(raw)
+            ident = attrs.get(b"id")
+            if ident in _TARGET_IDS and ("id", ident) not in seen:
+                seen.add(("id", ident))
+                kinds.append(("id", ident.decode()))
+            classes = attrs.get(b"class", b"").split()
+            for cls in (b"AIapp", b"uitleg"):
+                if cls in classes and cls not in seen:
+                    seen.add(cls)
+                    kinds.append(("box", cls))
+                    if cls == b"uitleg":
+                        found["has_uitleg"] = True
+        in_box = {k[1] for w in watched for k in w[2] if k[0] == "box"}
+        if name == b"title" and "title" not in seen:
+            seen.add("title")
+            kinds.append("title")
+        elif name == b"h1":
+            kinds.append(("h1", b"AIapp" in in_box, b"uitleg" in in_box))
+        elif name == b"h2":
+            kinds.append(("h2", b"uitleg" in in_box))
+        if kinds:
+            watched.append([name, 0, kinds, pos])
+        if name in _RAW_TEXT:                       # spring naar de eindtag
+            end = re.compile(rb"</" + name + rb"\s*>", re.I).search(data, pos)
+            pos = end.start() if end else len(data)
+
+    found["unclosed"] = [k for w in watched for k in w[2] if k[0] != "box"]
+    _SPAN_CACHE[key] = found
+    if len(_SPAN_CACHE) > SPAN_CACHE_SIZE:
+        _SPAN_CACHE.popitem(last=False)
+    return found
+
+def _text(value):
+    return html.escape(value, quote=False).encode("utf-8")
+
+def _list_items(inner, lines):
+    """Nieuwe <li>-reeks met dezelfde regeleinden en inspringing als de bestaande lijst."""
+    item = re.search(rb"(\r?\n)([ \t]*)<li\b", inner, re.I)
+    tail = re.search(rb"(\r?\n)([ \t]*)$", inner)
+    if not item and not tail:
+        return b"".join(b"<li>" + _text(line) + b"</li>" for line in lines)
+    nl = (item or tail).group(1)
+    closing = tail.group(2) if tail else b""
+    indent = item.group(2) if item else closing + b"  "
+    out = b"".join(nl + indent + b"<li>" + _text(line) + b"</li>" for line in lines)
+    return out + nl + closing
+
+def splice_html(data, page_title, app_h1, uitleg_h1, h2_lines):
+    """Zoals render_html, maar op bytes en enkel met de gewijzigde stukken. SpliceError → reserve nodig."""
+    found = scan_targets(data)
+    changed = {"title": 0, "app_h1": 0, "uitleg_h1": 0, "cats": 0}
+    edits = {}          # (begin, einde) → nieuwe bytes
+    if found["problem"]:
+        raise SpliceError(found["problem"])
+
+    def need(span, what):
+        if span is None and any(k == what or (isinstance(k, tuple) and k[0] == what) for k in found["unclosed"]):
+            raise SpliceError(f"<{what}> zonder eindtag")
+        return span
+
+    def by_id(ident):
+        span = found["ids"].get(ident)
+        if span is None and ("id", ident) in found["unclosed"]:
+            raise SpliceError(f"#{ident} zonder eindtag")
+        return span
+
+    def edit(span, new, what):
+        if span in edits:
+            raise SpliceError(f"{what} valt in hetzelfde element als een ander doel")
+        edits[span] = new
+
+    h1s = found["h1"]
+    if page_title and need(found["title"], "title"):
+        edit(found["title"], _text(page_title), "<title>")
+        changed["title"] = 1
+
+    if app_h1:
+        span = by_id(APP_TITLE_ID)
+        if not span:
+            span = next((h[:2] for h in h1s if h[2]), None) or (h1s[0][:2] if h1s else None)
+        if need(span, "h1"):
+            edit(span, _text(app_h1), "app-titel")
+            changed["app_h1"] = 1
+
+    if uitleg_h1:
+        span = by_id(UITLEG_TITLE_ID)
+        if not span:
+            span = next((h[:2] for h in h1s if h[3]), None) or (h1s[1][:2] if len(h1s) >= 2 else None)
+        if need(span, "h1"):
+            edit(span, _text(uitleg_h1), "uitleg-titel")
+            changed["uitleg_h1"] = 1
+
+    if h2_lines:
+        span = by_id(CLASS_LIST_ID)
+        if span:
+            edit(span, _list_items(data[span[0]:span[1]], h2_lines), "categorielijst")
+            changed["cats"] = len(h2_lines)
+        else:
+            need(None, "h2")
+            h2s = [h[:2] for h in found["h2"] if h[2] or not found["has_uitleg"]]
+            for span, line in zip(h2s, h2_lines):
+                edit(span, _text(line), "categorie")
+            changed["cats"] = min(len(h2s), len(h2_lines))
+
+    out, last = [], 0
+    for (start, end), new in sorted(edits.items()):
+        if start < last:
+            raise SpliceError("doelelementen overlappen")
+        out.append(data[last:start])
+        out.append(new)
+        last = end
+    out.append(data[last:])
+    return b"".join(out), changed
+
+# Zelftest (--zelftest): lastige HTML waarop de splice-engine moet slagen of eerlijk
+# moet afhaken (SpliceError → BeautifulSoup), nooit stil het verkeerde element aanpassen.
+SELFTEST_CASES = [
+    # (naam, html, argumenten voor splice_html, verwacht resultaat of SpliceError)
+    ("ids + lijst",
+     b'<title>Oud</title><h1 id="app-title">A</h1><h1 id="uitleg-title">B</h1>\r\n'
+     b'<ul id="class-list">\r\n  <li>x</li>\r\n</ul>',
+     ("T", "App", "Uitleg", ["Plastic", "Papier"]),
+     b'<title>T</title><h1 id="app-title">App</h1><h1 id="uitleg-title">Uitleg</h1>\r\n'
+     b'<ul id="class-list">\r\n  <li>Plastic</li>\r\n  <li>Papier</li>\r\n</ul>'),
+    ("attributen met > en quotes",
+     b'<div class="AIapp" data-x="a>b" title=\'c"d\'><h1 class=kop>A</h1></div>',
+     ("", "App", "", []),
+     b'<div class="AIapp" data-x="a>b" title=\'c"d\'><h1 class=kop>App</h1></div>'),
+    ("script en commentaar",
+     b'<!-- <h1 id="app-title">nep</h1> --><script>"<h1>"</script><h1 id="app-title">A</h1>',
+     ("", "App", "", []),
+     b'<!-- <h1 id="app-title">nep</h1> --><script>"<h1>"</script><h1 id="app-title">App</h1>'),
+    ("fallback .AIapp/.uitleg h1 en h2",
+     b'<div class="uitleg"><h1>U</h1><h2>a</h2><h2>b</h2></div><h2>buiten</h2>'
+     b'<div class="AIapp"><h1>A</h1></div>',
+     ("", "App", "Uitleg", ["x", "y"]),
+     b'<div class="uitleg"><h1>Uitleg</h1><h2>x</h2><h2>y</h2></div><h2>buiten</h2>'
+     b'<div class="AIapp"><h1>App</h1></div>'),
+    ("geneste elementen met dezelfde tag",
+     b'<div id="class-list"><div>a</div></div><div>rest</div>',
+     ("", "", "", ["x"]),
+     b'<div id="class-list"><li>x</li></div><div>rest</div>'),
+    ("quote in waarde zonder quotes",
+     b"<a title=it's>x</a><h1 id=\"app-title\">A</h1><p>Robbe's app</p>",
+     ("", "App", "", []), SpliceError),
+    ("#app-title zonder eindtag",
+     b'<h1 id="app-title">A<h1 id="uitleg-title">B</h1>',
+     ("", "App", "Uitleg", []), SpliceError),
+    ("enkel een app-titel in de enige h1",
+     b'<h1>Enige</h1>',
+     ("", "App", "", []), b'<h1>App</h1>'),
+    ("twee doelen in hetzelfde element (via id en fallback)",
+     b'<div class="uitleg"><h1 id="app-title">A</h1></div>',
+     ("", "App", "Uitleg", []), SpliceError),
+    ("<title> zonder eindtag",
+     b'<title>Oud<h1>A</h1>',
+     ("T", "", "", []), SpliceError),
+]
+
+def run_selftest():
+    """Draai SELFTEST_CASES; geeft 0 als alles klopt, anders 1."""
+    failed = 0
+    for name, data, args, expected in SELFTEST_CASES:
+        _SPAN_CACHE.clear()
+        try:
+            got = splice_html(data, *args)[0]
+        except SpliceError as e:
+            got = SpliceError
+            detail = str(e)
+        else:
+            detail = ""
+        ok = got == expected
+        failed += not ok
+        print(f"{'✅' if ok else '❌'} {name}" + (f"  ({detail})" if detail else ""))
+        if not ok:
+            print(f"   verwacht: {expected!r}\n   gekregen: {got!r}")
+    print(f"🏁 {len(SELFTEST_CASES) - failed}/{len(SELFTEST_CASES)} geslaagd")
+    return 1 if failed else 0
+
+# ================== Reserve: BeautifulSoup ==================
+
 def safe_set_text(tag, text):
     """Vervang uitsluitend de tekstinhoud (behoudt element en attributen)."""
+    from bs4 import NavigableString
     if not tag: return False
     # Wis kinderen en voeg alleen tekst terug
     tag.clear()
     tag.append(NavigableString(text))
     return True
 
-def update_html_file(path, page_title, app_h1, uitleg_h1, h2_lines):
-    # Backup
-    ts = time.strftime("%Y%m%d-%H%M%S")
-    backup = f"{path}.bak-{ts}"
+def render_html_bs4(original, page_title, app_h1, uitleg_h1, h2_lines):
+    """Volledige parse + serialisatie met BeautifulSoup (enkel als de splice-engine afhaakt)."""
     try:
-        with io.open(path, "r", encoding="utf-8") as f:
-            original = f.read()
-        with io.open(backup, "w", encoding="utf-8") as f:
-            f.write(original)
-    except Exception as e:
-        messagebox.showwarning("Waarschuwing", f"Kon geen backup maken ({e}). Ga toch verder.")
-
+        from bs4 import BeautifulSoup, NavigableString
+    except ImportError:
+        raise RuntimeError("Deze HTML vraagt BeautifulSoup: installeer met 'pip install beautifulsoup4'.")
     soup = BeautifulSoup(original, "html.parser")
     changed = {"title":0, "app_h1":0, "uitleg_h1":0, "cats":0}
 
@@ -118,60 +400,216 @@ def update_html_file(path, page_title, app_h1, uitleg_h1, h2_lines):
                     safe_set_text(tag, h2_lines[i])
             changed["cats"] = min(len(h2s), len(h2_lines))
 
-    # Schrijf terug – geen prettify (behoudt opmaak beter)
-    with io.open(path, "w", encoding="utf-8") as f:
-        f.write(str(soup))
+    # Geen prettify (behoudt opmaak beter)
+    return str(soup), changed
+
+def render_html(original, page_title, app_h1, uitleg_h1, h2_lines):
+    """
+    Pas de tekst aan in geheugen: geeft (nieuwe html, changed) terug, zonder iets te schrijven.
+    original mag bytes of str zijn; het resultaat heeft hetzelfde type.
+    """
+    data = original.encode("utf-8") if isinstance(original, str) else original
+    try:
+        out, changed = splice_html(data, page_title, app_h1, uitleg_h1, h2_lines)
+    except SpliceError:
+        text, changed = render_html_bs4(data.decode("utf-8"), page_title, app_h1, uitleg_h1, h2_lines)
+        out = text.encode("utf-8")
+    return (out.decode("utf-8") if isinstance(original, str) else out), changed
+
+def update_html_file(path, page_title, app_h1, uitleg_h1, h2_lines, warn=None, write=True):
+    """
+    Pas één index.html aan. Geeft (changed, backup) terug; backup is None als er niets
+    geschreven werd (resultaat byte-identiek, of write=False). changed["written"] = 0/1.
+    warn: functie voor waarschuwingen (venster of print); standaard print.
+    """
+    with open(path, "rb") as f:
+        original = f.read()
+    new_html, changed = render_html(original, page_title, app_h1, uitleg_h1, h2_lines)
+    changed["written"] = 0
+    if new_html == original or not write:
+        return changed, None
+
+    # Backup
+    ts = time.strftime("%Y%m%d-%H%M%S")
+    backup = f"{path}.bak-{ts}"
+    try:
+        with open(backup, "wb") as f:
+            f.write(original)
+    except Exception as e:
+        (warn or print)(f"Kon geen backup maken ({e}). Ga toch verder.")
+        backup = None
 
+    with open(path, "wb") as f:
+        f.write(new_html)
+    changed["written"] = 1
     return changed, backup
 
-# ================== Tk GUI ==================
+# ================== Batch (zonder venster) ==================
 
-def do_update():
-    page_title = title_entry.get().strip()
-    app_h1     = app_h1_entry.get().strip()
-    uitleg_h1  = uitleg_h1_entry.get().strip()
-    h2_lines   = [ln.strip() for ln in cats_text.get("1.0", tk.END).splitlines() if ln.strip()]
+def _split_categories(value):
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value or "").split(CATEGORY_SEP) if v.strip()]
 
-    index_path = find_index_html()
-    if not index_path:
-        messagebox.showerror("Fout", "index.html niet gevonden of niet geselecteerd.")
-        return
+def load_manifest(manifest_path):
+    """Lees een CSV- of JSON-manifest; geeft een lijst opdrachten (dicts met de parameters van update_html_file)."""
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    with io.open(manifest_path, "r", encoding="utf-8-sig", newline="") as f:
+        if manifest_path.lower().endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+    jobs = []
+    for n, row in enumerate(rows, start=1):
+        job = {"page_title": "", "app_h1": "", "uitleg_h1": "", "h2_lines": [], "path": ""}
+        for key, value in row.items():
+            target = MANIFEST_KEYS.get((key or "").strip().lower())
+            if target == "h2_lines":
+                job[target] = _split_categories(value)
+            elif target:
+                job[target] = str(value or "").strip()
+        if not job["path"]:
+            raise ValueError(f"Rij {n} in het manifest heeft geen 'map'.")
+        path = os.path.join(base, os.path.expanduser(job["path"]))
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        job["path"] = os.path.normpath(path)
+        jobs.append(job)
+    return jobs
 
+def run_job(job, write=True):
+    """Eén opdracht (draait in een werkproces); geeft altijd een rapport-dict terug, ook bij fouten."""
+    t0 = time.perf_counter()
+    report = {"pad": job["path"]}
     try:
-        changed, backup = update_html_file(index_path, page_title, app_h1, uitleg_h1, h2_lines)
-        msg = (f"Succes! Aangepast:\n"
-               f"• <title>: {changed['title']}\n"
-               f"• H1 (app): {changed['app_h1']}\n"
-               f"• H1 (uitleg): {changed['uitleg_h1']}\n"
-               f"• Categorieën: {changed['cats']}\n\n"
-               f"Backup: {os.path.basename(backup)}")
-        messagebox.showinfo("Gereed", msg)
+        changed, backup = update_html_file(job["path"], job["page_title"], job["app_h1"],
+                                           job["uitleg_h1"], job["h2_lines"], write=write)
+        if changed.pop("written"):
+            report["status"] = "gewijzigd"
+        else:
+            report["status"] = "ongewijzigd" if write else "proef"
+        report.update(changed)
+        report["backup"] = backup
     except Exception as e:
-        messagebox.showerror("Fout", f"Mislukt: {e}")
+        report["status"] = "fout"
+        report["fout"] = f"{type(e).__name__}: {e}"
+    report["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return report
+
+def batch_update(jobs, workers=None, write=True):
+    """Voer alle opdrachten uit over een procespool; levert de rapporten op zodra ze klaar zijn."""
+    if not jobs:
+        return
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1:
+        for job in jobs:
+            yield run_job(job, write)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_job, job, write) for job in jobs]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+def run_batch(argv=None):
+    ap = argparse.ArgumentParser(description="Pas veel index.html-bestanden tegelijk aan (zonder venster).")
+    ap.add_argument("--manifest", help="CSV of JSON met per rij: map, titel, app_titel, uitleg_titel, categorieen")
+    ap.add_argument("--jobs", type=int, default=None, help="aantal werkprocessen (standaard: aantal CPU-kernen)")
+    ap.add_argument("--rapport", help="rapport per bestand als JSON Lines (wordt regel per regel geschreven)")
+    ap.add_argument("--proef", action="store_true", help="enkel nagaan wat er zou veranderen; niets schrijven")
+    ap.add_argument("--zelftest", action="store_true", help="controleer de splice-engine op lastige HTML en stop")
+    args = ap.parse_args(argv)
+    if args.zelftest:
+        return run_selftest()
+    if not args.manifest:
+        ap.error("--manifest is verplicht (of gebruik --zelftest)")
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"❌ Manifest onbruikbaar: {e}")
+        return 2
+    print(f"📋 {len(jobs)} bestand(en) uit {args.manifest}")
+    counts = {}
+    out = io.open(args.rapport, "w", encoding="utf-8") if args.rapport else None
+    t0 = time.perf_counter()
+    try:
+        for report in batch_update(jobs, args.jobs, write=not args.proef):
+            counts[report["status"]] = counts.get(report["status"], 0) + 1
+            icon = {"gewijzigd": "✅", "ongewijzigd": "⏭️", "proef": "🔎"}.get(report["status"], "❌")
+            detail = report.get("fout") or os.path.basename(report.get("backup") or "") or ""
+            print(f"{icon} {report['status']:<11} {report['pad']}  {detail}".rstrip())
+            if out:
+                out.write(json.dumps(report, ensure_ascii=False) + "\n")
+                out.flush()
+    finally:
+        if out:
+            out.close()
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"🏁 Klaar in {time.perf_counter() - t0:.1f} s: {summary}")
+    return 1 if counts.get("fout") else 0
+
+# ================== Tk GUI ==================
+
+def run_gui():
+    import tkinter as tk
+    from tkinter import messagebox
+
+    def do_update():
+        page_title = title_entry.get().strip()
+        app_h1     = app_h1_entry.get().strip()
+        uitleg_h1  = uitleg_h1_entry.get().strip()
+        h2_lines   = [ln.strip() for ln in cats_text.get("1.0", tk.END).splitlines() if ln.strip()]
+
+        index_path = find_index_html()
+        if not index_path:
+            messagebox.showerror("Fout", "index.html niet gevonden of niet geselecteerd.")
+            return
+
+        try:
+            changed, backup = update_html_file(
+                index_path, page_title, app_h1, uitleg_h1, h2_lines,
+                warn=lambda m: messagebox.showwarning("Waarschuwing", m))
+            if not changed["written"]:
+                messagebox.showinfo("Gereed", "Niets te doen: index.html bevat deze teksten al.")
+                return
+            msg = (f"Succes! Aangepast:\n"
+                   f"• <title>: {changed['title']}\n"
+                   f"• H1 (app): {changed['app_h1']}\n"
+                   f"• H1 (uitleg): {changed['uitleg_h1']}\n"
+                   f"• Categorieën: {changed['cats']}\n\n"
+                   f"Backup: {os.path.basename(backup) if backup else 'geen'}")
+            messagebox.showinfo("Gereed", msg)
+        except Exception as e:
+            messagebox.showerror("Fout", f"Mislukt: {e}")
+
+    # GUI
+    root = tk.Tk()
+    root.title("HTML Updater Tool – AI in de Klas")
 
-# GUI
-root = tk.Tk()
-root.title("HTML Updater Tool – AI in de Klas")
+    padx = dict(padx=8, pady=6)
 
-padx = dict(padx=8, pady=6)
+    tk.Label(root, text="Nieuwe paginatitel (<title>):").grid(row=0, column=0, sticky="e", **padx)
+    title_entry = tk.Entry(root, width=56)
+    title_entry.grid(row=0, column=1, **padx)
 
-tk.Label(root, text="Nieuwe paginatitel (<title>):").grid(row=0, column=0, sticky="e", **padx)
-title_entry = tk.Entry(root, width=56)
-title_entry.grid(row=0, column=1, **padx)
+    tk.Label(root, text="H1 in app (#app-title of 1e H1):").grid(row=1, column=0, sticky="e", **padx)
+    app_h1_entry = tk.Entry(root, width=56)
+    app_h1_entry.grid(row=1, column=1, **padx)
 
-tk.Label(root, text="H1 in app (#app-title of 1e H1):").grid(row=1, column=0, sticky="e", **padx)
-app_h1_entry = tk.Entry(root, width=56)
-app_h1_entry.grid(row=1, column=1, **padx)
+    tk.Label(root, text="H1 in uitleg (#uitleg-title of 2e H1):").grid(row=2, column=0, sticky="e", **padx)
+    uitleg_h1_entry = tk.Entry(root, width=56)
+    uitleg_h1_entry.grid(row=2, column=1, **padx)
 
-tk.Label(root, text="H1 in uitleg (#uitleg-title of 2e H1):").grid(row=2, column=0, sticky="e", **padx)
-uitleg_h1_entry = tk.Entry(root, width=56)
-uitleg_h1_entry.grid(row=2, column=1, **padx)
+    tk.Label(root, text="Categorieën (één per regel):").grid(row=3, column=0, sticky="ne", **padx)
+    cats_text = tk.Text(root, width=56, height=8)
+    cats_text.grid(row=3, column=1, **padx)
 
-tk.Label(root, text="Categorieën (één per regel):").grid(row=3, column=0, sticky="ne", **padx)
-cats_text = tk.Text(root, width=56, height=8)
-cats_text.grid(row=3, column=1, **padx)
+    update_button = tk.Button(root, text="Update index.html", command=do_update)
+    update_button.grid(row=4, column=0, columnspan=2, pady=10)
 
-update_button = tk.Button(root, text="Update index.html", command=do_update)
-update_button.grid(row=4, column=0, columnspan=2, pady=10)
+    root.mainloop()
 
-root.mainloop()
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_batch())
+    run_gui()
@@ -31,9 +31,12 @@ let modelReady   = false;
 let cameraReady  = false;
 
 // Standaard Teachable Machine-model (uit map image_model/)
+// De offline-build (tm_offline.py) geeft via window.SVB_ASSETS paden met inhoudshash mee.
+const ASSETS    = window.SVB_ASSETS || {};
 const MODEL_DIR = 'image_model/';
-const MODEL_URL = MODEL_DIR + 'model.json';
-const META_URL  = MODEL_DIR + 'metadata.json';
+const MODEL_URL = ASSETS.model || MODEL_DIR + 'model.json';
+const META_URL  = ASSETS.metadata || MODEL_DIR + 'metadata.json';
+const BUNDLE_URL = 'bundle' in ASSETS ? ASSETS.bundle : MODEL_DIR + 'model.svmb';   // één bestand (via de Python-launcher)
 
 /* ================== LABEL → CODE MAPPING ================== */
 const MAPPING_STORAGE_KEY = 'sv_mapping_v2';
@@ -130,6 +133,48 @@ function codeForLabel(lbl) {
   return '0';
 }
 
+/* ================== MODELBUNDEL (.svmb) ================== */
+
+// Pak een .svmb-bundel in geheugen uit → { modelFile, metadataFile, weightFiles }
+// Opbouw: zie 6 - Python-tools/tm_bundle.py (24-byte kop, zlib-JSON, uitgelijnde weights)
+async function expandBundle(buffer) {
+  const view  = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== 'SVMB') throw new Error('Geen .svmb-bundel');
+  if (view.getUint16(4, true) > 1) throw new Error('Bundelversie te nieuw');
+  const flags     = view.getUint16(6, true);
+  const headerLen = view.getUint32(8, true);
+  const offset    = view.getUint32(16, true);
+  const payload   = view.getUint32(20, true);
+
+  let header = new Uint8Array(buffer, 24, headerLen);
+  if (flags & 1) {
+    const stream = new Blob([header]).stream().pipeThrough(new DecompressionStream('deflate'));
+    header = new Uint8Array(await new Response(stream).arrayBuffer());
+  }
+  const doc = JSON.parse(new TextDecoder().decode(header));
+  const weights = new Uint8Array(buffer, offset, payload);   // geen kopie
+
+  return {
+    modelFile:    new File([JSON.stringify(doc.model)], 'model.json', { type: 'application/json' }),
+    metadataFile: new File([JSON.stringify(doc.metadata || {})], 'metadata.json', { type: 'application/json' }),
+    weightFiles:  [new File([weights], 'weights.bin', { type: 'application/octet-stream' })],
+  };
+}
+
+// Probeer de bundel van de launcher; null als die er niet is (bv. gewone http.server)
+async function fetchBundle(url) {
+  if (!url || !('DecompressionStream' in window)) return null;
+  try {
+    const res = await fetch(url);
+    if (!res.ok) return null;
+    return await expandBundle(await res.arrayBuffer());
+  } catch (e) {
+    console.log('ℹ️ (Model) Geen bundel beschikbaar – laad losse bestanden.', e);
+    return null;
+  }
+}
+
 /* ================== PREFLIGHT STANDAARDMODEL ================== */
 
 async function preflightDefaultModelAssets() {
@@ -148,8 +193,10 @@ async function setup() {
   const c = createCanvas(320, 240);
   c.parent('canvasContainer');
 
+  const cameraT0 = performance.now();
   video = createCapture(VIDEO, () => {
     cameraReady = true;
+    metrics.cameraMs = performance.now() - cameraT0;
     window.uiSetCamera?.(!(window.isPrivacyOn && window.isPrivacyOn()));
   });
   video.size(320, 240);
@@ -162,7 +209,7 @@ async function setup() {
   } else {
     connectedBtn?.addEventListener('click', connectSerial);
     navigator.serial.addEventListener('disconnect', () => {
-      writer = null; port = null;
+      writer = null; port = null; binaryMode = false;
       if (connectedBtn) connectedBtn.style.display = 'inline-block';
       window.uiSetSerial?.(false);
     });
@@ -171,6 +218,7 @@ async function setup() {
   await initMapping(false);
   await initDefaultModel();
   classifyLoop();
+  startMetrics();
 
   document.addEventListener('privacychange', (e) => {
     const aan = !!e.detail;
@@ -202,13 +250,22 @@ async function initDefaultModel() {
   window.uiSetModel?.(false);
   modelReady = false;
 
-  try { await preflightDefaultModelAssets(); }
-  catch (err) { console.warn('Preflight error:', err); }
-
   if (tmModel) try { tmModel.dispose(); } catch (e) {}
 
+  const t0 = performance.now();
   try {
-    tmModel = await tmImage.load(MODEL_URL, META_URL);
+    // 1) Eén onveranderlijke bundel (één request, lang te cachen)
+    const files = await fetchBundle(BUNDLE_URL);
+    if (files) {
+      tmModel = await tmImage.loadFromFiles(files.modelFile, files.weightFiles[0], files.metadataFile);
+    } else {
+      // 2) Losse bestanden (model.json + weights.bin + metadata.json)
+      try { await preflightDefaultModelAssets(); }
+      catch (err) { console.warn('Preflight error:', err); }
+      tmModel = await tmImage.load(MODEL_URL, META_URL);
+    }
+    metricModelLoaded(t0, files ? 'bundel' : 'bestanden');
+    lastPredictions = null;
     modelReady = true;
     window.uiSetModel?.(true);
   } catch (err) {
@@ -220,7 +277,19 @@ async function initDefaultModel() {
 
 // FIX HIERONDER TOEGEPAST: loadFromFiles(model, weights, metadata)
 async function initModelFromCustomConfig(cfg) {
-  const config = cfg || window.svCustomConfig;
+  let config = cfg || window.svCustomConfig;
+
+  // Eén .svmb-bundel gekozen? Eerst in geheugen uitpakken
+  if (config && config.bundleFile) {
+    try {
+      const files = await expandBundle(await config.bundleFile.arrayBuffer());
+      config = { ...config, ...files };
+    } catch (err) {
+      console.error('❌ Bundel kon niet gelezen worden:', err);
+      alert('Kon de .svmb-bundel niet lezen.');
+      return;
+    }
+  }
 
   if (
     !config ||
@@ -240,6 +309,7 @@ async function initModelFromCustomConfig(cfg) {
 
   console.log('🧠 Custom model laden...');
   
+  const t0 = performance.now();
   try {
     // FIX: De library verwacht drie losse argumenten, geen array!
     tmModel = await tmImage.loadFromFiles(
@@ -248,6 +318,8 @@ async function initModelFromCustomConfig(cfg) {
       config.metadataFile
     );
     
+    metricModelLoaded(t0, 'eigen');
+    lastPredictions = null;
     modelReady = true;
     window.uiSetModel?.(true);
     console.log('✅ Custom model geladen.');
@@ -273,18 +345,101 @@ async function classifyLoop() {
     }
 
     try {
-      const predictions = await tmModel.predict(video.elt);
-      handleResults(predictions);
+      if (sceneChanged()) {
+        const t0 = performance.now();
+        lastPredictions = await tmModel.predict(video.elt);
+        metricSample(metrics.classifyMs, performance.now() - t0);
+        handleResults(lastPredictions);
+      } else {
+        vote(lastPredictions);   // stilstaand beeld: vorig resultaat hergebruiken (niet opnemen/timen)
+        await sleep(MOTION_IDLE_MS);
+      }
     } catch (err) {
       console.error('Classificatiefout:', err);
+      metrics.classifyErrors++;
       await sleep(200);
     }
     await sleep(10);
   }
 }
 
+// Bewegingspoort: enkel classificeren als het beeld veranderd is t.o.v. het laatst
+// geclassificeerde beeld (verkleind naar 32×24 grijswaarden), of na MOTION_KEEPALIVE_MS.
+// Instellen via de console: localStorage.setItem('sv_motion', '0.03,2000')
+// (fractie veranderde pixels, keep-alive in ms; '0' = altijd classificeren). Afstellen op
+// opgenomen frames: 6 - Python-tools/motion_replay.py. Statistiek: svMotion().
+const MOTION_CFG = (localStorage.getItem('sv_motion') || '0.03,2000').split(',').map(Number);
+const MOTION_FRACTION = MOTION_CFG[0] || 0;
+const MOTION_KEEPALIVE_MS = MOTION_CFG[1] || 2000;
+const MOTION_PIXEL_DIFF = 24;       // grijswaardeverschil (0..255) waarboven een pixel "veranderd" is
+const MOTION_W = 32, MOTION_H = 24;
+const MOTION_IDLE_MS = 60;          // wachttijd tussen controles als er niets verandert
+let motionCtx = null;
+let motionRef = null;               // verkleind beeld bij de laatste classificatie
+let lastInferTs = 0;
+let lastPredictions = null;
+const motionStats = { inferred: 0, skipped: 0 };
+
+function grabThumb() {
+  if (!motionCtx) {
+    const c = document.createElement('canvas');
+    c.width = MOTION_W;
+    c.height = MOTION_H;
+    motionCtx = c.getContext('2d', { willReadFrequently: true });
+  }
+  motionCtx.drawImage(video.elt, 0, 0, MOTION_W, MOTION_H);
+  const rgba = motionCtx.getImageData(0, 0, MOTION_W, MOTION_H).data;
+  const gray = new Uint8Array(MOTION_W * MOTION_H);
+  for (let i = 0, j = 0; j < gray.length; i += 4, j++) {
+    gray[j] = (rgba[i] * 77 + rgba[i + 1] * 150 + rgba[i + 2] * 29) >> 8;
+  }
+  return gray;
+}
+
+function changedFraction(a, b) {
+  let n = 0;
+  for (let i = 0; i < a.length; i++) {
+    if (Math.abs(a[i] - b[i]) > MOTION_PIXEL_DIFF) n++;
+  }
+  return n / a.length;
+}
+
+function sceneChanged() {
+  if (!MOTION_FRACTION) return true;
+  const thumb = grabThumb();
+  const now = performance.now();
+  const changed = !lastPredictions || !motionRef || now - lastInferTs >= MOTION_KEEPALIVE_MS ||
+                  changedFraction(thumb, motionRef) > MOTION_FRACTION;
+  if (changed) {
+    motionRef = thumb;
+    lastInferTs = now;
+    motionStats.inferred++;
+  } else {
+    motionStats.skipped++;
+  }
+  return changed;
+}
+
+window.svMotion = function () {
+  const total = motionStats.inferred + motionStats.skipped;
+  const out = { ...motionStats, bespaard: total ? +(motionStats.skipped / total * 100).toFixed(1) + '%' : '—',
+                drempel: MOTION_FRACTION, keepAliveMs: MOTION_KEEPALIVE_MS };
+  console.table(out);
+  return out;
+};
+
+// Nieuwe classificatie van een echt camerabeeld: opnemen (sv_record), tijdstip voor
+// svLatency() bijhouden en meestemmen.
 function handleResults(predictions) {
   if (!Array.isArray(predictions) || !predictions.length) return;
+  if (RECORD) recordFrame(predictions);
+  lastClassifiedAt = performance.now();
+  vote(predictions);
+}
+
+// Enkel stemmen: ook voor hergebruikte resultaten bij een stilstaand beeld.
+function vote(predictions) {
+  if (!Array.isArray(predictions) || !predictions.length) return;
 
   let top = predictions[0];
   for (const p of predictions) {
@@ -328,6 +483,7 @@ async function connectSerial() {
     await port.open({ baudRate: 115200 });
     writer = port.writable.getWriter();
     window.uiSetSerial?.(true);
+    readSerial(port);   // start ook negotiateBinary() zodra de Arduino zich meldt
     window.setPrivacy?.(false);
     if (connectedBtn) connectedBtn.style.display = 'none';
   } catch (err) {
@@ -336,19 +492,247 @@ async function connectSerial() {
   }
 }
 
+// Optionele seriële brug (6 - Python-tools/serial_bridge.py): één pagina → veel borden.
+// Aanzetten via de console: localStorage.setItem('sv_bridge', 'http://localhost:8765')
+const BRIDGE_URL = (localStorage.getItem('sv_bridge') || '').replace(/\/+$/, '');
+
+function sendToBridge(code) {
+  // text/plain-POST: geen CORS-preflight; niet afwachten zodat de AI-lus nooit wacht
+  fetch(BRIDGE_URL + '/code', { method: 'POST', body: code, keepalive: true })
+    .catch(err => console.warn('Brug niet bereikbaar:', err));
+}
+
 async function sendCodeDebounced(code) {
-  if (!writer) return;
+  if (!writer && !BRIDGE_URL) return;
   const now = Date.now();
   if (code === lastSentCode && (now - lastSentTs) < SEND_DEBOUNCE_MS) return;
 
   try {
-    await writer.write(new TextEncoder().encode(code));
+    if (BRIDGE_URL) sendToBridge(code);
+    if (writer) {
+      const t0 = performance.now();
+      await writer.write(encodeCode(code));
+      metricSample(metrics.serialWriteMs, performance.now() - t0);
+    }
     lastSentCode = code;
     lastSentTs   = now;
     console.log('📨 Sent:', code);
   } catch (err) {
     console.error('Serial write error:', err);
+    metrics.serialErrors++;
   }
 }
 
+// Stille binaire modus (Arduino-firmware uit deze repo): '!B' sturen, maar pas nadat
+// het bord zich gemeld heeft met "✅ (Arduino)…". De .hex van de micro:bit behandelt '!'
+// als onbekende code en zet dan alles uit, dus die krijgt nooit een '!B'.
+// Antwoordt het bord "!B", dan gaat elke code als 1 byte (0x80 = uit, 0x80+n = slot n,
+// 0xC0 = alles aan) en zwijgt de 🔔-logging. Oudere Arduino-firmware negeert '!' en
+// antwoordt niet → gewoon tekst blijven sturen.
+const ARDUINO_BANNER = '✅ (Arduino)';
+const NEGOTIATE_TRIES = 3;
+const NEGOTIATE_WAIT_MS = 700;
+let binaryMode = false;
+let negotiating = false;
+
+async function negotiateBinary() {
+  if (TRACE || negotiating || binaryMode) return;
+  negotiating = true;
+  try {
+    for (let i = 0; i < NEGOTIATE_TRIES && writer && !binaryMode; i++) {
+      await writer.write(new TextEncoder().encode('!B'));
+      await sleep(NEGOTIATE_WAIT_MS);
+    }
+  } finally {
+    negotiating = false;
+  }
+  if (binaryMode) console.log('⚡ Stille binaire modus actief (1 byte per code)');
+}
+
+function encodeCode(code) {
+  if (TRACE) return new TextEncoder().encode(traceFrame(code));
+  if (!binaryMode) return new TextEncoder().encode(code);
+  const b = code === '0' ? 0x80 : (code === 'X' || code === '9') ? 0xC0 : 0x80 + Number(code);
+  return new Uint8Array([b]);
+}
+
+// Optionele latentiemeting: elke code krijgt een volgnummer ('#12:3\n'), de firmware
+// bevestigt ná het schakelen ('@12:3'). Aanzetten via de console:
+//   localStorage.setItem('sv_trace', '1')   → pagina herladen, daarna svLatency()
+// Werkt met de firmware uit deze repo; oudere firmware kent het formaat niet.
+const TRACE = localStorage.getItem('sv_trace') === '1';
+const TRACE_KEEP = 500;             // laatste zoveel metingen bijhouden
+const trace = { seq: 0, pending: new Map(), skipped: new Set(), superseded: 0, reordered: 0,
+                page: [], link: [], total: [] };
+let lastClassifiedAt = 0;
+
+function traceFrame(code) {
+  trace.seq = (trace.seq + 1) % 65536;   // uint16 op de Arduino
+  trace.pending.set(trace.seq, { classified: lastClassifiedAt, written: performance.now() });
+  return '#' + trace.seq + ':' + code + '\n';
+}
+
+function pushSample(arr, v) {
+  arr.push(v);
+  if (arr.length > TRACE_KEEP) arr.shift();
+}
+
+function onAck(seq, now) {
+  const sent = trace.pending.get(seq);
+  if (!sent) {
+    if (trace.skipped.delete(seq)) trace.reordered++;   // bevestiging na een nieuwere
+    return;
+  }
+  // Oudere codes zonder bevestiging: door het bord overgeslagen (micro:bit: enkel de nieuwste telt)
+  for (const [s] of trace.pending) {
+    if (s === seq) break;
+    trace.pending.delete(s);
+    trace.skipped.add(s);
+    trace.superseded++;
+  }
+  trace.pending.delete(seq);
+  if (trace.skipped.size > TRACE_KEEP) trace.skipped.clear();
+  pushSample(trace.page, sent.written - sent.classified);
+  pushSample(trace.link, now - sent.written);
+  pushSample(trace.total, now - sent.classified);
+}
+
+// Eén leeslus voor alles wat het bord terugstuurt: de Arduino-melding en "!B"
+// (onderhandeling) en "@seq" (meting).
+async function readSerial(p) {
+  const reader = p.readable.getReader();
+  const decoder = new TextDecoder();
+  let buf = '';
+  try {
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      const now = performance.now();
+      // binaire bevestigingen (bytes vanaf 0x80) hoeven we niet te lezen
+      const bytes = binaryMode ? value.filter(b => b < 0x80) : value;
+      buf += decoder.decode(bytes, { stream: true });
+      const lines = buf.split('\n');
+      buf = lines.pop();
+      for (const raw of lines) {
+        const line = raw.trim();
+        if (line === '!B') binaryMode = true;
+        else if (line.startsWith(ARDUINO_BANNER)) negotiateBinary();
+        const m = /^@(\d+):\S/.exec(line);
+        if (m) onAck(Number(m[1]), now);
+      }
+    }
+  } catch (err) {
+    console.warn('Seriële leeslus gestopt:', err);
+  } finally {
+    reader.releaseLock();
+  }
+}
+
+window.svLatency = function () {
+  const pct = (arr, q) => {
+    if (!arr.length) return NaN;
+    const sorted = [...arr].sort((a, b) => a - b);
+    return +sorted[Math.min(sorted.length - 1, Math.round(q / 100 * (sorted.length - 1)))].toFixed(1);
+  };
+  const row = arr => ({ n: arr.length, p50: pct(arr, 50), p90: pct(arr, 90), p99: pct(arr, 99) });
+  const out = {
+    'pagina (classificatie → write)': row(trace.page),
+    'lijn + firmware (write → bevestiging)': row(trace.link),
+    'totaal (classificatie → LED)': row(trace.total),
+  };
+  console.table(out);
+  console.log(`Samengevoegd: ${trace.superseded} · omgewisseld: ${trace.reordered} · ` +
+              `zonder bevestiging: ${trace.pending.size}`);
+  return out;
+};
+
+/* ================== TELEMETRIE (launcher /metrics) ================== */
+
+// Elke METRICS_INTERVAL_MS een korte samenvatting naar de Python-launcher, die per toestel
+// laadtijd, FPS en latenties toont op http://localhost:8000/metrics (?format=json).
+// Het toestel heet standaard naar een willekeurige id; een herkenbare naam geven kan via de
+// console: localStorage.setItem('sv_client', 'pc-12'). Uitzetten: localStorage.setItem('sv_metrics', '0').
+const METRICS_ON = localStorage.getItem('sv_metrics') !== '0' && location.protocol.startsWith('http');
+const METRICS_INTERVAL_MS = 10000;
+const METRICS_KEEP = 1000;          // max. metingen per lijst per rapport
+const metrics = { modelLoadMs: null, modelSource: null, cameraMs: null, classifyMs: [], serialWriteMs: [],
+                  classifyErrors: 0, serialErrors: 0, since: performance.now() };
+
+function metricSample(arr, ms) {
+  if (arr.length < METRICS_KEEP) arr.push(+ms.toFixed(2));
+}
+
+function metricModelLoaded(t0, source) {
+  metrics.modelLoadMs = performance.now() - t0;
+  metrics.modelSource = source;
+  console.log(`⏱ Model geladen in ${metrics.modelLoadMs.toFixed(0)} ms (${source})`);
+}
+
+function metricsClientId() {
+  let id = localStorage.getItem('sv_client');
+  if (!id) {
+    id = 'pc-' + Math.random().toString(36).slice(2, 8);
+    localStorage.setItem('sv_client', id);
+  }
+  return id;
+}
+
+async function postMetrics() {
+  const now = performance.now();
+  const seconds = (now - metrics.since) / 1000;
+  const report = {
+    client: metricsClientId(), ua: navigator.userAgent, cores: navigator.hardwareConcurrency || null,
+    backend: window.tf?.getBackend?.() || '', camera_ready: cameraReady, camera_ms: metrics.cameraMs,
+    model_load_ms: metrics.modelLoadMs, model_source: metrics.modelSource,
+    frames: metrics.classifyMs.length, fps: +(metrics.classifyMs.length / seconds).toFixed(2),
+    classify_ms: metrics.classifyMs, serial_write_ms: metrics.serialWriteMs,
+    classify_errors: metrics.classifyErrors, serial_errors: metrics.serialErrors,
+  };
+  // Altijd opnieuw beginnen: een verloren rapport mag de pagina niet laten volgeheugen
+  Object.assign(metrics, { modelLoadMs: null, classifyMs: [], serialWriteMs: [],
+                           classifyErrors: 0, serialErrors: 0, since: now });
+  const res = await fetch('metrics', { method: 'POST', headers: { 'Content-Type': 'application/json' },
+                                       body: JSON.stringify(report), keepalive: true });
+  return res.ok;
+}
+
+function startMetrics() {
+  if (!METRICS_ON) return;
+  const timer = setInterval(() => {
+    postMetrics().then(ok => {
+      if (!ok) clearInterval(timer);   // geen launcher (bv. python -m http.server): stoppen
+    }).catch(() => {});
+  }, METRICS_INTERVAL_MS);
+}
+
+// Optionele opname voor 6 - Python-tools/stabilizer_replay.py: per frame de kansen van alle
+// labels, om venster/drempel/debounce achteraf af te stellen. Aanzetten via de console:
+//   localStorage.setItem('sv_record', '1')   → pagina herladen
+//   svMark('PLASTIC') / svMark(null)         → wat er écht voor de camera ligt (null = niets)
+//   svRecording()                            → opname downloaden als opname.jsonl
+const RECORD = localStorage.getItem('sv_record') === '1';
+const RECORD_KEEP = 36000;          // ±40 minuten aan 15 beelden/s
+const recording = [];
+let recordLabels = [];
+let recordMark;                     // undefined = niet aangeduid
+
+function recordFrame(predictions) {
+  recordLabels = predictions.map(p => p.className);
+  const frame = { t: +performance.now().toFixed(1), p: predictions.map(p => +Number(p.probability).toFixed(4)) };
+  if (recordMark !== undefined) frame.truth = recordMark;
+  recording.push(frame);
+  if (recording.length > RECORD_KEEP) recording.shift();
+}
+
+window.svMark = function (lbl) { recordMark = lbl === undefined ? null : lbl; };
+
+window.svRecording = function () {
+  const lines = [JSON.stringify({ labels: recordLabels }), ...recording.map(f => JSON.stringify(f))];
+  const a = document.createElement('a');
+  a.href = URL.createObjectURL(new Blob([lines.join('\n') + '\n'], { type: 'application/x-ndjson' }));
+  a.download = 'opname.jsonl';
+  a.click();
+  return recording.length;
+};
+
 function sleep(ms) { return new Promise(r => setTimeout(r, ms)); }
@@ -10,21 +10,49 @@ Werking:
 - Herkent varianten: “4- HTML-bestanden”, “4_HTML-bestanden”, “HTML-bestanden”.
 - Zoekt anders beperkt in de bovenliggende map, en als laatste redmiddel in Downloads.
 - Preflight controle van image_model/ (model.json + weights + metadata.json).
-- Start een lokale HTTP-server en opent index.html in de browser.
+- Onthoudt de gevonden map en een geslaagde preflight in een kleine cache
+  (sleutel: pad + mtime), zodat een volgende start niet opnieuw moet zoeken.
+- Start een lokale HTTP-server (ingebouwd, met caching) en opent index.html in de browser.
+- Modelregister: nieuwe exports in image_model/ worden live ingewisseld (hot-swap),
+  zonder herstart; kies het standaardmodel met --model, status via /_models.
+- /metrics: requests, bytes en latentie per bestand, plus wat elke pagina terugmeldt
+  (laadtijd model, FPS, classificatie- en seriële latentie, fouten); als
+  Prometheus-tekst of JSON (?format=json) en in een roterend logbestand.
+- Resolutievarianten (tm_resolution.py): serveer een kleinere variant met --resolutie PX,
+  of laat een korte tijdsmeting (ruwe schatting, zie --help) kiezen met --resolutie auto.
 - Probeert Google Chrome; valt anders terug op de standaardbrowser.
 
+Zware imports (webbrowser, subprocess, gzip, concurrent.futures) en het zoeken
+naar Chrome gebeuren pas als ze nodig zijn, na het starten van de server.
+Met --timings toont de launcher waar de opstarttijd naartoe gaat.
+
 Alle logging/prints zijn in het Nederlands.
 Compatibel met Python 3.7+.
 """
 
+import time
+STARTUP_T0 = time.perf_counter()   # NL: startpunt voor --timings (vóór de andere imports)
+
 import os
 import sys
+import re
 import json
 import socket
-import subprocess
-import webbrowser
+import hashlib
+import bisect
+import argparse
+import importlib
+import threading
+import urllib.parse
+import http.server
 from sys import platform
-from typing import Optional, Iterable
+from typing import Optional, Iterable, Dict, List, Tuple
+
+# NL: brotli is optioneel; zonder module serveren we enkel gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # ======== NL: basishulpen ========
 
@@ -59,6 +87,126 @@ def siblings(parent: str) -> Iterable[str]:
     except FileNotFoundError:
         return
 
+def dir_stamp(model_dir: str) -> Optional[tuple]:
+    """NL: (naam, mtime, grootte) van alle bestanden in de map; None als de map niet leesbaar is."""
+    try:
+        names = sorted(os.listdir(model_dir))
+    except OSError:
+        return None
+    stamp = []
+    for name in names:
+        full = os.path.join(model_dir, name)
+        if name.startswith(".") or not os.path.isfile(full):
+            continue   # NL: tijdelijke bestanden (.model.json.tmp) en submappen tellen niet mee
+        st = os.stat(full)
+        stamp.append((name, st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+def stamp_digest(stamp) -> Optional[str]:
+    """NL: Korte hash van een dir_stamp, handig als cachesleutel in JSON."""
+    if stamp is None:
+        return None
+    return hashlib.sha1(repr(stamp).encode("utf-8")).hexdigest()
+
+# ======== NL: opstartcache en timings ========
+
+CACHE_VERSION = 1
+
+def get_cache_path() -> str:
+    """NL: Per-gebruiker cachebestand (buiten de projectmap, want die kan read-only zijn)."""
+    if platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.environ.get("USERPROFILE", ""), "AppData", "Local")
+    elif platform == "darwin":
+        base = os.path.join(os.environ.get("HOME", ""), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.environ.get("HOME", ""), ".cache")
+    return os.path.join(base, "slimme_vuilnisbak", "launcher.json")
+
+class StartupCache:
+    """
+    NL: Klein JSON-bestand met resultaten van vorige starts.
+    Elke waarde bewaart zelf een 'stamp' (mtime/grootte); de aanroeper beslist of die nog klopt.
+    Een kapot of onleesbaar cachebestand is nooit een fout: dan zoeken we gewoon opnieuw.
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: bool = True):
+        self.path = path or get_cache_path()
+        self.enabled = enabled
+        self.data: Dict[str, dict] = {}
+        self.dirty = False
+        if not enabled:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict) and data.get("version") == CACHE_VERSION:
+                self.data = data
+        except (OSError, ValueError):
+            pass
+
+    def get(self, section: str, key: str) -> Optional[dict]:
+        entry = self.data.get(section, {}).get(key)
+        return entry if isinstance(entry, dict) else None
+
+    def put(self, section: str, key: str, value: dict):
+        if self.enabled:
+            self.data.setdefault(section, {})[key] = value
+            self.dirty = True
+
+    def save(self):
+        if not (self.enabled and self.dirty):
+            return
+        self.data["version"] = CACHE_VERSION
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError:
+            pass   # NL: geen schrijfrechten → volgende keer gewoon opnieuw zoeken
+
+class StartupTimings:
+    """NL: Verzamelt de duur van elke opstartstap; --timings drukt het overzicht af."""
+
+    def __init__(self):
+        self.last = STARTUP_T0
+        self.steps: List[Tuple[str, float]] = []
+
+    def mark(self, label: str):
+        now = time.perf_counter()
+        self.steps.append((label, now - self.last))
+        self.last = now
+
+    def report(self):
+        print("⏱ (Timings) Opstarttijd per stap:")
+        for label, dt in self.steps:
+            print(f"   {label:<32} {dt * 1000:8.1f} ms")
+        print(f"   {'totaal':<32} {(self.last - STARTUP_T0) * 1000:8.1f} ms")
+
+# ======== NL: optionele Python-tools ========
+
+TOOLS_DIR_NAME = "6 - Python-tools"
+
+def find_tools_dir() -> Optional[str]:
+    """NL: Map '6 - Python-tools' naast dit script (of in de oudermap), anders None."""
+    for base in (get_script_dir(), os.path.dirname(get_script_dir())):
+        candidate = os.path.join(base, TOOLS_DIR_NAME)
+        if os.path.isdir(candidate):
+            return candidate
+    return None
+
+def import_tool(name: str):
+    """NL: Importeer een module uit de Python-tools; None als die (of een vereiste) ontbreekt."""
+    tools = find_tools_dir()
+    if tools and tools not in sys.path:
+        sys.path.insert(0, tools)
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
 # ======== NL: vinden van de juiste HTML-map ========
 
 HTML_DIR_NAME_CANDIDATES = [
@@ -141,29 +289,102 @@ def find_html_dir_fallback_downloads() -> Optional[str]:
     print("❌ (Zoek) Geen projectmap gevonden in Downloads.")
     return None
 
-def discover_html_dir() -> Optional[str]:
-    """NL: Centrale zoekfunctie. Eerst naast script, dan Downloads."""
+def html_dir_stamp(path: str) -> Optional[list]:
+    """NL: mtime van de map + mtime/grootte van index.html; None als één van beide weg is."""
+    try:
+        st = os.stat(path)
+        idx = os.stat(os.path.join(path, "index.html"))
+    except OSError:
+        return None
+    return [st.st_mtime_ns, idx.st_mtime_ns, idx.st_size]
+
+def discover_html_dir(cache: Optional[StartupCache] = None) -> Optional[str]:
+    """NL: Centrale zoekfunctie. Eerst naast script, dan Downloads (resultaat wordt onthouden)."""
     # Omgevingsvariabele als hard override (optioneel)
     env = os.environ.get("SLIMME_VUILNISBAK_HTML_DIR")
     if env and dir_has_project_files(env):
         print(f"✅ (Zoek) HTML-map via SLIMME_VUILNISBAK_HTML_DIR: {env}")
         return env
 
-    near = find_html_dir_near_script()
-    if near:
-        return near
+    # Vorige start: zelfde scriptmap en de gevonden map is niet gewijzigd → geen scan nodig
+    script_dir = get_script_dir()
+    hit = cache.get("html_dir", script_dir) if cache is not None else None
+    if hit and hit.get("stamp") is not None and html_dir_stamp(hit.get("path", "")) == hit["stamp"]:
+        print(f"⚡ (Zoek) HTML-map uit cache: {hit['path']}")
+        return hit["path"]
 
-    return find_html_dir_fallback_downloads()
+    found = find_html_dir_near_script() or find_html_dir_fallback_downloads()
+    if found and cache is not None:
+        cache.put("html_dir", script_dir, {"path": found, "stamp": html_dir_stamp(found)})
+    return found
 
 # ======== NL: preflight van modelbestanden ========
 
+# NL: bytes per element, ook voor gekwantiseerde opslag (TF.js 'quantization'-veld)
+DTYPE_BYTES = {"float32": 4, "int32": 4, "bool": 1, "uint8": 1, "uint16": 2, "float16": 2}
+
+def manifest_problems(manifest: list) -> Tuple[list, int, dict]:
+    """
+    NL: Controleer weightsManifest inhoudelijk.
+    Geeft (problemen, verwachte bytes, telling per opslagtype) terug.
+    """
+    problems, expected, kinds = [], 0, {}
+    for group in manifest:
+        for spec in group.get("weights", []):
+            name = spec.get("name", "?")
+            quant = spec.get("quantization")
+            stored = quant.get("dtype") if isinstance(quant, dict) else spec.get("dtype")
+            if quant is not None:
+                if stored not in ("uint8", "uint16", "float16"):
+                    problems.append(f"{name}: onbekend kwantisatietype {stored!r}")
+                    continue
+                if stored != "float16" and not all(
+                        isinstance(quant.get(k), (int, float)) for k in ("scale", "min")):
+                    problems.append(f"{name}: scale/min ontbreken voor {stored}")
+                    continue
+            if stored not in DTYPE_BYTES:
+                problems.append(f"{name}: onbekend dtype {stored!r}")
+                continue
+            count = 1
+            for dim in spec.get("shape", []):
+                count *= int(dim)
+            expected += count * DTYPE_BYTES[stored]
+            kinds[stored] = kinds.get(stored, 0) + 1
+    return problems, expected, kinds
+
+def preflight_bundle(model_dir: str) -> bool:
+    """NL: Enkel image_model/model.svmb aanwezig? Controleer de bundel in geheugen."""
+    tm_bundle = import_tool("tm_bundle")
+    if tm_bundle is None:
+        print(f"❌ (Model) model.json ontbreekt en '{TOOLS_DIR_NAME}/tm_bundle.py' is niet gevonden om de bundel te lezen.")
+        return False
+    try:
+        with open(os.path.join(model_dir, tm_bundle.BUNDLE_NAME), "rb") as f:
+            model, metadata, weights = tm_bundle.unpack(f.read())
+        problems, expected, _ = manifest_problems(model.get("weightsManifest", []))
+    except Exception as e:
+        print(f"❌ (Model) Bundel kon niet gelezen worden: {e}")
+        return False
+    if problems:
+        print("❌ (Model) weightsManifest in bundel ongeldig: " + "; ".join(problems[:3]))
+        return False
+    if len(weights) != expected:
+        print(f"❌ (Model) Bundel bevat {len(weights)} bytes weights, manifest verwacht {expected} bytes.")
+        return False
+    print(f"✅ (Model) Gevonden: {tm_bundle.BUNDLE_NAME} (model.json/metadata.json/weights.bin worden in geheugen uitgepakt)")
+    if metadata is None:
+        print("⚠️ (Model) Bundel bevat geen metadata.json (optioneel).")
+    return True
+
 def preflight_model_assets(html_dir: str) -> bool:
-    """NL: Controleer image_model/model.json + eerste weights + metadata.json (optioneel)."""
+    """NL: Controleer image_model/model.json + alle weights (ook gekwantiseerd) + metadata.json (optioneel)."""
     model_dir  = os.path.join(html_dir, "image_model")
     model_json = os.path.join(model_dir, "model.json")
     meta_json  = os.path.join(model_dir, "metadata.json")
 
     if not os.path.exists(model_json):
+        if os.path.exists(os.path.join(model_dir, "model.svmb")):
+            return preflight_bundle(model_dir)
         print("❌ (Model) model.json ontbreekt in image_model/.")
         return False
 
@@ -174,12 +395,31 @@ def preflight_model_assets(html_dir: str) -> bool:
         if not manifest or not manifest[0].get("paths"):
             print("❌ (Model) weightsManifest ontbreekt of is leeg in model.json.")
             return False
-        first_weight_rel = manifest[0]["paths"][0]
-        first_weight_abs = os.path.join(model_dir, first_weight_rel)
-        if not os.path.exists(first_weight_abs):
-            print(f"❌ (Model) Weights ontbreken: {first_weight_rel}")
+
+        actual = 0
+        for group in manifest:
+            for rel in group.get("paths", []):
+                weight_abs = os.path.join(model_dir, rel)
+                if not os.path.exists(weight_abs):
+                    print(f"❌ (Model) Weights ontbreken: {rel}")
+                    return False
+                actual += os.path.getsize(weight_abs)
+
+        problems, expected, kinds = manifest_problems(manifest)
+        if problems:
+            print("❌ (Model) weightsManifest ongeldig: " + "; ".join(problems[:3]))
+            return False
+        if actual != expected:
+            print(f"❌ (Model) Weights hebben {actual} bytes, manifest verwacht {expected} bytes.")
             return False
-        print(f"✅ (Model) Gevonden: model.json + {first_weight_rel}")
+
+        first_weight_rel = manifest[0]["paths"][0]
+        quantized = {k: v for k, v in kinds.items() if k in ("uint8", "uint16", "float16")}
+        if quantized:
+            summary = ", ".join(f"{v}× {k}" for k, v in sorted(quantized.items()))
+            print(f"✅ (Model) Gevonden: model.json + {first_weight_rel} (gekwantiseerd: {summary})")
+        else:
+            print(f"✅ (Model) Gevonden: model.json + {first_weight_rel}")
     except Exception as e:
         print(f"❌ (Model) model.json kon niet gelezen worden: {e}")
         return False
@@ -196,6 +436,495 @@ def preflight_model_assets(html_dir: str) -> bool:
 
     return True
 
+def preflight_cached(html_dir: str, cache: Optional[StartupCache] = None) -> bool:
+    """NL: Preflight overslaan als image_model/ sinds de vorige geslaagde controle niet wijzigde."""
+    model_dir = os.path.join(html_dir, "image_model")
+    stamp = stamp_digest(dir_stamp(model_dir))
+    hit = cache.get("preflight", model_dir) if cache is not None else None
+    if stamp and hit and hit.get("stamp") == stamp and hit.get("ok"):
+        print("⚡ (Model) Preflight uit cache: image_model/ is ongewijzigd sinds de vorige geslaagde controle.")
+        return True
+    ok = preflight_model_assets(html_dir)
+    if ok and stamp and cache is not None:
+        # NL: enkel successen onthouden; een fout moet elke keer de volledige uitleg tonen
+        cache.put("preflight", model_dir, {"stamp": stamp, "ok": True})
+    return ok
+
+# ======== NL: modelregister (alle modellen onder image_model/, hot-swap) ========
+
+REGISTRY_POLL_S = 2.0   # NL: zo vaak kijken we of er een nieuwe export is
+SETTLE_S        = 1.0   # NL: net gewijzigde bestanden eerst laten uitkopiëren
+
+class BlobStore:
+    """
+    NL: Inhoud-geadresseerde opslag (sha256) met referentietelling.
+    Dertig groepen met hetzelfde model = één kopie van de weights in geheugen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blobs: Dict[str, bytes] = {}
+        self._refs: Dict[str, int] = {}
+
+    def intern(self, data: bytes) -> Tuple[str, bytes]:
+        """NL: Geef (digest, gedeelde bytes) terug; identieke inhoud wordt hergebruikt."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            blob = self._blobs.get(digest)
+            if blob is None:
+                blob = self._blobs[digest] = bytes(data)
+                self._refs[digest] = 0
+            self._refs[digest] += 1
+        return digest, blob
+
+    def release(self, digests: Iterable[str]):
+        with self._lock:
+            for digest in digests:
+                self._refs[digest] -= 1
+                if self._refs[digest] <= 0:
+                    self._refs.pop(digest)
+                    self._blobs.pop(digest)
+
+    def stats(self) -> dict:
+        """NL: shared_bytes = bytes die dankzij ontdubbeling nu níet extra in geheugen staan."""
+        with self._lock:
+            shared = sum((self._refs[d] - 1) * len(b) for d, b in self._blobs.items())
+            return {"blobs": len(self._blobs), "bytes": sum(len(b) for b in self._blobs.values()),
+                    "references": sum(self._refs.values()), "shared_bytes": shared}
+
+BLOBS = BlobStore()
+
+class ModelSnapshot:
+    """
+    NL: Gevalideerde, onveranderlijke kopie van één model in geheugen.
+    Lopende downloads houden hun snapshot vast, ook als er ondertussen gewisseld wordt.
+    Alle bytes komen uit BLOBS: identieke modellen (ook in andere groepen) delen hun geheugen.
+    """
+
+    def __init__(self, name: str, model_dir: str, model: dict, shards: Dict[str, bytes],
+                 metadata: Optional[bytes], source: str = "model.json", mtime: float = 0.0):
+        self.name = name
+        self.model_dir = model_dir
+        self.source = source   # NL: waaruit geladen (model.json of model.svmb)
+        self.mtime = mtime     # NL: jongste bronbestand, voor Last-Modified
+        self.model = model
+        self._digests: List[str] = []
+        self.shards = {rel: self._intern(data) for rel, data in shards.items()}
+        self.metadata = self._intern(metadata) if metadata is not None else None
+
+        digest = hashlib.sha256(json.dumps(model, sort_keys=True).encode("utf-8"))
+        for d in self._digests:
+            digest.update(d.encode("ascii"))
+        self.version = digest.hexdigest()[:16]
+        self.n_tensors = sum(len(g.get("weights", [])) for g in model.get("weightsManifest", []))
+
+        # NL: model.json verwijst naar weights van exact deze versie (?v=…)
+        served = dict(model)
+        served["weightsManifest"] = [
+            dict(g, paths=[f"{rel}?v={self.version}" for rel in g.get("paths", [])])
+            for g in model.get("weightsManifest", [])]
+        model_raw = json.dumps(served, separators=(",", ":")).encode("utf-8")
+        import gzip
+        self.files: Dict[str, bytes] = {"model.json": self._intern(model_raw)}
+        self.files.update(self.shards)
+        if self.metadata is not None:
+            self.files["metadata.json"] = self.metadata
+        self.gzip = {"model.json": self._intern(gzip.compress(model_raw, compresslevel=9, mtime=0))}
+        self._bundle: Optional[bytes] = None
+        self._bundle_lock = threading.Lock()
+
+    def _intern(self, data: bytes) -> bytes:
+        digest, blob = BLOBS.intern(data)
+        self._digests.append(digest)
+        return blob
+
+    def release(self):
+        """NL: Snapshot valt uit het register; lopende downloads houden hun eigen referentie."""
+        BLOBS.release(self._digests)
+        self._digests = []
+
+    def bundle(self) -> Optional[bytes]:
+        """NL: .svmb-bundel van deze versie (lui gebouwd; None zonder tm_bundle)."""
+        with self._bundle_lock:
+            if self._bundle is None:
+                tm_bundle = import_tool("tm_bundle")
+                if tm_bundle is None:
+                    return None
+                meta = json.loads(self.metadata.decode("utf-8")) if self.metadata else None
+                weights = b"".join(self.shards[rel] for g in self.model["weightsManifest"]
+                                   for rel in g.get("paths", []))
+                self._bundle = tm_bundle.pack(self.model, weights, meta)
+            return self._bundle
+
+def load_snapshot(name: str, model_dir: str) -> ModelSnapshot:
+    """NL: Lees en valideer een modelmap volledig; ValueError met NL-uitleg bij problemen."""
+    model_json = os.path.join(model_dir, "model.json")
+    bundle_path = os.path.join(model_dir, "model.svmb")
+    # NL: zijn er zowel losse bestanden als een bundel, dan winnen de losse bestanden
+    # (zoals in de preflight); mtimes zeggen niets na kopiëren uit een oude export.
+    use_bundle = os.path.exists(bundle_path) and not os.path.exists(model_json)
+
+    metadata = None
+    source = "model.svmb" if use_bundle else "model.json"
+    used = [bundle_path] if use_bundle else [model_json]
+    if use_bundle:
+        tm_bundle = import_tool("tm_bundle")
+        if tm_bundle is None:
+            raise ValueError("model.svmb gevonden maar tm_bundle.py ontbreekt")
+        with open(bundle_path, "rb") as f:
+            model, meta, weights = tm_bundle.unpack(f.read())
+        shards = {"weights.bin": bytes(weights)}
+        model = dict(model, weightsManifest=[dict(g, paths=["weights.bin"]) for g in model["weightsManifest"]])
+        if meta is not None:
+            metadata = json.dumps(meta, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    else:
+        with open(model_json, "rb") as f:
+            model_raw = f.read()
+        model = json.loads(model_raw.decode("utf-8"))
+        shards = {}
+        for group in model.get("weightsManifest", []):
+            for rel in group.get("paths", []):
+                try:
+                    with open(os.path.join(model_dir, rel), "rb") as f:
+                        shards[rel] = f.read()
+                except OSError:
+                    raise ValueError(f"weights ontbreken: {rel}")
+                used.append(os.path.join(model_dir, rel))
+        if os.path.exists(bundle_path):
+            source = bundle_matches(bundle_path, model_raw, list(shards.values()))
+        meta_json = os.path.join(model_dir, "metadata.json")
+        if os.path.exists(meta_json):
+            with open(meta_json, "rb") as f:
+                metadata = f.read()
+            used.append(meta_json)
+            try:
+                json.loads(metadata.decode("utf-8"))
+            except ValueError:
+                metadata = None   # NL: onleesbaar → zonder metadata verder (zoals preflight)
+
+    manifest = model.get("weightsManifest", [])
+    if not manifest:
+        raise ValueError("weightsManifest ontbreekt of is leeg")
+    problems, expected, _ = manifest_problems(manifest)
+    if problems:
+        raise ValueError("; ".join(problems[:3]))
+    actual = sum(len(b) for b in shards.values())
+    if actual != expected:
+        raise ValueError(f"weights hebben {actual} bytes, manifest verwacht {expected}")
+    mtime = max((os.path.getmtime(p) for p in used if os.path.exists(p)), default=0.0)
+    return ModelSnapshot(name, model_dir, model, shards, metadata, source, mtime)
+
+def bundle_matches(bundle_path: str, model_raw: bytes, shards: List[bytes]) -> str:
+    """NL: Losse bestanden naast een model.svmb: vergelijk op inhoud en zeg welke bron gebruikt wordt."""
+    tm_bundle = import_tool("tm_bundle")
+    folder = os.path.basename(os.path.dirname(bundle_path)) or "image_model"
+    try:
+        with open(bundle_path, "rb") as f:
+            bundled = tm_bundle.bundle_source(f.read()) if tm_bundle is not None else None
+    except (OSError, ValueError) as e:
+        bundled = None
+        print(f"⚠️ (Register) {folder}/model.svmb onleesbaar ({e}); model.json wordt gebruikt.")
+    if bundled is not None and bundled == tm_bundle.source_digest(model_raw, shards):
+        return "model.json (= model.svmb)"
+    print(f"⚠️ (Register) {folder}: model.svmb hoort niet bij model.json + weights; de losse bestanden "
+          f"worden gebruikt. Bouw de bundel opnieuw met tm_bundle.py of verwijder ze.")
+    return "model.json"
+
+def same_weights(a: Optional[ModelSnapshot], b: Optional[ModelSnapshot]) -> bool:
+    """NL: Zelfde weights (manifest + bytes)? Dankzij BLOBS is dat meestal hetzelfde object."""
+    if a is None or b is None:
+        return False
+    specs = lambda snap: [g.get("weights") for g in snap.model.get("weightsManifest", [])]
+    return specs(a) == specs(b) and a.shards == b.shards
+
+class ModelRegistry:
+    """
+    NL: Register van alle modelmappen onder image_model/ ('' = image_model/ zelf,
+    plus submappen zoals Web-Model/ en Arduino-Model/).
+    - Valideert + hasht parallel, maar enkel mappen waarvan (mtime, grootte) wijzigde.
+    - Een nieuwe versie wordt pas actief als ze volledig geldig is; tot dan blijft
+      de vorige versie geserveerd (half gekopieerde exports breken dus niets).
+    - Wisselen = één referentie vervangen; lopende downloads behouden hun snapshot.
+    - Een resolutievariant (tm_resolution.py) hoort bij een basismodel en wordt enkel
+      geserveerd zolang ze dezelfde weights heeft; na een nieuwe export dus het origineel.
+    """
+
+    def __init__(self, html_dir: str, active: str = "", root: Optional[str] = None):
+        self.root = root or os.path.join(html_dir, "image_model")
+        self.active = active
+        self.problems: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._current: Dict[str, ModelSnapshot] = {}
+        self._previous: Dict[str, ModelSnapshot] = {}
+        self._stamps: Dict[str, tuple] = {}
+        self.variants: Dict[str, str] = {}   # NL: basismodel → gekozen resolutievariant
+
+    def model_dirs(self) -> Dict[str, str]:
+        """NL: {naam: map} voor elke map met model.json of model.svmb."""
+        found = {}
+        candidates = [("", self.root)]
+        try:
+            candidates += [(n, os.path.join(self.root, n)) for n in sorted(os.listdir(self.root))
+                           if not n.startswith(".") and os.path.isdir(os.path.join(self.root, n))]
+        except OSError:
+            return found
+        for name, path in candidates:
+            if os.path.exists(os.path.join(path, "model.json")) or os.path.exists(os.path.join(path, "model.svmb")):
+                found[name] = path
+        return found
+
+    def scan(self, quiet: bool = False, settle: float = SETTLE_S) -> List[str]:
+        """NL: Zoek gewijzigde modellen, valideer ze parallel en wissel geldige versies in."""
+        todo = {}
+        now = time.time()
+        for name, path in self.model_dirs().items():
+            stamp = dir_stamp(path)
+            if stamp is None or stamp == self._stamps.get(name):
+                continue   # NL: ongewijzigd → niet opnieuw hashen
+            if any(now - mtime / 1e9 < settle for _, mtime, _ in stamp):
+                continue   # NL: kopiëren nog bezig; volgende ronde opnieuw
+            todo[name] = (path, stamp)
+        if not todo:
+            return []
+
+        import concurrent.futures
+        changed = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(4, len(todo))) as pool:
+            futures = {pool.submit(load_snapshot, name, path): name for name, (path, _) in todo.items()}
+            for fut in concurrent.futures.as_completed(futures):
+                name = futures[fut]
+                label = name or "image_model"
+                self._stamps[name] = todo[name][1]
+                try:
+                    snap = fut.result()
+                except Exception as e:
+                    self.problems[name] = str(e)
+                    keep = " – vorige versie blijft actief" if name in self._current else ""
+                    print(f"⚠️ (Register) {label}: {e}{keep}")
+                    continue
+                with self._lock:
+                    old = self._current.get(name)
+                    if old is not None and old.version == snap.version:
+                        snap.release()
+                        continue
+                    if old is not None:
+                        dropped = self._previous.get(name)
+                        self._previous[name] = old
+                        if dropped is not None:
+                            dropped.release()
+                    self._current[name] = snap
+                self.problems.pop(name, None)
+                changed.append(name)
+                if not quiet or old is not None:
+                    verb = "nieuwe versie actief" if old is not None else "geregistreerd"
+                    print(f"🔄 (Register) {label}: {verb} (v{snap.version[:8]}, {snap.n_tensors} tensors, {snap.source})")
+        for name in changed:
+            variant = self.variants.get(name)
+            if variant is not None and not same_weights(self.get(variant), self.get(name)):
+                print(f"ℹ️ (Resolutie) {variant} is verouderd; {name or 'image_model'} wordt zelf geserveerd "
+                      f"tot tm_resolution.py opnieuw gedraaid heeft.")
+        return changed
+
+    def get(self, name: str) -> Optional[ModelSnapshot]:
+        with self._lock:
+            return self._current.get(name)
+
+    def by_version(self, version: str) -> Optional[ModelSnapshot]:
+        """NL: Huidige óf vorige snapshot met deze versie (voor downloads die net vóór een wissel startten)."""
+        with self._lock:
+            for snap in list(self._current.values()) + list(self._previous.values()):
+                if snap.version == version:
+                    return snap
+        return None
+
+    def resolve(self, rel_path: str) -> Optional[Tuple[ModelSnapshot, str]]:
+        """NL: 'image_model/x' → actief model; 'image_model/Web-Model/x' → dat model."""
+        parts = rel_path.split("/")
+        if not parts or parts[0] != "image_model":
+            return None
+        with self._lock:
+            if len(parts) == 2:
+                snap = self._current.get(self.active)
+                variant = self.variants.get(self.active)
+                if variant is not None and same_weights(self._current.get(variant), snap):
+                    snap = self._current[variant]
+                return (snap, parts[1]) if snap else None
+            if len(parts) == 3 and parts[1] in self._current:
+                return self._current[parts[1]], parts[2]
+        return None
+
+    def set_variant(self, base: str, name: str):
+        """NL: Serveer variant 'name' i.p.v. basismodel 'base' (zolang de weights gelijk blijven)."""
+        with self._lock:
+            self.variants[base] = name
+        print(f"📐 (Resolutie) {base or 'image_model'} wordt geserveerd als {name}")
+
+    def set_active(self, name: str) -> bool:
+        with self._lock:
+            if name not in self._current:
+                return False
+            self.active = name
+        print(f"🔀 (Register) Actief model: {name or 'image_model'}")
+        return True
+
+    def status(self) -> dict:
+        with self._lock:
+            models = {name or "image_model": {"version": snap.version, "tensors": snap.n_tensors,
+                                              "dir": snap.model_dir, "source": snap.source, "problem": self.problems.get(name)}
+                      for name, snap in self._current.items()}
+            active = self.active or "image_model"
+            variant = self.variants.get(self.active)
+            if variant is not None and not same_weights(self._current.get(variant), self._current.get(self.active)):
+                variant = None
+        for name, problem in self.problems.items():
+            models.setdefault(name or "image_model", {"version": None, "problem": problem})
+        return {"active": active, "variant": variant, "models": models}
+
+# ======== NL: klasmodus (meerdere groepen in één server) ========
+
+SESSION_ROUTE = "groep/"
+SESSION_LIMIT = 8        # NL: gelijktijdige requests per groep (een pagina laden ≈ 6)
+SESSION_WAIT_S = 10.0    # NL: zo lang wacht een request op een vrije plaats, daarna 503
+
+def slugify(name: str) -> str:
+    """NL: 'Groep 3 (Lisa)' → 'groep-3-lisa' (veilig in een URL)."""
+    return re.sub(r"[^a-z0-9_-]+", "-", name.lower()).strip("-")
+
+class Session:
+    """
+    NL: Eén groep in klasmodus: eigen projectmap óf enkel een eigen model
+    (dan met de HTML van de leerkracht), eigen modelregister en een eigen limiet.
+    """
+
+    def __init__(self, name: str, html_dir: str, model_root: Optional[str] = None,
+                 limit: Optional[int] = SESSION_LIMIT):
+        self.name = name
+        self.prefix = f"/{SESSION_ROUTE}{name}/" if name else "/"
+        self.html_dir = html_dir
+        self.model_root = model_root
+        self.registry = ModelRegistry(html_dir, root=model_root)
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit) if limit else None
+        self._count_lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def enter(self) -> bool:
+        if self._slots is not None and not self._slots.acquire(timeout=SESSION_WAIT_S):
+            with self._count_lock:
+                self.rejected += 1
+            return False
+        with self._count_lock:
+            self.in_flight += 1
+        return True
+
+    def leave(self):
+        with self._count_lock:
+            self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def directory_for(self, rel_path: str) -> Tuple[str, str]:
+        """NL: (map, pad binnen die map) voor een pad onder de prefix van deze groep."""
+        if self.model_root and (rel_path == "image_model" or rel_path.startswith("image_model/")):
+            return self.model_root, rel_path[len("image_model/"):]
+        return self.html_dir, rel_path
+
+    def status(self) -> dict:
+        doc = self.registry.status()
+        doc.update({"dir": self.model_root or self.html_dir, "limit": self.limit,
+                    "in_flight": self.in_flight, "rejected": self.rejected})
+        return doc
+
+class SessionTable:
+    """NL: Alle groepen van één launcher; '' is de gewone app van de leerkracht."""
+
+    def __init__(self, root: Session):
+        self.sessions: Dict[str, Session] = {"": root}
+        self._stop = threading.Event()
+
+    @property
+    def root(self) -> Session:
+        return self.sessions[""]
+
+    def add(self, session: Session):
+        if session.name in self.sessions:
+            raise ValueError(f"groepsnaam '{session.name}' komt twee keer voor")
+        self.sessions[session.name] = session
+
+    def route(self, rel_path: str) -> Tuple[Optional[Session], str]:
+        """NL: 'groep/a/index.html' → (groep a, 'index.html'); andere paden → leerkracht."""
+        if not rel_path.startswith(SESSION_ROUTE):
+            return self.root, rel_path
+        name, _, rest = rel_path[len(SESSION_ROUTE):].partition("/")
+        return self.sessions.get(name) if name else None, rest
+
+    def scan_all(self, quiet: bool = False, settle: float = SETTLE_S):
+        for session in list(self.sessions.values()):
+            session.registry.scan(quiet=quiet, settle=settle)
+
+    def status(self) -> dict:
+        return {"sessions": {name or "(leerkracht)": s.status() for name, s in self.sessions.items()},
+                "blobs": BLOBS.stats(), "assets": ASSET_CACHE.stats()}
+
+    def start_watching(self, interval: float = REGISTRY_POLL_S) -> "SessionTable":
+        """NL: Eén watcher-thread voor alle groepen (niet één per groep)."""
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.scan_all()
+                except Exception as e:   # NL: de watcher mag nooit de server stoppen
+                    print(f"⚠️ (Register) Scan mislukt: {e}")
+        threading.Thread(target=loop, name="model-watch", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+def sessions_from_args(html_dir: str, groups: List[str], groups_dir: Optional[str],
+                       limit: int) -> SessionTable:
+    """
+    NL: --groep NAAM=MAP (herhaalbaar) en/of --groepen MAP (elke submap = één groep).
+    Een map met index.html is een volledig project; anders moet ze een model bevatten
+    (model.json/model.svmb, of een image_model/-submap) en krijgt ze de HTML van de leerkracht.
+    """
+    table = SessionTable(Session("", html_dir, limit=None))
+    pairs = []
+    for spec in groups:
+        name, sep, path = spec.partition("=")
+        if not sep:
+            name, path = os.path.basename(os.path.normpath(spec)), spec
+        pairs.append((name, path))
+    if groups_dir:
+        pairs += [(n, os.path.join(groups_dir, n)) for n in sorted(os.listdir(groups_dir))
+                  if not n.startswith(".") and os.path.isdir(os.path.join(groups_dir, n))]
+
+    for name, path in pairs:
+        slug = slugify(name)
+        path = os.path.abspath(path)
+        if not slug:
+            raise ValueError(f"ongeldige groepsnaam: {name!r}")
+        if dir_has_project_files(path):
+            table.add(Session(slug, path, limit=limit))
+        elif os.path.isdir(os.path.join(path, "image_model")):
+            table.add(Session(slug, html_dir, model_root=os.path.join(path, "image_model"), limit=limit))
+        elif any(os.path.exists(os.path.join(path, n)) for n in ("model.json", "model.svmb")):
+            table.add(Session(slug, html_dir, model_root=path, limit=limit))
+        else:
+            print(f"⚠️ (Klas) {path}: geen index.html en geen model gevonden – groep overgeslagen.")
+    return table
+
+def lan_address() -> str:
+    """NL: IP-adres van deze laptop op het klasnetwerk (er wordt niets verstuurd)."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(("10.255.255.255", 1))
+        return s.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
+    finally:
+        s.close()
+
 # ======== NL: browser + server ========
 
 def find_chrome_spec() -> Optional[str]:
@@ -219,6 +948,7 @@ def find_chrome_spec() -> Optional[str]:
 
 def open_url(url: str):
     """NL: Open URL in Chrome indien mogelijk; anders standaardbrowser."""
+    import webbrowser   # NL: pas hier laden; de server luistert dan al
     chrome_spec = find_chrome_spec()
     if chrome_spec:
         try:
@@ -230,6 +960,7 @@ def open_url(url: str):
     # macOS extra fallback
     if platform == "darwin":
         try:
+            import subprocess
             subprocess.run(["/usr/bin/open", "-a", "Google Chrome", url], check=False)
             return
         except Exception:
@@ -249,20 +980,911 @@ def find_free_port(start=8000, end=8100) -> int:
             s.close()
     raise RuntimeError("Geen vrije poort gevonden tussen 8000 en 8100.")
 
-def start_server(html_dir: str, port: int) -> Optional[subprocess.Popen]:
-    """NL: Start http.server in de HTML-map."""
+# ======== NL: metrics (/metrics) ========
+
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+METRICS_ROUTE = "metrics"            # NL: GET = uitlezen, POST = rapport van een pagina
+METRICS_MAX_ASSETS = 256             # NL: daarboven komt alles onder "(overig)"
+METRICS_MAX_CLIENTS = 200
+METRICS_MAX_REPORT = 256 * 1024      # NL: bytes per rapport
+METRICS_MAX_SAMPLES = 2000           # NL: metingen per lijst per rapport
+METRICS_LOG_S = 60.0                 # NL: zo vaak een serverregel in het logbestand
+METRICS_LOG_BYTES = 1024 * 1024
+METRICS_LOG_KEEP = 5                 # NL: metrics.log.1 … .5
+
+# NL: vanaf hier noemt /metrics een onderdeel als mogelijk knelpunt
+SLOW_CLASSIFY_MS = 200.0
+SLOW_MODEL_LOAD_MS = 15000.0
+SLOW_CAMERA_MS = 5000.0
+SLOW_SERIAL_MS = 50.0
+
+def get_metrics_log_path() -> str:
+    return os.path.join(os.path.dirname(get_cache_path()), "metrics.log")
+
+class Histogram:
+    """NL: Vaste buckets in ms (zoals Prometheus); Metrics houdt het slot vast."""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """NL: Bovengrens van de bucket waarin het q-kwantiel valt (nooit boven het maximum)."""
+        if not self.count:
+            return None
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= q * self.count:
+                bound = min(LATENCY_BUCKETS_MS[i], self.max) if i < len(LATENCY_BUCKETS_MS) else self.max
+                return round(bound, 1)
+        return round(self.max, 1)
+
+    def as_dict(self) -> dict:
+        doc = {"count": self.count, "sum_ms": round(self.sum, 1), "max_ms": round(self.max, 1)}
+        for q in (50, 90, 99):
+            doc[f"p{q}_ms"] = self.quantile(q / 100)
+        return doc
+
+    def prometheus(self, name: str, labels: dict) -> List[str]:
+        lines, total = [], 0
+        for bound, n in zip(list(LATENCY_BUCKETS_MS) + ["+Inf"], self.counts):
+            total += n
+            lines.append(f"{name}_bucket{prom_labels(dict(labels, le=bound))} {total}")
+        lines.append(f"{name}_sum{prom_labels(labels)} {self.sum:.3f}")
+        lines.append(f"{name}_count{prom_labels(labels)} {self.count}")
+        return lines
+
+def prom_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels.items()) + "}"
+
+def report_number(value) -> Optional[float]:
+    """NL: Getal uit een rapport van de pagina, of None (rapporten zijn niet te vertrouwen)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    try:
+        value = float(value)
+    except OverflowError:   # NL: bv. een geheel getal met honderden cijfers
+        return None
+    return value if 0 <= value < 1e9 else None
+
+class Metrics:
+    """
+    NL: Wat de server zelf meet (requests, bytes en latentie per bestand) plus wat de
+    pagina's terugsturen (laadtijd model, FPS, classificatie- en seriële latentie, fouten).
+    Uit te lezen op /metrics (Prometheus-tekst) of /metrics?format=json.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.assets: Dict[Tuple[str, str], dict] = {}
+        self.clients: Dict[str, dict] = {}
+        self.totals = {"model_load_ms": Histogram(), "classify_ms": Histogram(), "serial_write_ms": Histogram()}
+        self.log = None
+
+    # NL: ---- server ----
+
+    def record_request(self, group: str, asset: str, status: int, nbytes: int, ms: float):
+        if asset.startswith(BUNDLE_ROUTE):
+            asset = BUNDLE_ROUTE + "*.svmb"   # NL: één regel voor alle versies
+        with self._lock:
+            key = (group, asset)
+            entry = self.assets.get(key)
+            if entry is None:
+                if len(self.assets) >= METRICS_MAX_ASSETS:
+                    key = (group, "(overig)")
+                entry = self.assets.setdefault(key, {"requests": 0, "bytes": 0, "status": {}, "latency": Histogram()})
+            entry["requests"] += 1
+            entry["bytes"] += nbytes
+            entry["status"][status] = entry["status"].get(status, 0) + 1
+            entry["latency"].observe(ms)
+
+    # NL: ---- pagina's ----
+
+    def record_client(self, doc: dict, group: str, address: str):
+        """NL: Eén rapport van sketch.js verwerken; ValueError als het geen rapport is."""
+        if not isinstance(doc, dict):
+            raise ValueError("rapport moet een JSON-object zijn")
+        client = re.sub(r"[^\w.-]+", "-", str(doc.get("client") or address))[:64]
+        samples = {}
+        for key in ("classify_ms", "serial_write_ms"):
+            values = doc.get(key) if isinstance(doc.get(key), list) else []
+            samples[key] = [v for v in map(report_number, values[:METRICS_MAX_SAMPLES]) if v is not None]
+        load_ms = report_number(doc.get("model_load_ms"))
+        now = time.time()
+
+        with self._lock:
+            entry = self.clients.get(client)
+            if entry is None:
+                if len(self.clients) >= METRICS_MAX_CLIENTS:
+                    oldest = min(self.clients, key=lambda c: self.clients[c]["last_seen"])
+                    del self.clients[oldest]
+                entry = self.clients[client] = {
+                    "reports": 0, "frames": 0, "serial_errors": 0, "classify_errors": 0,
+                    "fps": None, "model_load_ms": None, "model_source": None, "camera_ms": None,
+                    "classify_ms": Histogram(), "serial_write_ms": Histogram(),
+                }
+            entry.update(group=group, address=address, last_seen=now,
+                         ua=str(doc.get("ua", ""))[:200], backend=str(doc.get("backend", ""))[:20],
+                         cores=int(report_number(doc.get("cores")) or 0), camera_ready=bool(doc.get("camera_ready")))
+            entry["reports"] += 1
+            for key in ("frames", "serial_errors", "classify_errors"):
+                entry[key] += int(report_number(doc.get(key)) or 0)
+            for key in ("fps", "camera_ms"):
+                value = report_number(doc.get(key))
+                if value is not None:
+                    entry[key] = value
+            if load_ms is not None:   # NL: de pagina stuurt een laadtijd maar één keer per model
+                entry["model_load_ms"] = load_ms
+                entry["model_source"] = str(doc.get("model_source", ""))[:20]
+                self.totals["model_load_ms"].observe(load_ms)
+            report = {key: Histogram() for key in samples}
+            for key, values in samples.items():
+                for v in values:
+                    entry[key].observe(v)
+                    self.totals[key].observe(v)
+                    report[key].observe(v)
+
+        if self.log is not None:
+            self._write_log({"type": "client", "client": client, "address": address, "group": group,
+                             "fps": report_number(doc.get("fps")), "frames": doc.get("frames"),
+                             "model_load_ms": load_ms, "camera_ms": report_number(doc.get("camera_ms")),
+                             "classify_p50_ms": report["classify_ms"].quantile(0.5),
+                             "classify_p90_ms": report["classify_ms"].quantile(0.9),
+                             "serial_write_p90_ms": report["serial_write_ms"].quantile(0.9),
+                             "serial_errors": doc.get("serial_errors"), "classify_errors": doc.get("classify_errors")})
+
+    @staticmethod
+    def problems(entry: dict) -> List[str]:
+        """NL: Eenvoudige diagnose per toestel: model, camera of seriële verbinding."""
+        found = []
+        if (entry["classify_ms"].quantile(0.9) or 0) > SLOW_CLASSIFY_MS:
+            found.append("model: classificeren traag")
+        if (entry["model_load_ms"] or 0) > SLOW_MODEL_LOAD_MS:
+            found.append("model: laden traag")
+        if not entry["camera_ready"] or (entry["camera_ms"] or 0) > SLOW_CAMERA_MS:
+            found.append("camera: niet of traag gestart")
+        if entry["serial_errors"] or (entry["serial_write_ms"].quantile(0.9) or 0) > SLOW_SERIAL_MS:
+            found.append("serieel: fouten of trage writes")
+        return found
+
+    # NL: ---- uitlezen ----
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        with self._lock:
+            assets = [{"group": g, "asset": a, "requests": e["requests"], "bytes": e["bytes"],
+                       "status": {str(k): v for k, v in sorted(e["status"].items())},
+                       "latency_ms": e["latency"].as_dict()}
+                      for (g, a), e in self.assets.items()]
+            clients = []
+            for client, e in sorted(self.clients.items()):
+                doc = {k: v for k, v in e.items() if not isinstance(v, Histogram)}
+                doc.update(client=client, last_seen_s=round(now - e["last_seen"], 1),
+                           classify_ms=e["classify_ms"].as_dict(), serial_write_ms=e["serial_write_ms"].as_dict(),
+                           problemen=self.problems(e))
+                del doc["last_seen"]
+                clients.append(doc)
+            totals = {k: h.as_dict() for k, h in self.totals.items()}
+        assets.sort(key=lambda d: -d["bytes"])
+        return {"uptime_s": round(now - self.started, 1), "assets": assets, "clients": clients, "totals": totals}
+
+    def prometheus(self) -> str:
+        out = ["# TYPE sv_uptime_seconds gauge", f"sv_uptime_seconds {time.time() - self.started:.1f}"]
+
+        def family(name: str, kind: str, rows: List[str]):
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(rows)
+
+        with self._lock:
+            assets = sorted(self.assets.items())
+            family("sv_http_requests_total", "counter",
+                   [f"sv_http_requests_total{prom_labels({'group': g, 'asset': a, 'status': s})} {n}"
+                    for (g, a), e in assets for s, n in sorted(e["status"].items())])
+            family("sv_http_sent_bytes_total", "counter",
+                   [f"sv_http_sent_bytes_total{prom_labels({'group': g, 'asset': a})} {e['bytes']}"
+                    for (g, a), e in assets])
+            family("sv_http_request_duration_ms", "histogram",
+                   [line for (g, a), e in assets
+                    for line in e["latency"].prometheus("sv_http_request_duration_ms", {"group": g, "asset": a})])
+
+            clients = sorted(self.clients.items())
+            family("sv_client_info", "gauge",
+                   [f"sv_client_info{prom_labels({'client': c, 'address': e['address'], 'group': e['group'], 'backend': e['backend'], 'cores': e['cores'], 'ua': e['ua']})} 1"
+                    for c, e in clients])
+            family("sv_client_last_report_timestamp_seconds", "gauge",
+                   [f"sv_client_last_report_timestamp_seconds{prom_labels({'client': c})} {e['last_seen']:.0f}"
+                    for c, e in clients])
+            for key, name in (("fps", "sv_client_fps"), ("model_load_ms", "sv_client_model_load_ms"),
+                              ("camera_ms", "sv_client_camera_start_ms")):
+                family(name, "gauge", [f"{name}{prom_labels({'client': c})} {e[key]:.1f}"
+                                       for c, e in clients if e[key] is not None])
+            for key in ("frames", "classify_errors", "serial_errors"):
+                name = f"sv_client_{key}_total"
+                family(name, "counter", [f"{name}{prom_labels({'client': c})} {e[key]}" for c, e in clients])
+            for key in ("classify_ms", "serial_write_ms"):
+                name = f"sv_client_{key}"
+                family(name, "histogram", [line for c, e in clients
+                                           for line in e[key].prometheus(name, {"client": c})])
+            family("sv_model_load_ms", "histogram", self.totals["model_load_ms"].prometheus("sv_model_load_ms", {}))
+        return "\n".join(out) + "\n"
+
+    # NL: ---- logbestand ----
+
+    def _write_log(self, doc: dict):
+        doc = dict(doc, t=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        self.log.info(json.dumps(doc, ensure_ascii=False, separators=(",", ":")))
+
+    def start_log(self, path: str, interval: float = METRICS_LOG_S) -> bool:
+        """NL: Rapporten + elke `interval` s een serveroverzicht naar een roterend logbestand."""
+        import logging.handlers   # NL: pas laden als er gelogd wordt
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(path, maxBytes=METRICS_LOG_BYTES,
+                                                           backupCount=METRICS_LOG_KEEP, encoding="utf-8")
+        except OSError as e:
+            print(f"⚠️ (Metrics) Logbestand niet beschikbaar ({e}); enkel /metrics.")
+            return False
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("slimme_vuilnisbak.metrics")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        self.log = logger
+
+        def loop():
+            last = None
+            while True:
+                time.sleep(interval)
+                with self._lock:
+                    assets = {f"{g}/{a}" if g else a: [e["requests"], e["bytes"], e["latency"].quantile(0.9)]
+                              for (g, a), e in sorted(self.assets.items())}
+                if assets != last:   # NL: geen regels als er niets gebeurd is
+                    self._write_log({"type": "server", "assets": assets, "clients": len(self.clients)})
+                    last = assets
+        threading.Thread(target=loop, name="metrics-log", daemon=True).start()
+        return True
+
+METRICS = Metrics()
+
+# ======== NL: ingebouwde asset-server (ETag, gzip/brotli, Range, sendfile) ========
+
+COMPRESSIBLE_EXTS = {".html", ".htm", ".js", ".css", ".json", ".svg", ".txt", ".map"}
+MIN_COMPRESS_SIZE = 1024          # NL: kleinere bestanden loont comprimeren niet
+SENDFILE_CHUNK    = 1024 * 1024   # NL: max. bytes per sendfile-aanroep
+
+class AssetCache:
+    """
+    NL: Thread-veilige cache per bestand, gesleuteld op (pad, mtime, grootte).
+    Bewaart de sterke ETag (sha1 van de inhoud) en de gecomprimeerde varianten,
+    zodat elk bestand maar één keer gehasht en gecomprimeerd wordt tot het wijzigt.
+    Inhoud-geadresseerd: hetzelfde p5.min.js in tien groepsmappen = één gecomprimeerde kopie.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+        self._by_digest: Dict[str, dict] = {}
+        self._refs: Dict[str, int] = {}
+        self._build_locks: Dict[str, threading.Lock] = {}   # NL: enkel zolang er gebouwd wordt
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._build_locks.get(key)
+            if lock is None:
+                lock = self._build_locks[key] = threading.Lock()
+            return lock
+
+    def get(self, path: str, st: os.stat_result) -> dict:
+        """NL: Geef {'etag', 'gzip', 'br'} voor dit bestand; (her)bouw enkel bij wijziging."""
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            hit = self._entries.get(path)
+        if hit and hit[0] == stamp:
+            return hit[1]
+
+        # NL: per bestand één bouwer tegelijk; andere threads wachten op het resultaat
+        lock = self._key_lock(path)
+        try:
+            with lock:
+                return self._get_locked(path, stamp)
+        finally:
+            with self._lock:
+                # NL: slot opruimen, anders groeit de dict met elk ooit geserveerd bestand;
+                # wie nog wacht, heeft zijn referentie al en vindt daarna de nieuwe entry
+                if self._build_locks.get(path) is lock:
+                    del self._build_locks[path]
+
+    def _get_locked(self, path: str, stamp: Tuple[int, int]) -> dict:
+        with self._lock:
+            hit = self._entries.get(path)
+        if hit and hit[0] == stamp:
+            return hit[1]
+        digest = self._digest(path)
+        with self._lock:
+            entry = self._by_digest.get(digest)
+        if entry is None:
+            entry = self._build(path, digest)
+        with self._lock:
+            entry = self._by_digest.setdefault(digest, entry)
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+            old = self._entries.get(path)
+            self._entries[path] = (stamp, entry)
+            if old is not None:
+                self._forget(old[1]["etag"])
+        return entry
+
+    def _forget(self, digest: str):
+        self._refs[digest] -= 1
+        if self._refs[digest] <= 0:
+            del self._refs[digest]
+            del self._by_digest[digest]
+
+    def stats(self) -> dict:
+        with self._lock:
+            variants = sum(len(e["gzip"] or b"") + len(e["br"] or b"") for e in self._by_digest.values())
+            return {"files": len(self._entries), "unique": len(self._by_digest), "compressed_bytes": variants}
+
+    @staticmethod
+    def _digest(path: str) -> str:
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(SENDFILE_CHUNK), b""):
+                digest.update(chunk)
+        return digest.hexdigest()[:20]
+
+    @staticmethod
+    def _build(path: str, digest: str) -> dict:
+        entry = {"etag": digest, "gzip": None, "br": None}
+
+        ext = os.path.splitext(path)[1].lower()
+        if ext in COMPRESSIBLE_EXTS and os.path.getsize(path) >= MIN_COMPRESS_SIZE:
+            import gzip
+            with open(path, "rb") as f:
+                raw = f.read()
+            gz = gzip.compress(raw, compresslevel=9, mtime=0)
+            if len(gz) < len(raw):
+                entry["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(raw, quality=11)
+                if len(br) < len(raw):
+                    entry["br"] = br
+        return entry
+
+ASSET_CACHE = AssetCache()
+
+BUNDLE_ROUTE = "_bundles/"
+OFFLINE_DIR = "offline/"                  # NL: uitvoer van 6 - Python-tools/tm_offline.py
+OFFLINE_ASSETS = OFFLINE_DIR + "assets/"
+
+def cache_control_for(rel_path: str) -> str:
+    """NL: Cachebeleid: alles met een inhoudshash is onveranderlijk; de rest hervalideren via ETag."""
+    if rel_path.startswith(BUNDLE_ROUTE) or rel_path.startswith(OFFLINE_ASSETS):
+        return "public, max-age=31536000, immutable"
+    return "no-cache"
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    NL: Parse één bytes-range ('bytes=a-b', 'bytes=a-', 'bytes=-n').
+    Geeft (start, eind) inclusief terug, of None als de range onbruikbaar is.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    spec = header[len("bytes="):].strip()
+    start_s, sep, end_s = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if start_s == "":
+            length = int(end_s)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+def etag_matches(header: str, etag: str) -> bool:
+    """NL: If-None-Match/If-Range vergelijken (W/-prefix wordt genegeerd)."""
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.replace("W/", "", 1) == etag:
+            return True
+    return False
+
+class AssetRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """NL: Statische bestanden met sterke ETags, 304, gzip/brotli, Range en sendfile."""
+
+    protocol_version = "HTTP/1.1"   # NL: keep-alive, minder TCP-handshakes per pagina
+    extensions_map = dict(http.server.SimpleHTTPRequestHandler.extensions_map, **{
+        ".js": "application/javascript",
+        ".json": "application/json",
+        ".bin": "application/octet-stream",
+        ".wasm": "application/wasm",
+    })
+
+    def do_GET(self):
+        self._dispatch(self._serve, head_only=False)
+
+    def do_HEAD(self):
+        self._dispatch(self._serve, head_only=True)
+
+    def do_POST(self):
+        self._dispatch(self._post)
+
+    def send_response(self, code, message=None):
+        self._status, self._length = code, 0
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == "content-length":
+            self._length = int(value)
+        super().send_header(keyword, value)
+
+    def _dispatch(self, method, **kwargs):
+        """NL: Voer het request uit en noteer status, verstuurde bytes en duur voor /metrics."""
+        t0 = time.perf_counter()
+        self.session, self._asset, self._status, self._length = None, "", 0, 0
+        try:
+            self._route(method, **kwargs)
+        finally:
+            sent = 0 if self.command == "HEAD" or self._status == 304 else self._length
+            METRICS.record_request(self.session.name if self.session is not None else "", self._asset,
+                                   self._status, sent, (time.perf_counter() - t0) * 1000)
+
+    def _route(self, method, **kwargs):
+        """NL: Kies de groep (prefix /groep/<naam>/), bewaak haar limiet en voer het request uit."""
+        sessions = getattr(self.server, "sessions", None)
+        raw_path, sep, query = self.path.split("#", 1)[0].partition("?")
+        rel_path = urllib.parse.unquote(raw_path).lstrip("/")
+        self.session, rest = sessions.route(rel_path) if sessions is not None else (None, rel_path)
+        self._asset = rest
+        if sessions is not None and self.session is None:
+            self.send_error(404, "Onbekende groep")
+            return
+        if self.session is not None:
+            if rel_path == SESSION_ROUTE + self.session.name:
+                self.send_response(301)   # NL: relatieve paden in index.html hebben de slash nodig
+                self.send_header("Location", self.session.prefix)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            # NL: vanaf hier ziet de rest van de handler enkel de map van deze groep
+            self.directory, rest = self.session.directory_for(rest)
+            self.path = "/" + urllib.parse.quote(rest) + sep + query
+            if not self.session.enter():
+                self.send_response(503)
+                self.send_header("Retry-After", "2")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        try:
+            method(**kwargs)
+        finally:
+            if self.session is not None:
+                self.session.leave()
+
+    def _post(self):
+        rel_req, _, query = self.path.lstrip("/").partition("?")
+        if rel_req in (METRICS_ROUTE, OFFLINE_DIR + METRICS_ROUTE):
+            self._post_metrics()
+            return
+        # NL: enkel vanop de leerkrachtlaptop zelf: actief model wisselen
+        registry = self.session.registry if self.session is not None else None
+        if rel_req != "_models/active" or registry is None:
+            self.send_error(404, "Onbekend endpoint")
+            return
+        if self.client_address[0] not in ("127.0.0.1", "::1"):
+            self.send_error(403, "Enkel vanaf localhost")
+            return
+        name = urllib.parse.parse_qs(query).get("name", [""])[0]
+        name = "" if name == "image_model" else name
+        if not registry.set_active(name):
+            self.send_error(404, "Model niet gevonden in register")
+            return
+        self._send_json(registry.status())
+
+    def _post_metrics(self):
+        """NL: Rapport van sketch.js (elke 10 s): enkel bijhouden, nooit iets terugsturen."""
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if not 0 < length <= METRICS_MAX_REPORT:
+            self.send_error(413 if length > 0 else 400, "Rapport ontbreekt of is te groot")
+            return
+        try:
+            doc = json.loads(self.rfile.read(length).decode("utf-8"))
+            METRICS.record_client(doc, self.session.name if self.session is not None else "",
+                                  self.client_address[0])
+        except (ValueError, OverflowError, RecursionError) as e:   # NL: ook UnicodeDecodeError, ongeldige of te diep geneste JSON
+            self.send_error(400, f"Ongeldig rapport: {e}")
+            return
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_metrics(self, query: str, head_only: bool):
+        """NL: Prometheus-tekst, of JSON met ?format=json (of Accept: application/json)."""
+        fmt = urllib.parse.parse_qs(query).get("format", [""])[0]
+        if fmt == "json" or (not fmt and "application/json" in self.headers.get("Accept", "")):
+            self._send_json(METRICS.snapshot(), head_only)
+            return
+        body = METRICS.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def _serve(self, head_only: bool):
+        rel_req, _, query = self.path.split("#", 1)[0].partition("?")
+        rel_req = urllib.parse.unquote(rel_req).lstrip("/")
+        session = self.session
+        registry = session.registry if session is not None else None
+        if session is not None and session.model_root and self.directory == session.model_root:
+            rel_req = "image_model/" + rel_req   # NL: modelmap van een groep, zelfde register-paden
+
+        if rel_req == METRICS_ROUTE:
+            self._send_metrics(query, head_only)
+            return
+        if session is not None and not session.name and rel_req == "_sessies":
+            self._send_json(self.server.sessions.status(), head_only)
+            return
+        if registry is not None and rel_req == "_models":
+            self._send_json(session.status(), head_only)
+            return
+        if registry is not None and rel_req.startswith(BUNDLE_ROUTE):
+            version = rel_req[len(BUNDLE_ROUTE):].split(".", 1)[0]
+            snap = registry.by_version(version)
+            data = snap.bundle() if snap else None
+            if data is None:
+                self.send_error(404, "Bundel niet (meer) beschikbaar")
+                return
+            self._send_memory(data, version, "application/octet-stream", rel_req, head_only, mtime=snap.mtime)
+            return
+
+        hit = registry.resolve(rel_req) if registry is not None else None
+        if hit is not None:
+            snap, name = hit
+            if name == "model.svmb" and snap.bundle() is not None:
+                # NL: vaste naam → onveranderlijke URL op versie (inhoudshash)
+                self.send_response(302)
+                self.send_header("Location", f"{session.prefix}{BUNDLE_ROUTE}{snap.version}.svmb")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            wanted = urllib.parse.parse_qs(query).get("v", [None])[0]
+            if wanted and wanted != snap.version:
+                # NL: download gestart vóór een wissel → zelfde versie afmaken
+                snap = registry.by_version(wanted) or snap
+            if name in snap.files:
+                body = snap.files[name]
+                gz = snap.gzip.get(name)
+                if gz is not None and not self.headers.get("Range") and \
+                        "gzip" in self.headers.get("Accept-Encoding", ""):
+                    self._send_memory(gz, f"{snap.version}-{name}-gzip", self.guess_type(name),
+                                      rel_req, head_only, encoding="gzip", mtime=snap.mtime)
+                else:
+                    self._send_memory(body, f"{snap.version}-{name}", self.guess_type(name),
+                                      rel_req, head_only, vary=gz is not None, mtime=snap.mtime)
+                return
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if not self.path.split("?", 1)[0].endswith("/") or not os.path.isfile(index):
+                # NL: redirect/mappenlijst laten we aan http.server over
+                return super().do_HEAD() if head_only else super().do_GET()
+            path = index
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self.send_error(404, "Bestand niet gevonden")
+            return
+
+        with f:
+            st = os.fstat(f.fileno())
+            entry = ASSET_CACHE.get(path, st)
+            rel = os.path.relpath(path, self.directory).replace(os.sep, "/")
+
+            encoding, body = None, None
+            range_hdr = self.headers.get("Range")
+            if not range_hdr:
+                accept = self.headers.get("Accept-Encoding", "")
+                if entry["br"] is not None and "br" in accept:
+                    encoding, body = "br", entry["br"]
+                elif entry["gzip"] is not None and "gzip" in accept:
+                    encoding, body = "gzip", entry["gzip"]
+            etag = '"%s%s"' % (entry["etag"], "-" + encoding if encoding else "")
+
+            inm = self.headers.get("If-None-Match")
+            if inm and etag_matches(inm, etag):
+                self.send_response(304)
+                self._common_headers(etag, rel, entry)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            if body is not None:
+                self.send_response(200)
+                self._common_headers(etag, rel, entry)
+                self.send_header("Content-Type", self.guess_type(path))
+                self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Last-Modified", self.date_time_string(int(st.st_mtime)))
+                self.end_headers()
+                if not head_only:
+                    self.wfile.write(body)
+                return
+
+            size = st.st_size
+            rng = self._byte_range(size, etag, lambda: self._common_headers(etag, rel, entry))
+            if rng is None:
+                return
+            status, start, end = rng
+
+            length = end - start + 1 if size else 0
+            self.send_response(status)
+            self._common_headers(etag, rel, entry)
+            self._range_headers(status, start, end, size, st.st_mtime)
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Length", str(length))
+            self.end_headers()
+            if head_only or length == 0:
+                return
+            # NL: zero-copy: kernel kopieert direct van bestand naar socket
+            self.wfile.flush()
+            try:
+                self.connection.sendfile(f, start, length)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # NL: client haakte af (bv. herladen)
+
+    def _byte_range(self, size: int, etag: str, common) -> Optional[Tuple[int, int, int]]:
+        """
+        NL: (status, begin, eind) voor Range/If-Range: 200 met alles of 206 met één stuk.
+        Bij een onbruikbare range is 416 al verstuurd (common() zet ETag e.d.) → None.
+        """
+        range_hdr = self.headers.get("Range")
+        if range_hdr and size > 0:
+            if_range = self.headers.get("If-Range")
+            if not if_range or etag_matches(if_range, etag):
+                rng = parse_range(range_hdr, size)
+                if rng is None:
+                    self.send_response(416)
+                    common()
+                    self.send_header("Content-Range", "bytes */%d" % size)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return None
+                return (206,) + rng
+        return 200, 0, size - 1
+
+    def _range_headers(self, status: int, start: int, end: int, size: int, mtime: float):
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", "bytes %d-%d/%d" % (start, end, size))
+        if mtime:
+            self.send_header("Last-Modified", self.date_time_string(int(mtime)))
+
+    def _send_memory(self, body, etag: str, ctype: str, rel: str, head_only: bool,
+                     encoding: Optional[str] = None, vary: bool = False, mtime: float = 0.0):
+        """NL: Antwoord uit geheugen (modelregister of bundel) met ETag/304 en (zonder encoding) Range."""
+        etag = f'"{etag}"'
+
+        def common():
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control_for(rel))
+            if encoding or vary:
+                self.send_header("Vary", "Accept-Encoding")
+
+        inm = self.headers.get("If-None-Match")
+        if inm and etag_matches(inm, etag):
+            self.send_response(304)
+            common()
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        status, start, end = 200, 0, len(body) - 1
+        if not encoding:
+            rng = self._byte_range(len(body), etag, common)
+            if rng is None:
+                return
+            status, start, end = rng
+        view = memoryview(body)[start:end + 1]   # NL: zonder kopie
+        self.send_response(status)
+        common()
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+            if mtime:
+                self.send_header("Last-Modified", self.date_time_string(int(mtime)))
+        else:
+            self._range_headers(status, start, end, len(body), mtime)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(view)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(view)
+
+    def _send_json(self, doc: dict, head_only: bool = False):
+        body = json.dumps(doc, ensure_ascii=False, indent=1).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def _common_headers(self, etag: str, rel: str, entry: dict):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control_for(rel))
+        if entry["gzip"] is not None or entry["br"] is not None:
+            self.send_header("Vary", "Accept-Encoding")
+
+class ClassroomHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # NL: een hele klas die tegelijk herlaadt
+
+class AssetServer:
+    """NL: Ingebouwde ThreadingHTTPServer in een achtergrondthread (zelfde API als Popen)."""
+
+    def __init__(self, html_dir: str, port: int, sessions: Optional[SessionTable] = None):
+        handler = lambda *a, **kw: AssetRequestHandler(*a, directory=html_dir, **kw)
+        self.httpd = ClassroomHTTPServer(("", port), handler)
+        self.httpd.sessions = sessions
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="asset-server", daemon=True)
+
+    def start(self) -> "AssetServer":
+        self.thread.start()
+        return self
+
+    def wait(self):
+        # NL: korte joins zodat Ctrl+C ook op Windows doorkomt
+        while self.thread.is_alive():
+            self.thread.join(0.5)
+
+    def terminate(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def start_server(html_dir: str, port: int, simple: bool = False,
+                 sessions: Optional[SessionTable] = None):
+    """NL: Start de ingebouwde asset-server (of klassiek http.server met simple=True)."""
     try:
         print(f"🚀 Start lokale server in: {html_dir} (poort {port})")
-        # Start met cwd=html_dir zodat relatieve paden (image_model/…) kloppen
-        return subprocess.Popen([sys.executable, "-m", "http.server", str(port)], cwd=html_dir)
+        if simple:
+            import subprocess
+            # Start met cwd=html_dir zodat relatieve paden (image_model/…) kloppen
+            return subprocess.Popen([sys.executable, "-m", "http.server", str(port)], cwd=html_dir)
+        if brotli is None:
+            print("ℹ️ (Server) Module 'brotli' niet gevonden: enkel gzip-compressie.")
+        return AssetServer(html_dir, port, sessions).start()
     except Exception as e:
         print(f"❌ Kon de HTTP-server niet starten: {e}")
         return None
 
 # ======== NL: main ========
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """NL: Opties voor de launcher (allemaal optioneel; dubbelklikken blijft werken)."""
+    ap = argparse.ArgumentParser(description="Start de Slimme Vuilnisbak lokaal.")
+    ap.add_argument("--simpel", action="store_true",
+                    help="gebruik 'python -m http.server' i.p.v. de ingebouwde caching-server")
+    ap.add_argument("--model", default="", metavar="NAAM",
+                    help="submap van image_model/ die als standaardmodel geserveerd wordt (bv. Web-Model)")
+    ap.add_argument("--watch", type=float, default=REGISTRY_POLL_S, metavar="SEC",
+                    help="om de hoeveel seconden image_model/ op nieuwe exports gecontroleerd wordt (0 = uit)")
+    ap.add_argument("--timings", action="store_true",
+                    help="toon hoe lang elke opstartstap duurde")
+    ap.add_argument("--offline", action="store_true",
+                    help="open de offline-build (offline/, gemaakt met tm_offline.py) i.p.v. index.html")
+    ap.add_argument("--geen-cache", action="store_true",
+                    help="negeer de opstartcache en zoek/controleer alles opnieuw")
+    ap.add_argument("--groep", action="append", default=[], metavar="NAAM=MAP",
+                    help="klasmodus: serveer MAP (project of enkel een model) op /groep/NAAM/ (herhaalbaar)")
+    ap.add_argument("--groepen", metavar="MAP",
+                    help="klasmodus: elke submap van MAP wordt een groep (bv. de ingeleverde exports)")
+    ap.add_argument("--max-verbindingen", type=int, default=SESSION_LIMIT, metavar="N",
+                    help="gelijktijdige requests per groep (standaard %(default)s)")
+    ap.add_argument("--resolutie", default="uit", metavar="auto|uit|PX",
+                    help="resolutievariant uit tm_resolution.py: 'uit' (standaard) serveert het origineel, "
+                         "een vaste resolutie (bv. 160), of 'auto': kiest via een korte tijdsmeting in Python. "
+                         "Dat is een ruwe schatting: de pagina rekent met TF.js in de browser (vaak WebGL).")
+    ap.add_argument("--metrics-log", default=None, metavar="PAD",
+                    help="roterend logbestand voor /metrics (standaard naast de opstartcache; '' = niet loggen)")
+    return ap.parse_args(argv)
+
+def pick_resolution(registry: ModelRegistry, choice: str) -> Optional[str]:
+    """
+    NL: Resolutievariant (6 - Python-tools/tm_resolution.py) voor het actieve model, of None.
+    Enkel varianten met dezelfde weights als het basismodel tellen: na een nieuwe export
+    zijn oude varianten verouderd tot tm_resolution.py opnieuw gedraaid heeft.
+    """
+    if choice == "uit":
+        return None
+    tm_resolution = import_tool("tm_resolution")
+    report = tm_resolution.load_report(registry.root) if tm_resolution is not None else None
+    base = registry.active
+    entry = (report or {}).get("models", {}).get(base)
+    if not entry:
+        if choice != "auto":
+            print(f"⚠️ (Resolutie) Geen varianten voor {base or 'image_model'}; maak ze met '{TOOLS_DIR_NAME}/tm_resolution.py'.")
+        return None
+    base_snap = registry.get(base)
+    fresh = [row for row in entry["variants"] if same_weights(registry.get(row["name"]), base_snap)]
+    if len(fresh) < len(entry["variants"]):
+        print(f"ℹ️ (Resolutie) {len(entry['variants']) - len(fresh)} variant(en) verouderd of ontbrekend; "
+              f"draai tm_resolution.py opnieuw na een nieuwe export.")
+    if not fresh:
+        return None
+    if choice == "auto":
+        probe = tm_resolution.timing_probe_ms()
+        name, est = tm_resolution.choose_variant(dict(entry, variants=fresh), probe)
+        print(f"📐 (Resolutie) Tijdsmeting {probe:.1f} ms (bij het meten {entry['probe_ms']:.1f} ms) → "
+              f"{name or 'image_model'}, ±{est:.0f} ms per beeld")
+    else:
+        match = [row["name"] for row in fresh if str(row["size"]) == choice.strip().lower().replace("px", "")]
+        if not match:
+            sizes = ", ".join(str(row["size"]) for row in fresh)
+            print(f"⚠️ (Resolutie) Geen variant '{choice}' (beschikbaar: {sizes}); het origineel blijft actief.")
+            return None
+        name = match[0]
+    return name if name != base else None
+
+def start_registries(sessions: SessionTable, args: argparse.Namespace,
+                     timings: Optional[StartupTimings] = None):
+    """NL: Modelregisters vullen op de achtergrond; tot dan serveert de server gewoon van schijf."""
+    def fill():
+        t0 = time.perf_counter()
+        sessions.scan_all(quiet=True, settle=0)
+        status = sessions.root.registry.status()
+        print(f"📚 (Register) {len(status['models'])} model(len): " + ", ".join(sorted(status["models"])))
+        if args.model and not sessions.root.registry.set_active(args.model):
+            print(f"⚠️ (Register) Model '{args.model}' niet gevonden; gebruik image_model/.")
+        variant = pick_resolution(sessions.root.registry, args.resolutie)
+        if variant is not None:
+            sessions.root.registry.set_variant(sessions.root.registry.active, variant)
+        if len(sessions.sessions) > 1:
+            blobs = BLOBS.stats()
+            print(f"👥 (Klas) {len(sessions.sessions) - 1} groep(en) geladen: {blobs['bytes'] / 1e6:.1f} MB in geheugen, "
+                  f"{blobs['shared_bytes'] / 1e6:.1f} MB bespaard door identieke bestanden te delen.")
+        if timings is not None:
+            print(f"⏱ (Timings) Modelregister gevuld op de achtergrond in {(time.perf_counter() - t0) * 1000:.1f} ms")
+        if args.watch > 0:
+            sessions.start_watching(args.watch)
+
+    threading.Thread(target=fill, name="model-scan", daemon=True).start()
+
 def main():
-    html_dir = discover_html_dir()
+    args = parse_args()
+    timings = StartupTimings()
+    timings.mark("Python-imports")
+    cache = StartupCache(enabled=not args.geen_cache)
+
+    html_dir = discover_html_dir(cache)
+    timings.mark("HTML-map zoeken")
     if not html_dir:
         print("\n❌ Stop: kon de map met index.html niet vinden.")
         print("💡 Tip: Zorg dat dit .py-bestand naast ‘4 - HTML-bestanden/’ staat, of zet env-var:")
@@ -275,19 +1897,54 @@ def main():
         sys.exit(1)
 
     # Preflight – handig om studenten meteen duidelijke NL-feedback te geven
-    ok = preflight_model_assets(html_dir)
+    ok = preflight_cached(html_dir, cache)
     if not ok:
         print("⚠️ Ga verder: de site kan laden, maar het model zal niet starten tot image_model/ compleet is.")
+    cache.save()
+    timings.mark("preflight")
+
+    # Groepen (klasmodus) + modelregisters; alles in één serverproces
+    sessions = None
+    if not args.simpel:
+        try:
+            sessions = sessions_from_args(html_dir, args.groep, args.groepen, args.max_verbindingen)
+        except (OSError, ValueError) as e:
+            print(f"❌ (Klas) Groepen konden niet ingesteld worden: {e}")
+            sys.exit(1)
+    elif args.groep or args.groepen:
+        print("⚠️ (Klas) --groep/--groepen werken niet met --simpel; enkel de gewone app wordt geserveerd.")
 
     # Kies vrije poort, start server, open pagina
     port = find_free_port(8000, 8100)
-    server = start_server(html_dir, port)
+    server = start_server(html_dir, port, simple=args.simpel, sessions=sessions)
     if not server:
         sys.exit(1)
+    timings.mark("server luistert")
+
+    # Modelregister: alle modellen onder image_model/, met hot-swap bij een nieuwe export
+    if sessions is not None:
+        start_registries(sessions, args, timings if args.timings else None)
+        log_path = get_metrics_log_path() if args.metrics_log is None else args.metrics_log
+        if log_path and not METRICS.start_log(log_path):
+            log_path = ""
+        print(f"📈 (Metrics) http://localhost:{port}/{METRICS_ROUTE}" + (f" · log: {log_path}" if log_path else ""))
+        if len(sessions.sessions) > 1:
+            host = lan_address()
+            for name in sorted(n for n in sessions.sessions if n):
+                print(f"👥 (Klas) {name}: http://{host}:{port}{sessions.sessions[name].prefix}")
 
     url = f"http://localhost:{port}/index.html"
+    if args.offline:
+        if os.path.exists(os.path.join(html_dir, OFFLINE_DIR, "index.html")):
+            url = f"http://localhost:{port}/{OFFLINE_DIR}"
+            print("📴 Offline-build: na het eerste bezoek laden app en model zonder netwerk.")
+        else:
+            print(f"⚠️ Geen offline-build gevonden; maak ze met '{TOOLS_DIR_NAME}/tm_offline.py'. Open gewone versie.")
     print("💡 Opmerking: gebruik http://localhost (niet file://) i.v.m. CORS/serieel/camera.")
     open_url(url)
+    timings.mark("browser openen")
+    if args.timings:
+        timings.report()
 
     # Blokkeer tot user stopt (Ctrl+C)
     print("⏹ Druk Ctrl+C in deze terminal om te stoppen.")
@@ -295,6 +1952,8 @@ def main():
         server.wait()
     except KeyboardInterrupt:
         print("\n🛑 Stoppen op verzoek…")
+        if sessions is not None:
+            sessions.stop()
         server.terminate()
 
 if __name__ == "__main__":
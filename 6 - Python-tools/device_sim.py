@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gesimuleerde borden (pty) voor Slimme Vuilnisbak
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Een pty gedraagt zich als een seriële poort: een tool opent het pad van de
+simulator (bv. /dev/pts/7) alsof het /dev/ttyACM0 is, de simulator leest aan
+de andere kant en reageert zoals de echte firmware:
+- MicrobitSim: zoals Slimme_Vuilnisbak_MicroBit-main.py – per lus van 5 ms
+  alles wat klaarstaat lezen, enkel de nieuwste code telt.
+- ArduinoSim: zoals 2_Dan_Dit_Uploaden.ino – per lus van 3 ms alle beschikbare
+  tekens, met een 🔔-regel als antwoord op elke code.
+Beide kennen het volgnummer-protocol: '#<seq>:<code>' wordt na het schakelen
+bevestigd met '@<seq>:<code>'. De Arduino kent ook de stille binaire modus
+('!B': 1 byte per opdracht, 1 byte bevestiging, geen logging; '!T' = terug).
+
+Een pty heeft zelf geen snelheid; de simulator rekent daarom de draad na:
+bytes komen pas binnen na 10 bittijden per byte (--baud), en antwoorden gaan
+even traag naar buiten via een zendbuffer van 64 bytes – is die vol, dan
+blokkeert de lus, net zoals Serial.print op een echte kaart.
+Elke simulator houdt bij wanneer welke code effectief toegepast werd
+(events), zodat benchmarks de latentie tot op de "LED" kunnen meten.
+
+Enkel Linux/macOS (pty). Gebruik:
+    python device_sim.py --microbit 1 --arduino 1    # toont de paden, Ctrl+C stopt
+"""
+
+import os
+import sys
+import time
+import select
+import argparse
+import threading
+import collections
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import pty
+    import tty
+except ImportError:   # NL: Windows heeft geen pty
+    pty = tty = None
+
+MICROBIT_KEYS = "1234"
+BAUD = 115200
+TX_BUFFER = 64   # NL: zendbuffer van de kaart (Arduino Uno: 64 bytes)
+CMD_OFF = 0x80   # NL: binaire modus – zie 2_Dan_Dit_Uploaden.ino
+CMD_ALL_ON = 0xC0
+NAK = 0xFE
+
+class BoardSim(threading.Thread):
+    """NL: Basis: pty openen, periodiek lezen, codes toepassen en tijdstempelen."""
+
+    kind = "bord"
+    loop_ms = 10
+
+    def __init__(self, name: Optional[str] = None, loop_ms: Optional[float] = None,
+                 stall_ms: float = 0.0, baud: int = BAUD, proc_ms: float = 0.0):
+        if pty is None:
+            raise RuntimeError("pty ontbreekt: de simulatoren werken enkel op Linux/macOS.")
+        super().__init__(name=name or self.kind, daemon=True)
+        self.master, slave = pty.openpty()
+        tty.setraw(slave)
+        self.path = os.ttyname(slave)
+        self._slave = slave
+        if loop_ms is not None:
+            self.loop_ms = loop_ms
+        self.stall_ms = stall_ms            # NL: extra traagheid per lus (trage/overbelaste kaart)
+        self.proc_ms = proc_ms              # NL: verwerkingstijd per toegepaste code (bv. servo)
+        self.byte_s = 10.0 / baud if baud else 0.0   # NL: start + 8 databits + stop; 0 = oneindig snel
+        self.state = "0"
+        self.events: List[Tuple[float, str]] = []   # NL: (perf_counter, toegepaste code)
+        self.rx_bytes = 0
+        self.tx_bytes = 0
+        self.tx_blocked_s = 0.0             # NL: tijd dat de lus wachtte op een volle zendbuffer
+        self._halt = threading.Event()
+        self._lock = threading.Lock()
+        self._rx_wire = collections.deque()  # NL: [start, bytes] die nog "over de draad" komen
+        self._rx_line_free = 0.0
+        self._tx_free = 0.0
+        self._tx_queue = collections.deque()  # NL: (tijdstip laatste byte, bytes)
+        self._tx_wake = threading.Event()
+        self._in_seq = False
+        self._seq_acc = 0
+        self._seq_next: Optional[int] = None
+        self._in_ctrl = False
+        self._helpers = [threading.Thread(target=self._rx_pump, daemon=True, name=f"{self.name}-rx"),
+                         threading.Thread(target=self._tx_pump, daemon=True, name=f"{self.name}-tx")]
+
+    def start(self):
+        for helper in self._helpers:
+            helper.start()
+        super().start()
+
+    def run(self):
+        while not self._halt.is_set():
+            t0 = time.perf_counter()
+            self.loop_once()
+            spent = time.perf_counter() - t0
+            time.sleep(max(0.0, (self.loop_ms + self.stall_ms) / 1000 - spent))
+
+    # ---- NL: draadmodel ----
+
+    def _rx_pump(self):
+        """NL: Bytes van de host meteen (met tijdstempel) van de pty halen; de baudrate bepaalt wanneer ze 'aankomen'."""
+        while not self._halt.is_set():
+            try:
+                if not select.select([self.master], [], [], 0.05)[0]:
+                    continue
+                data = os.read(self.master, 4096)
+            except (OSError, ValueError):
+                return
+            if not data:
+                continue
+            now = time.perf_counter()
+            with self._lock:
+                start = max(now, self._rx_line_free)
+                self._rx_line_free = start + len(data) * self.byte_s
+                self._rx_wire.append([start, data])
+
+    def _tx_pump(self):
+        """NL: Antwoorden op de pty zetten zodra hun laatste byte over de draad is."""
+        while not self._halt.is_set():
+            if not self._tx_queue:
+                self._tx_wake.wait(0.05)
+                self._tx_wake.clear()
+                continue
+            due, data = self._tx_queue[0]
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(min(wait, 0.05))
+                continue
+            self._tx_queue.popleft()
+            try:
+                os.write(self.master, data)
+            except OSError:
+                pass
+
+    def read_available(self) -> bytes:
+        """NL: Alles wat volgens de baudrate al binnen is (zoals Serial.available())."""
+        now = time.perf_counter()
+        out = []
+        with self._lock:
+            while self._rx_wire:
+                seg = self._rx_wire[0]
+                start, data = seg
+                n = len(data) if not self.byte_s else min(len(data), int((now - start) / self.byte_s))
+                if n <= 0:
+                    break
+                out.append(data[:n])
+                if n < len(data):
+                    seg[0], seg[1] = start + n * self.byte_s, data[n:]
+                    break
+                self._rx_wire.popleft()
+        data = b"".join(out)
+        self.rx_bytes += len(data)
+        return data
+
+    def send(self, data: bytes):
+        """NL: Zoals Serial.print: aan baudrate naar buiten; past het niet in de zendbuffer, dan blokkeert de lus."""
+        now = time.perf_counter()
+        if self.byte_s:
+            block_until = self._tx_free - (TX_BUFFER - len(data)) * self.byte_s
+            if block_until > now:
+                time.sleep(block_until - now)
+                self.tx_blocked_s += block_until - now
+                now = time.perf_counter()
+            self._tx_free = max(self._tx_free, now) + len(data) * self.byte_s
+            due = self._tx_free
+        else:
+            due = now
+        self.tx_bytes += len(data)
+        self._tx_queue.append((due, data))
+        self._tx_wake.set()
+
+    def reply(self, text: str):
+        self.send((text + "\r\n").encode("utf-8"))
+
+    def ack(self, seq: Optional[int], code: str):
+        if seq is not None:
+            self.send(f"@{seq}:{code}\n".encode("ascii", "replace"))
+
+    # ---- NL: protocol ----
+
+    def parse(self, data: bytes) -> List[Tuple[str, Optional[int]]]:
+        """NL: Bytes → [(code, volgnummer of None)], met dezelfde toestandsmachine als de firmware.
+        Stuurtekens komen terug als '!B'/'!T', binaire opdrachten als één teken vanaf chr(0x80)."""
+        codes = []
+        for b in data:
+            if b >= CMD_OFF:
+                codes.append((chr(b), None))
+                continue
+            if self._in_ctrl:
+                self._in_ctrl = False
+                codes.append(("!" + chr(b), None))
+                continue
+            if b == 33:                   # NL: '!'
+                self._in_ctrl = True
+                continue
+            if b in (10, 13):
+                self._in_seq, self._seq_next = False, None
+                continue
+            if b == 35:                   # NL: '#'
+                self._in_seq, self._seq_acc, self._seq_next = True, 0, None
+                continue
+            if self._in_seq:
+                if 48 <= b <= 57:
+                    self._seq_acc = (self._seq_acc * 10 + b - 48) & 0xFFFF   # NL: uint16 zoals op de Arduino
+                    continue
+                self._in_seq = False
+                if b == 58:               # NL: ':'
+                    self._seq_next = self._seq_acc
+                    continue
+            if b > 32:
+                codes.append((chr(b), self._seq_next))
+                self._seq_next = None
+        return codes
+
+    def apply(self, code: str):
+        self.state = code
+        self.events.append((time.perf_counter(), code))
+        if self.proc_ms:
+            time.sleep(self.proc_ms / 1000)
+
+    def loop_once(self):
+        raise NotImplementedError
+
+    def stop(self):
+        self._halt.set()
+        self.join(1.0)
+        for helper in self._helpers:
+            helper.join(1.0)
+        for fd in (self.master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+class MicrobitSim(BoardSim):
+    """NL: Per lus alles lezen wat klaarstaat en enkel de nieuwste code toepassen (zoals de firmware)."""
+
+    kind = "microbit"
+    loop_ms = 5
+
+    def loop_once(self):
+        codes = self.parse(self.read_available())
+        if not codes:
+            return
+        codes = [(c, seq) for c, seq in codes if not c.startswith("!") and c < chr(CMD_OFF)]
+        if not codes:
+            return
+        code, seq = codes[-1]
+        if code == "X" or code in MICROBIT_KEYS:
+            self.apply(code)
+        else:
+            self.apply("0")   # NL: onbekend → alles uit
+        self.ack(seq, code)
+
+class ArduinoSim(BoardSim):
+    """NL: Teken per teken, alles wat beschikbaar is per lus (zoals Serial.available()).
+    De pinnen volgen setExclusive/allOn/allOff uit de sketch."""
+
+    kind = "arduino"
+    loop_ms = 3
+    slots = 4
+
+    def __init__(self, *args, verbose: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.verbose = verbose
+        self.quiet = False            # NL: binaire modus
+        self.pins = [0] * self.slots
+        self.pin_writes = 0
+
+    # NL: toestandsmachine van de sketch
+    def all_off(self):
+        self._write_pins([0] * self.slots)
+        self.apply("0")
+
+    def all_on(self):
+        self._write_pins([1] * self.slots)
+        self.apply("X")
+
+    def set_exclusive(self, slot: int):
+        self._write_pins([int(i + 1 == slot) for i in range(self.slots)])
+        self.apply(str(slot))
+
+    def _write_pins(self, values: List[int]):
+        self.pins = values
+        self.pin_writes += self.slots   # NL: de sketch schrijft telkens alle pinnen
+
+    def binary(self, b: int):
+        if b == CMD_OFF:
+            self.all_off()
+        elif b == CMD_ALL_ON:
+            self.all_on()
+        elif CMD_OFF < b <= CMD_OFF + self.slots:
+            self.set_exclusive(b - CMD_OFF)
+        else:
+            self.send(bytes([NAK]))
+            return
+        self.send(bytes([b]))
+
+    def loop_once(self):
+        for c, seq in self.parse(self.read_available()):
+            if c.startswith("!"):
+                if c in ("!B", "!T"):
+                    self.quiet = c == "!B"
+                    self.reply(c)
+                continue
+            if ord(c) >= CMD_OFF:
+                self.binary(ord(c))
+                continue
+            if c == "0":
+                self.say("🔔 (Arduino) Code '0' → alles uit.")
+                self.all_off()
+            elif c in "Xx9":
+                self.say("🔔 (Arduino) Code 'X/9' → alles aan.")
+                self.all_on()
+            elif "1" <= c <= "8":
+                if int(c) <= self.slots:
+                    self.say(f"🔔 (Arduino) Slot {c} → exclusief aan.")
+                    self.set_exclusive(int(c))
+                else:
+                    self.say("⚠️ (Arduino) Slot buiten bereik → genegeerd.")
+            else:
+                self.say(f"⚠️ (Arduino) Onbekend teken: {c}")
+            self.ack(seq, c)
+
+    def say(self, text: str):
+        if self.verbose and not self.quiet:
+            self.reply(text)
+
+SIMULATORS = {"microbit": MicrobitSim, "arduino": ArduinoSim}
+
+def start_sims(kinds: Sequence[str], stall_ms: Sequence[float] = (), **options) -> List[BoardSim]:
+    """NL: Start één simulator per soort in kinds (optioneel met extra traagheid per simulator).
+    Extra opties (baud, proc_ms, loop_ms, ...) gaan naar elke simulator."""
+    sims = []
+    for i, kind in enumerate(kinds):
+        stall = stall_ms[i] if i < len(stall_ms) else 0.0
+        sim = SIMULATORS[kind](name=f"{kind}-{i + 1}", stall_ms=stall, **options)
+        sim.start()
+        sims.append(sim)
+    return sims
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Start gesimuleerde micro:bit/Arduino-borden op pty's.")
+    ap.add_argument("--microbit", type=int, default=1, help="aantal micro:bit-simulatoren")
+    ap.add_argument("--arduino", type=int, default=1, help="aantal Arduino-simulatoren")
+    ap.add_argument("--traag", type=float, default=0.0, metavar="MS",
+                    help="extra vertraging per lus voor alle simulatoren")
+    ap.add_argument("--baud", type=int, default=BAUD, help="gesimuleerde baudrate (0 = oneindig snel)")
+    ap.add_argument("--verwerking", type=float, default=0.0, metavar="MS",
+                    help="verwerkingstijd per toegepaste code")
+    args = ap.parse_args(argv)
+
+    kinds = ["microbit"] * args.microbit + ["arduino"] * args.arduino
+    try:
+        sims = start_sims(kinds, [args.traag] * len(kinds), baud=args.baud, proc_ms=args.verwerking)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    for sim in sims:
+        print(f"🔌 {sim.name}: {sim.path}")
+    print("⏹ Ctrl+C om te stoppen.")
+    last = [None] * len(sims)
+    try:
+        while True:
+            time.sleep(0.2)
+            for i, sim in enumerate(sims):
+                if sim.state != last[i]:
+                    print(f"💡 {sim.name}: toestand {sim.state}")
+                    last[i] = sim.state
+    except KeyboardInterrupt:
+        for sim in sims:
+            sim.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Latentie tot op de LED: volgnummers + bevestigingen (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Stuurt codes als '#<seq>:<code>\\n' en wacht op '@<seq>:<code>' van het bord
+(de firmware antwoordt pas ná het schakelen). Meet per code de tijd van
+write tot bevestiging en telt:
+- samengevoegd: geen bevestiging, maar een latere code wel (de micro:bit past
+  bewust enkel de nieuwste code toe),
+- verloren: geen bevestiging en ook geen latere,
+- omgewisseld: een bevestiging die na een hoger volgnummer binnenkomt,
+- fout: bevestiging met een andere code dan verstuurd.
+
+Tegen een echt bord of tegen de pty-simulator (device_sim.py) met instelbare
+baudrate, verwerkingstijd en logging. --matrix zet de scenario's naast elkaar,
+zo zie je of de seriële lijn, de logging van de firmware of de kaart zelf de
+flessenhals is. (De pagina zelf meet je in de browser: zie README, 'sv_trace'.)
+
+Gebruik:
+    python latency_trace.py --demo arduino --matrix
+    python latency_trace.py --demo microbit --interval 2 --baud 9600
+    python latency_trace.py /dev/ttyACM0 --aantal 300        # echt bord (Windows: COM3)
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import device_sim
+from serial_bridge import SerialLink, BAUD
+
+ACK_RE = re.compile(rb"@(\d+):(\S)")
+CODES = "1234X0"
+SEQ_MOD = 65536   # NL: volgnummer is een uint16 op de Arduino
+SETTLE_S = 1.0    # NL: na de laatste code nog zo lang wachten op bevestigingen
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+class AckReader(threading.Thread):
+    """NL: Leest alles wat het bord terugstuurt en noteert (tijd, seq, code) per bevestiging."""
+
+    def __init__(self, link: SerialLink):
+        super().__init__(daemon=True, name="acks")
+        self.link = link
+        self.acks: List[tuple] = []
+        self.other_bytes = 0
+        self._halt = threading.Event()
+
+    def run(self):
+        buf = b""
+        while not self._halt.is_set():
+            try:
+                data = self.link.read(0.05)
+            except (OSError, ValueError):
+                return
+            if not data:
+                continue
+            now = time.perf_counter()
+            buf += data
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                m = ACK_RE.match(line.strip())
+                if m:
+                    self.acks.append((now, int(m.group(1)), m.group(2).decode("ascii", "replace")))
+                else:
+                    self.other_bytes += len(line) + 1
+
+    def stop(self):
+        self._halt.set()
+        self.join(1.0)
+
+def trace(link: SerialLink, count: int, interval_ms: float, seed_codes: str = CODES) -> Dict:
+    """NL: Stuur count codes met volgnummer en koppel de bevestigingen."""
+    reader = AckReader(link)
+    reader.start()
+    time.sleep(0.05)
+    sent = []   # NL: (seq, code, t_write)
+    write_s = []
+    for i in range(count):
+        seq = i % SEQ_MOD
+        code = seed_codes[(i * 7 + i // 3) % len(seed_codes)]
+        t0 = time.perf_counter()
+        link.write(f"#{seq}:{code}\n".encode("ascii"))
+        t1 = time.perf_counter()
+        write_s.append(t1 - t0)
+        sent.append((seq, code, t0))
+        if interval_ms:
+            time.sleep(max(0.0, interval_ms / 1000 - (time.perf_counter() - t0)))
+    # NL: wachten tot de laatste bevestigd is (of SETTLE_S zonder nieuws)
+    deadline = time.perf_counter() + SETTLE_S
+    last_seen = len(reader.acks)
+    while time.perf_counter() < deadline:
+        if reader.acks and reader.acks[-1][1] == sent[-1][0]:
+            break
+        time.sleep(0.01)
+        if len(reader.acks) != last_seen:
+            last_seen = len(reader.acks)
+            deadline = time.perf_counter() + SETTLE_S
+    reader.stop()
+    return summarize(sent, reader.acks, write_s, reader.other_bytes)
+
+def ack_epochs(acks: list) -> List[int]:
+    """
+    NL: Per bevestiging de ronde (aantal keer dat seq al rondgegaan is): sent[i] heeft
+    ronde i // SEQ_MOD. Een sprong terug van meer dan een halve ronde = nieuwe ronde;
+    een sprong vooruit van meer dan een halve ronde = late bevestiging uit de vorige.
+    """
+    epochs, epoch, last = [], 0, None
+    for _, seq, _ in acks:
+        if last is not None and seq < last - SEQ_MOD // 2:
+            epoch += 1
+        elif last is not None and seq > last + SEQ_MOD // 2:
+            epochs.append(epoch - 1)
+            continue
+        epochs.append(epoch)
+        last = seq
+    return epochs
+
+def summarize(sent: list, acks: list, write_s: List[float], other_bytes: int = 0) -> Dict:
+    index = {(i // SEQ_MOD, seq): i for i, (seq, _, _) in enumerate(sent)}
+    acked_at: Dict[int, float] = {}
+    reordered = mismatched = duplicates = 0
+    highest = -1
+    for (t, seq, code), epoch in zip(acks, ack_epochs(acks)):
+        i = index.get((epoch, seq))
+        if i is None:
+            continue
+        if i in acked_at:
+            duplicates += 1
+            continue
+        acked_at[i] = t
+        if i < highest:
+            reordered += 1
+        highest = max(highest, i)
+        if code != sent[i][1]:
+            mismatched += 1
+    latencies = [(acked_at[i] - sent[i][2]) * 1000 for i in sorted(acked_at)]
+    last_acked = max(acked_at) if acked_at else -1
+    missing = [i for i in range(len(sent)) if i not in acked_at]
+    superseded = sum(1 for i in missing if i < last_acked)
+    return {
+        "sent": len(sent),
+        "acked": len(acked_at),
+        "superseded": superseded,
+        "lost": len(missing) - superseded,
+        "reordered": reordered,
+        "mismatched": mismatched,
+        "duplicates": duplicates,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies) if latencies else float("nan"),
+        "write_p99_ms": percentile([s * 1000 for s in write_s], 99),
+        "log_bytes": other_bytes,
+    }
+
+def run_demo(kind: str, count: int, interval_ms: float, baud: int, proc_ms: float = 0.0,
+             stall_ms: float = 0.0, logging: bool = True) -> Dict:
+    """NL: Eén meting tegen een verse simulator."""
+    options = {"baud": baud, "proc_ms": proc_ms}
+    if kind == "arduino":
+        options["verbose"] = logging
+    sim = device_sim.start_sims([kind], [stall_ms], **options)[0]
+    link = SerialLink(sim.path)
+    try:
+        result = trace(link, count, interval_ms)
+    finally:
+        link.close()
+        sim.stop()
+    result["tx_blocked_ms"] = sim.tx_blocked_s * 1000
+    return result
+
+def matrix(kind: str, count: int, interval_ms: float, proc_ms: float) -> List[tuple]:
+    """NL: Dezelfde reeks onder verschillende omstandigheden: wat kost elke schakel?"""
+    scenarios = [("standaard 115200", dict(baud=BAUD)),
+                 ("oneindig snelle lijn", dict(baud=0)),
+                 ("trage lijn 9600", dict(baud=9600))]
+    if kind == "arduino":
+        scenarios.append(("zonder logging", dict(baud=BAUD, logging=False)))
+    scenarios.append((f"verwerking +{proc_ms:g} ms", dict(baud=BAUD, proc_ms=proc_ms)))
+    return [(title, run_demo(kind, count, interval_ms, **opts)) for title, opts in scenarios]
+
+def print_rows(rows: Sequence[tuple]):
+    print("   scenario                 p50     p90     p99     max   bevestigd  samengev.  verloren  omgew.  fout")
+    for title, r in rows:
+        print(f"   {title:<22} {r['p50_ms']:>6.1f}  {r['p90_ms']:>6.1f}  {r['p99_ms']:>6.1f}  {r['max_ms']:>6.1f}"
+              f"   {r['acked']:>5}/{r['sent']:<5} {r['superseded']:>6}  {r['lost']:>8}  {r['reordered']:>6}"
+              f"  {r['mismatched']:>4}")
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Meet de latentie van code tot LED via volgnummers en bevestigingen.")
+    ap.add_argument("path", nargs="?", help="seriële poort van een echt bord (bv. /dev/ttyACM0, COM3)")
+    ap.add_argument("--demo", choices=sorted(device_sim.SIMULATORS), help="meet tegen een pty-simulator")
+    ap.add_argument("--aantal", type=int, default=200, help="aantal codes")
+    ap.add_argument("--interval", type=float, default=10.0, metavar="MS", help="tijd tussen codes (0 = burst)")
+    ap.add_argument("--baud", type=int, default=BAUD, help="baudrate (simulator: 0 = oneindig snel)")
+    ap.add_argument("--verwerking", type=float, default=0.0, metavar="MS",
+                    help="simulator: verwerkingstijd per code")
+    ap.add_argument("--traag", type=float, default=0.0, metavar="MS", help="simulator: extra tijd per lus")
+    ap.add_argument("--stil", action="store_true", help="simulator: Arduino zonder 🔔-logging")
+    ap.add_argument("--matrix", action="store_true", help="simulator: alle scenario's naast elkaar")
+    ap.add_argument("--out", help="resultaten als JSON bewaren")
+    args = ap.parse_args(argv)
+
+    if not args.path and not args.demo:
+        print("❌ Geef een seriële poort op of gebruik --demo microbit|arduino.")
+        sys.exit(1)
+
+    try:
+        if args.path:
+            link = SerialLink(args.path, args.baud)
+            time.sleep(2.0)   # NL: veel borden herstarten bij het openen van de poort
+            try:
+                rows = [(args.path, trace(link, args.aantal, args.interval))]
+            finally:
+                link.close()
+        elif args.matrix:
+            rows = matrix(args.demo, args.aantal, args.interval, args.verwerking or 5.0)
+        else:
+            rows = [(args.demo, run_demo(args.demo, args.aantal, args.interval, args.baud, args.verwerking,
+                                         args.traag, logging=not args.stil))]
+    except (OSError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"⏱️ {args.aantal} codes, interval {args.interval:g} ms (latentie = write → bevestiging, in ms)")
+    print_rows(rows)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({title: r for title, r in rows}, f, indent=2)
+        print(f"💾 Resultaten bewaard: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Latentietest voor de micro:bit-firmware, zonder micro:bit (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Draait Slimme_Vuilnisbak_MicroBit-main.py op de stub in microbit_stub/
+(virtuele klok) en stuurt codes aan verschillende tempo's, zoals de browser
+dat doet. Per tempo:
+- achterstand: hoe lang een code in de ontvangstbuffer blijft liggen,
+- settle: tijd tussen de laatste code en het moment dat de LED's die tonen,
+- pin- en displayschrijfacties (waarvan overbodig: zelfde waarde opnieuw),
+- animatieframes per seconde in rust (hoort 1000 / ANIM_MS te zijn).
+
+Vergelijk twee firmwareversies met --firmware (meermaals te gebruiken):
+    python microbit_latency.py
+    git show <commit>:"3 - Microcontrollers/MicroBit/Slimme_Vuilnisbak_MicroBit-main.py" > oud.py
+    python microbit_latency.py --firmware oud.py --firmware "../3 - Microcontrollers/MicroBit/Slimme_Vuilnisbak_MicroBit-main.py"
+"""
+
+import os
+import sys
+import json
+import runpy
+import random
+import argparse
+from typing import Dict, List, Optional, Sequence, Tuple
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_DIR = os.path.join(TOOLS_DIR, "microbit_stub")
+DEFAULT_FIRMWARE = os.path.join(os.path.dirname(TOOLS_DIR), "3 - Microcontrollers", "MicroBit",
+                                "Slimme_Vuilnisbak_MicroBit-main.py")
+
+sys.path.insert(0, STUB_DIR)
+import microbit  # noqa: E402  (de stub, niet de echte module)
+
+DEFAULT_INTERVALS = [2, 5, 10, 20, 50]
+PIN_ORDER = ["pin0", "pin1", "pin2", "pin8"]   # NL: code '1'..'4' in de firmware
+EXPECTED = {"1": (1, 0, 0, 0), "2": (0, 1, 0, 0), "3": (0, 0, 1, 0), "4": (0, 0, 0, 1),
+            "X": (1, 1, 1, 1), "0": (0, 0, 0, 0)}
+IDLE_TAIL_MS = 6000    # NL: na de laatste code nog zo lang laten lopen (idle-animatie meten)
+ANIM_FROM_MS = 2500    # NL: animatie meten vanaf zoveel ms na de laatste code
+
+def make_codes(n: int, seed: int = 1) -> List[str]:
+    """NL: Codes zoals de browser ze stuurt: reeksen van dezelfde code, af en toe een wissel."""
+    rng = random.Random(seed)
+    codes, current = [], "1"
+    while len(codes) < n:
+        current = rng.choice("1234X0")
+        codes.extend([current] * rng.randint(1, 6))
+    return codes[:n]
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+def run_firmware(firmware: str, schedule: Sequence[Tuple[float, bytes]], end_ms: float):
+    """NL: Draai de firmware tot de virtuele klok end_ms bereikt."""
+    microbit.reset(schedule, end_ms=end_ms)
+    try:
+        runpy.run_path(firmware, run_name="__main__")
+    except microbit.StopFirmware:
+        pass
+
+def pin_timeline() -> List[Tuple[float, Tuple[int, ...]]]:
+    """NL: (tijd, toestand van de vier LED-pinnen) na elke schrijfactie."""
+    pins = [getattr(microbit, name) for name in PIN_ORDER]
+    writes = sorted((t, i, v) for i, pin in enumerate(pins) for t, v in pin.writes)
+    state, timeline = [0, 0, 0, 0], []
+    for t, i, v in writes:
+        state[i] = v
+        timeline.append((t, tuple(state)))
+    return timeline
+
+def measure(firmware: str, interval_ms: float, codes: List[str], newline: bool = True) -> Dict:
+    suffix = b"\n" if newline else b""
+    schedule = [(i * interval_ms, code.encode() + suffix) for i, code in enumerate(codes)]
+    last_send = schedule[-1][0]
+    run_firmware(firmware, schedule, last_send + IDLE_TAIL_MS)
+    uart = microbit.uart
+
+    # NL: achterstand per code = tijd tussen aankomst en lezen van haar eerste byte
+    lags, unread, pos = [], 0, 0
+    for _, chunk in schedule:
+        read_at = uart.read_at[pos]
+        if read_at is None:
+            unread += 1
+        else:
+            lags.append(read_at - uart.arrival[pos])
+        pos += len(chunk)
+
+    # NL: settle = wanneer de pinnen (blijvend) de laatste code tonen
+    target = EXPECTED[codes[-1]]
+    timeline = pin_timeline()
+    settled_at = None
+    for t, state in timeline:
+        if state == target:
+            if settled_at is None:
+                settled_at = t
+        else:
+            settled_at = None
+    if target == (0, 0, 0, 0) and not timeline:
+        settled_at = 0.0
+    settle = None if settled_at is None else max(0.0, settled_at - last_send)
+
+    pin_writes = redundant = 0
+    for name in PIN_ORDER:
+        previous = None
+        for _, v in getattr(microbit, name).writes:
+            pin_writes += 1
+            redundant += v == previous
+            previous = v
+
+    shows = microbit.display.shows
+    anim_window = (last_send + ANIM_FROM_MS, last_send + IDLE_TAIL_MS)
+    anim_times = [t for t, _ in shows if anim_window[0] <= t < anim_window[1]]
+    anim_frames = len(anim_times)
+    anim_span = anim_times[-1] - anim_times[0] if anim_frames > 1 else 0.0
+    return {
+        "interval_ms": interval_ms,
+        "codes": len(codes),
+        "lag_mean_ms": sum(lags) / len(lags) if lags else 0.0,
+        "lag_p95_ms": percentile(lags, 95),
+        "lag_max_ms": max(lags) if lags else 0.0,
+        "unread": unread,
+        "settle_ms": settle,
+        "pin_writes": pin_writes,
+        "pin_writes_redundant": redundant,
+        "display_writes": len(shows) - anim_frames,
+        "anim_fps": (anim_frames - 1) * 1000.0 / anim_span if anim_span else 0.0,
+    }
+
+def print_table(firmware: str, rows: List[Dict]):
+    print(f"\n🔬 {os.path.basename(firmware)}")
+    print("   interval  achterstand gem/p95/max     settle   pins (overbodig)   display   anim/s")
+    for r in rows:
+        settle = "—" if r["settle_ms"] is None else f"{r['settle_ms']:.0f} ms"
+        unread = f"  ⚠️ {r['unread']} ongelezen" if r["unread"] else ""
+        print(f"   {r['interval_ms']:>5.0f} ms  {r['lag_mean_ms']:>6.0f} / {r['lag_p95_ms']:>5.0f} / "
+              f"{r['lag_max_ms']:>5.0f} ms  {settle:>8}   {r['pin_writes']:>5} ({r['pin_writes_redundant']:>4})"
+              f"      {r['display_writes']:>5}   {r['anim_fps']:>5.1f}{unread}")
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Meet de latentie van de micro:bit-firmware op een gesimuleerde micro:bit.")
+    ap.add_argument("--firmware", action="append", help="firmwarebestand (meermaals = vergelijken)")
+    ap.add_argument("--intervallen", default=",".join(map(str, DEFAULT_INTERVALS)),
+                    help="tijd tussen codes in ms, kommagescheiden")
+    ap.add_argument("--aantal", type=int, default=200, help="aantal codes per meting")
+    ap.add_argument("--zonder-newline", action="store_true",
+                    help="codes zonder '\\n' sturen (zoals sketch.js)")
+    ap.add_argument("--out", help="resultaten als JSON bewaren")
+    args = ap.parse_args(argv)
+
+    firmwares = args.firmware or [DEFAULT_FIRMWARE]
+    intervals = [float(x) for x in args.intervallen.split(",") if x.strip()]
+    codes = make_codes(args.aantal)
+    results = {}
+    for firmware in firmwares:
+        if not os.path.exists(firmware):
+            print(f"❌ Firmware niet gevonden: {firmware}")
+            sys.exit(1)
+        rows = [measure(firmware, iv, codes, newline=not args.zonder_newline) for iv in intervals]
+        print_table(firmware, rows)
+        results[firmware] = rows
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Resultaten bewaard: {args.out}")
+
+if __name__ == "__main__":
+    main()
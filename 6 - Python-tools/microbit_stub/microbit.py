@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+"""
+Stub-module 'microbit' om de micro:bit-firmware op een pc te draaien
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Alles loopt op een virtuele klok: enkel sleep() laat de tijd vooruitgaan,
+zodat metingen niet afhangen van hoe snel de pc is. Bytes die de "browser"
+stuurt worden vooraf ingepland (reset) en komen aan zodra de klok hun
+tijdstip bereikt. De stub houdt bij wanneer elke byte gelezen werd en elke
+pin-/displayschrijfactie, zodat microbit_latency.py latentie en overbodige
+schrijfacties kan berekenen.
+
+Gebruik (zie microbit_latency.py):
+    sys.path.insert(0, "microbit_stub")
+    import microbit
+    microbit.reset([(0.0, b"1\\n"), (3.0, b"2\\n")], end_ms=5000)
+    runpy.run_path("Slimme_Vuilnisbak_MicroBit-main.py")   # stopt met StopFirmware
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+# NL: enkel wat de echte module ook heeft, zodat 'from microbit import *' hetzelfde oplevert
+__all__ = ["sleep", "running_time", "uart", "display", "Image",
+           "pin0", "pin1", "pin2", "pin3", "pin4", "pin5", "pin6", "pin7", "pin8", "pin9",
+           "pin10", "pin11", "pin12", "pin13", "pin14", "pin15", "pin16", "pin19", "pin20"]
+
+class StopFirmware(BaseException):
+    """NL: Einde van de simulatie (BaseException: een kale 'except:' in de firmware vangt dit niet)."""
+
+class Clock:
+    def __init__(self, end_ms: float):
+        self.now = 0.0
+        self.end_ms = end_ms
+
+    def advance(self, ms: float):
+        self.now += max(0.0, ms)
+        if self.now > self.end_ms:
+            raise StopFirmware()
+
+class Pin:
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+        self.writes: List[Tuple[float, int]] = []   # NL: (tijd in ms, waarde)
+
+    def write_digital(self, value):
+        self.value = 1 if value else 0
+        self.writes.append((_clock.now, self.value))
+
+    def read_digital(self):
+        return self.value
+
+class Image:
+    def __init__(self, spec: str = ""):
+        self.spec = spec
+
+    def __repr__(self):
+        return "Image(%r)" % self.spec
+
+Image.HEART = Image("09090:99999:99999:09990:00900")
+
+class Display:
+    def __init__(self):
+        self.shows: List[Tuple[float, object]] = []   # NL: (tijd in ms, getoond; None = clear)
+
+    def show(self, what, *args, **kwargs):
+        self.shows.append((_clock.now, what))
+
+    def scroll(self, text, *args, **kwargs):
+        self.shows.append((_clock.now, str(text)))
+
+    def clear(self):
+        self.shows.append((_clock.now, None))
+
+class Uart:
+    """NL: Ontvangstkant van de seriële lijn, met tijdstempel per ontvangen en gelezen byte."""
+
+    def __init__(self, schedule: Sequence[Tuple[float, bytes]]):
+        self.data = b"".join(chunk for _, chunk in schedule)
+        self.arrival: List[float] = []    # NL: per byte: wanneer het aankwam
+        for t, chunk in schedule:
+            self.arrival.extend([t] * len(chunk))
+        self.read_at: List[Optional[float]] = [None] * len(self.data)   # NL: per byte: wanneer gelezen
+        self.pos = 0          # NL: tot hier is gelezen
+        self.reads = 0        # NL: aantal leesoproepen
+        self.sent: List[Tuple[float, bytes]] = []   # NL: (tijd in ms, wat de firmware terugstuurde)
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def _available(self) -> int:
+        end = self.pos
+        while end < len(self.data) and self.arrival[end] <= _clock.now:
+            end += 1
+        return end - self.pos
+
+    def _take(self, n: int) -> bytes:
+        chunk = self.data[self.pos:self.pos + n]
+        for i in range(self.pos, self.pos + len(chunk)):
+            self.read_at[i] = _clock.now
+        self.pos += len(chunk)
+        self.reads += 1
+        return chunk
+
+    def any(self):
+        return self._available()
+
+    def read(self, nbytes: Optional[int] = None):
+        n = self._available()
+        if not n:
+            return None
+        return self._take(n if nbytes is None else min(n, nbytes))
+
+    def readinto(self, buf, nbytes: Optional[int] = None):
+        n = min(self._available(), len(buf) if nbytes is None else nbytes)
+        if not n:
+            return None
+        chunk = self._take(n)
+        buf[:len(chunk)] = chunk
+        return len(chunk)
+
+    def readline(self):
+        # NL: zoals MicroPython: tot en met '\n', of alles wat er is als er (nog) geen newline is
+        n = self._available()
+        if not n:
+            return None
+        window = self.data[self.pos:self.pos + n]
+        nl = window.find(b"\n")
+        return self._take(nl + 1 if nl >= 0 else n)
+
+    def write(self, buf):
+        data = buf.encode("utf-8") if isinstance(buf, str) else bytes(buf)
+        self.sent.append((_clock.now, data))
+        return len(data)
+
+def sleep(ms):
+    _clock.advance(ms)
+
+def running_time():
+    return int(_clock.now)
+
+def reset(schedule: Sequence[Tuple[float, bytes]] = (), end_ms: float = 10000.0):
+    """NL: Nieuwe simulatie: klok op 0, verse pinnen/display/uart, te ontvangen bytes inplannen."""
+    global _clock, uart, display
+    global pin0, pin1, pin2, pin3, pin4, pin5, pin6, pin7, pin8, pin9, pin10, pin11, pin12
+    global pin13, pin14, pin15, pin16, pin19, pin20
+    _clock = Clock(end_ms)
+    uart = Uart(sorted(schedule, key=lambda item: item[0]))
+    display = Display()
+    (pin0, pin1, pin2, pin3, pin4, pin5, pin6, pin7, pin8, pin9, pin10, pin11, pin12,
+     pin13, pin14, pin15, pin16, pin19, pin20) = [Pin("pin%d" % i) for i in
+                                                   (0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12,
+                                                    13, 14, 15, 16, 19, 20)]
+
+def now_ms() -> float:
+    return _clock.now
+
+reset()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bewegingspoort afstellen: hoeveel inferenties bespaard, hoeveel later gezien? (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+sketch.js classificeert enkel als het beeld veranderd is (sceneChanged): het
+camerabeeld wordt verkleind tot 32×24 grijswaarden en vergeleken met het beeld
+van de laatste classificatie. Is meer dan een fractie (sv_motion, standaard 0.03)
+van de pixels meer dan 24 grijswaarden veranderd, of is de keep-alive (standaard
+2000 ms) verstreken, dan volgt een nieuwe classificatie; anders wordt het vorige
+resultaat hergebruikt.
+
+Deze tool speelt een reeks frames af, classificeert elk frame één keer met de
+NumPy-engine (zonder poort = referentie) en simuleert de poort voor een rooster
+van fracties × keep-alives. Per instelling:
+- bespaard: percentage frames zonder inferentie,
+- vertraging tot het nieuwe label verschijnt (p50/p90/max, naast dezelfde meting
+  zonder poort), en hoeveel wissels de poort helemaal mist. Bij --demo telt die
+  vanaf het moment dat het voorwerp in beeld komt; bij een map vanaf de labelwissel
+  zonder poort (dan is het dus de extra vertraging door de poort),
+- met de stabilisator van sketch.js erachter (stabilizer_replay.py, huidige
+  instellingen): schrijfacties per minuut en reactietijd tot de juiste code.
+
+Invoer: een map met frames (in volgorde, mapnaam = waarheid zoals in
+stabilizer_replay.py) of --demo (synthetische opname: vaste achtergrond met
+sensorruis, voorwerpen uit 2 - Dataset/Testing die in beeld komen). Voorwerpen
+die het model hetzelfde label geeft als de lege achtergrond, tellen niet mee:
+daar valt geen wissel te meten.
+
+Gebruik:
+    python motion_replay.py --demo
+    python motion_replay.py frames/ --fps 15 --fracties 0.01,0.03,0.06 --keepalive 1000,2000,4000
+
+Het verkleinen gebeurt hier met Pillow (bilineair); de browser schaalt met
+drawImage, dus de drempels komen ongeveer, niet op de pixel, overeen.
+"""
+
+import sys
+import json
+import argparse
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import tm_engine
+import stabilizer_replay
+from tm_engine import DEFAULT_MODEL_DIR, DEFAULT_TEST_DIR
+
+# NL: zoals in sketch.js
+MOTION_FRACTION = 0.03
+MOTION_KEEPALIVE_MS = 2000
+MOTION_PIXEL_DIFF = 24
+MOTION_W, MOTION_H = 32, 24
+
+DEFAULT_FRACTIONS = [0.01, 0.02, 0.03, 0.05, 0.1]
+DEFAULT_KEEPALIVES = [1000, 2000, 4000]
+MIN_RUN = 3   # NL: labelwissels korter dan zoveel frames (zonder poort) zijn ruis, niet meegeteld
+
+def thumbnail(img) -> np.ndarray:
+    """NL: grabThumb: 32×24, grijs = (77 R + 150 G + 29 B) >> 8."""
+    rgb = np.asarray(img.convert("RGB").resize((MOTION_W, MOTION_H), tm_engine.Image.BILINEAR), dtype=np.int32)
+    return ((rgb[..., 0] * 77 + rgb[..., 1] * 150 + rgb[..., 2] * 29) >> 8).reshape(-1)
+
+class Frames:
+    """
+    NL: Per frame: tijd (ms), verkleind grijsbeeld, kansen zonder poort, waarheid (code of None).
+    segments: bij --demo (begin, einde, label-index) per voorwerp, vanaf het plaatsen;
+    anders None en worden de wissels uit de labels zonder poort gehaald.
+    """
+
+    def __init__(self, labels: List[str], t: np.ndarray, thumbs: np.ndarray, probs: np.ndarray,
+                 truth: List[Optional[str]], segments: Optional[List[Tuple[int, int, int]]] = None,
+                 background: Optional[str] = None):
+        self.labels = labels
+        self.t = t
+        self.thumbs = thumbs
+        self.probs = probs
+        self.truth = truth
+        self.segments = segments
+        self.background = background
+
+def classify_frames(model: tm_engine.TMModel, images: Sequence, batch: int = 16) -> Tuple[np.ndarray, np.ndarray]:
+    """NL: (verkleinde grijsbeelden, kansen) voor PIL-beelden, in batches."""
+    thumbs, probs = [], []
+    for i in range(0, len(images), batch):
+        chunk = images[i:i + batch]
+        thumbs.extend(thumbnail(img) for img in chunk)
+        probs.append(model.predict(np.stack([tm_engine.preprocess_image(img, model.image_size) for img in chunk])))
+    return np.stack(thumbs), np.concatenate(probs)
+
+def frames_from_folder(folder: str, model_dir: str, fps: float) -> Frames:
+    model = tm_engine.load_model(model_dir)
+    paths = tm_engine.walk_images(folder)
+    if not paths:
+        raise ValueError(f"Geen beelden in {folder}")
+    images = []
+    for p in paths:
+        with tm_engine.Image.open(p) as img:
+            images.append(img.convert("RGB"))
+    thumbs, probs = classify_frames(model, images)
+    mapping = stabilizer_replay.default_mapping(model.labels)
+    truth = [stabilizer_replay.truth_from_folder(p, mapping) for p in paths]
+    return Frames(model.labels, np.arange(len(paths)) * 1000.0 / fps, thumbs, probs, truth)
+
+def demo_frames(model_dir: str, seconds: float = 120, fps: float = 10, seed: int = 3) -> Frames:
+    """
+    NL: Vaste achtergrond (verloop + textuur) met sensorruis; om de 3–7 s komt een foto uit
+    2 - Dataset/Testing in beeld – inschuiven, langzaam verschijnen (1,5 s) of klein (90 px) –,
+    blijft 2–5 s liggen (licht wiebelend) en verdwijnt.
+    Waarheid: wat het model zonder poort het vaakst zegt terwijl de foto stil ligt. Is dat
+    hetzelfde label als voor de lege achtergrond, dan is die foto niet te onderscheiden:
+    waarheid None en geen segment.
+    """
+    Image = tm_engine.Image
+    if Image is None:
+        raise ImportError("Pillow ontbreekt: installeer met 'pip install pillow'.")
+    rng = np.random.default_rng(seed)
+    model = tm_engine.load_model(model_dir)
+    w, h = 320, 240
+    yy, xx = np.mgrid[0:h, 0:w]
+    background = np.stack([90 + 60 * xx / w, 100 + 40 * yy / h, 110 + 20 * np.sin(xx / 17.0)], axis=-1)
+    background += rng.normal(0, 8, (h, w, 1))
+    photos = []
+    for p in tm_engine.list_images(DEFAULT_TEST_DIR):
+        with Image.open(p) as img:
+            side = min(img.size)
+            left, top = (img.size[0] - side) // 2, (img.size[1] - side) // 2
+            photos.append(img.convert("RGB").crop((left, top, left + side, top + side)))
+    sizes = {"schuif": 180, "vervaag": 180, "klein": 90}
+    objects = {(k, size): np.asarray(photo.resize((size, size), Image.BILINEAR), dtype=np.float64)
+               for k, photo in enumerate(photos) for size in set(sizes.values())}
+
+    n = int(seconds * fps)
+    place = [None] * n          # NL: (object, grootte, x-verschuiving, dekking) per frame
+    segments = []               # NL: (begin, begin stilliggen, einde) van elk voorwerp
+    i = int(rng.uniform(1, 3) * fps)
+    while i < n:
+        obj = int(rng.integers(len(photos)))
+        how = str(rng.choice(list(sizes)))
+        size = sizes[how]
+        enter = int((1.5 if how == "vervaag" else 0.5) * fps)
+        stay = int(rng.uniform(2, 5) * fps)
+        for k in range(enter + stay):
+            if i + k >= n:
+                break
+            step = min(1.0, (k + 1) / enter)
+            if how == "schuif" and k < enter:
+                place[i + k] = (obj, size, int((1 - step) * w), 1.0)
+            elif how == "vervaag":
+                place[i + k] = (obj, size, 0, step)
+            else:
+                place[i + k] = (obj, size, int(rng.integers(-2, 3)), 1.0)
+        segments.append((i, min(n, i + enter), min(n, i + enter + stay)))
+        i += enter + stay + int(rng.uniform(3, 7) * fps)
+
+    images = []
+    for k in range(n):
+        frame = background + rng.normal(0, 3, (h, w, 3))
+        if place[k] is not None:
+            obj, size, dx, alpha = place[k]
+            x0, y0 = (w - size) // 2 + dx, (h - size) // 2
+            xa, xb = max(0, x0), min(w, x0 + size)
+            if xb > xa:
+                patch = objects[(obj, size)][:, xa - x0:xb - x0]
+                frame[y0:y0 + size, xa:xb] = alpha * patch + (1 - alpha) * frame[y0:y0 + size, xa:xb]
+        images.append(Image.fromarray(np.clip(frame, 0, 255).astype(np.uint8)))
+    thumbs, probs = classify_frames(model, images)
+
+    mapping = stabilizer_replay.default_mapping(model.labels)
+    majority = lambda rows: int(np.bincount(rows.argmax(axis=1), minlength=len(model.labels)).argmax())
+    empty = np.array([p is None for p in place])
+    background = majority(probs[empty])
+    truth: List[Optional[str]] = ["0"] * n
+    kept = []
+    for start, still, end in segments:
+        label = majority(probs[still:end] if end > still else probs[start:end])
+        if label == background:
+            truth[start:end] = [None] * (end - start)
+            continue
+        truth[start:end] = [stabilizer_replay.code_for_label(model.labels[label], mapping)] * (end - start)
+        kept.append((start, end, label))
+    return Frames(model.labels, np.arange(n) * 1000.0 / fps, thumbs, probs, truth,
+                  segments=kept, background=model.labels[background])
+
+def gate(frames: Frames, fractions: Sequence[float], keepalives: Sequence[float]) -> Tuple[list, np.ndarray]:
+    """
+    NL: sceneChanged voor alle instellingen tegelijk. Geeft (instellingen, ref) terug:
+    ref[i, j] = frame waarvan het resultaat op frame i gebruikt wordt bij instelling j.
+    """
+    params = [(f, ka) for f in fractions for ka in keepalives]
+    frac = np.array([f for f, _ in params])
+    keep = np.array([ka for _, ka in params], dtype=np.float64)
+    n, p = len(frames.t), len(params)
+    ref = np.zeros((n, p), dtype=np.int64)
+    current = np.zeros(p, dtype=np.int64)           # NL: frame 0: altijd classificeren
+    for i in range(1, n):
+        changed = (np.abs(frames.thumbs[i] - frames.thumbs[current]) > MOTION_PIXEL_DIFF).mean(axis=1)
+        infer = (changed > frac) | (frames.t[i] - frames.t[current] >= keep)
+        current = np.where(infer, i, current)
+        ref[i] = current
+    return params, ref
+
+def label_changes(top: np.ndarray) -> List[Tuple[int, int, int]]:
+    """NL: (begin, einde, label) van elke reeks van minstens MIN_RUN frames met hetzelfde label."""
+    runs, start = [], 0
+    for i in range(1, len(top) + 1):
+        if i == len(top) or top[i] != top[start]:
+            if i - start >= MIN_RUN:
+                runs.append((start, i, int(top[start])))
+            start = i
+    return [r for k, r in enumerate(runs) if k and r[2] != runs[k - 1][2]]
+
+def detection_delays(frames: Frames, top: np.ndarray, changes) -> Tuple[List[float], int]:
+    """NL: Per wissel (begin, einde, label): ms tot 'top' dat label toont; plus het aantal gemiste."""
+    delays, missed = [], 0
+    for start, end, lbl in changes:
+        hit = np.flatnonzero(top[start:end] == lbl)
+        if len(hit):
+            delays.append(frames.t[start + hit[0]] - frames.t[start])
+        else:
+            missed += 1
+    return delays, missed
+
+def evaluate(frames: Frames, fractions: Sequence[float], keepalives: Sequence[float]) -> List[Dict]:
+    params, ref = gate(frames, fractions, keepalives)
+    top = frames.probs.argmax(axis=1)
+    changes = frames.segments if frames.segments is not None else label_changes(top)
+    base_delays, base_missed = detection_delays(frames, top, changes)
+
+    def stabilized(probs: np.ndarray) -> Dict:
+        rec = stabilizer_replay.Recording(frames.labels, frames.t, probs, frames.truth)
+        return stabilizer_replay.replay(rec, [stabilizer_replay.VOTE_WINDOW], [stabilizer_replay.CONF_THRESHOLD],
+                                        [stabilizer_replay.SEND_DEBOUNCE_MS])[0]
+
+    base = stabilized(frames.probs)
+    rows = []
+    for j, (frac, keep) in enumerate(params):
+        gated_top = top[ref[:, j]]
+        delays, missed = detection_delays(frames, gated_top, changes)
+        inferred = len(np.unique(ref[:, j]))
+        stab = stabilized(frames.probs[ref[:, j]])
+        rows.append({
+            "fraction": frac, "keepalive_ms": keep,
+            "saved_pct": 100.0 * (1 - inferred / len(frames.t)),
+            "delay_p50_ms": float(np.percentile(delays, 50)) if delays else None,
+            "delay_p90_ms": float(np.percentile(delays, 90)) if delays else None,
+            "delay_max_ms": float(max(delays)) if delays else None,
+            "delay_p50_ms_ungated": float(np.percentile(base_delays, 50)) if base_delays else None,
+            "delay_p90_ms_ungated": float(np.percentile(base_delays, 90)) if base_delays else None,
+            "delay_max_ms_ungated": float(max(base_delays)) if base_delays else None,
+            "missed_changes_ungated": base_missed,
+            "label_changes": len(changes), "missed_changes": missed,
+            "agree_pct": 100.0 * float((gated_top == top).mean()),
+            "writes_per_min": stab["writes_per_min"], "writes_per_min_ungated": base["writes_per_min"],
+            "reaction_p50_ms": stab["latency_p50_ms"], "reaction_p50_ms_ungated": base["latency_p50_ms"],
+            "current": (frac, keep) == (MOTION_FRACTION, MOTION_KEEPALIVE_MS),
+        })
+    return rows
+
+def fmt(v: Optional[float]) -> str:
+    return "—" if v is None else f"{v:.0f}"
+
+def print_rows(rows: Sequence[Dict], frames: Frames):
+    base = rows[0]
+    if frames.segments is not None:
+        print(f"   lege achtergrond → {frames.background}; {base['label_changes']} voorwerpen met een ander label "
+              f"(vertraging vanaf het plaatsen)")
+    print(f"   zonder poort: vertraging p50/p90/max {fmt(base['delay_p50_ms_ungated'])} / "
+          f"{fmt(base['delay_p90_ms_ungated'])} / {fmt(base['delay_max_ms_ungated'])} ms "
+          f"({base['missed_changes_ungated']} gemist) · reactie p50 {fmt(base['reaction_p50_ms_ungated'])} ms · "
+          f"{base['writes_per_min_ungated']:.1f} schrijfacties/min · {base['label_changes']} labelwissels")
+    head = "vertraging" if frames.segments is not None else "extra vertraging"
+    print(f"   fractie  keep-alive   bespaard   {head + ' p50/p90/max ms':>31}   gemist   gelijk   reactie p50   schrijf/min")
+    for r in rows:
+        mark = "  ← sketch.js nu" if r["current"] else ""
+        delay = f"{fmt(r['delay_p50_ms'])} / {fmt(r['delay_p90_ms'])} / {fmt(r['delay_max_ms'])}"
+        print(f"   {r['fraction']:>7.2f} {r['keepalive_ms']:>8.0f} ms {r['saved_pct']:>8.1f}%   {delay:>31}"
+              f"   {r['missed_changes']:>6} {r['agree_pct']:>7.1f}%  {fmt(r['reaction_p50_ms']):>9} ms"
+              f" {r['writes_per_min']:>12.1f}{mark}")
+
+def parse_list(value: str) -> List[float]:
+    return [float(x) for x in value.split(",") if x.strip()]
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Simuleer de bewegingspoort van sketch.js op een reeks frames.")
+    ap.add_argument("folder", nargs="?", help="map met frames in volgorde (mapnaam = waarheid)")
+    ap.add_argument("--demo", action="store_true", help="synthetische opname met foto's uit 2 - Dataset/Testing")
+    ap.add_argument("--seconden", type=float, default=120.0, help="lengte van de --demo-opname")
+    ap.add_argument("--model", default=DEFAULT_MODEL_DIR, help="map met model.json, weights.bin, metadata.json")
+    ap.add_argument("--fps", type=float, default=10.0, help="beelden per seconde van de frames")
+    ap.add_argument("--fracties", default=",".join(map(str, DEFAULT_FRACTIONS)),
+                    help="drempels: fractie veranderde pixels")
+    ap.add_argument("--keepalive", default=",".join(map(str, DEFAULT_KEEPALIVES)), help="keep-alive in ms")
+    ap.add_argument("--out", help="resultaten als JSON bewaren")
+    args = ap.parse_args(argv)
+
+    try:
+        if args.demo:
+            frames = demo_frames(args.model, seconds=args.seconden, fps=args.fps)
+        elif args.folder:
+            frames = frames_from_folder(args.folder, args.model, args.fps)
+        else:
+            print("❌ Geef een map met frames op of gebruik --demo.")
+            sys.exit(1)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"❌ Frames lezen mislukt: {e}")
+        sys.exit(1)
+
+    fractions, keepalives = parse_list(args.fracties), parse_list(args.keepalive)
+    if MOTION_FRACTION not in fractions:
+        fractions.append(MOTION_FRACTION)
+    if MOTION_KEEPALIVE_MS not in keepalives:
+        keepalives.append(MOTION_KEEPALIVE_MS)
+    rows = evaluate(frames, sorted(fractions), sorted(keepalives))
+    minutes = (frames.t[-1] - frames.t[0]) / 60000.0
+    print(f"🎞️ {len(frames.t)} frames ({minutes * 60:.0f} s)")
+    print_rows(rows, frames)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"💾 Resultaten bewaard: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Seriële brug voor Slimme Vuilnisbak (één pagina → veel borden)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Werking:
+- De webapp stuurt codes ('0'..'9' of 'X') naar http://localhost:8765/code
+  (zet in de browserconsole: localStorage.setItem('sv_bridge', 'http://localhost:8765')).
+- De brug stuurt elke code (+ newline) naar álle aangesloten borden tegelijk;
+  met ?device=NAAM enkel naar dat bord.
+- Per bord telt enkel de laatste toestand: na elke write wacht de brug even
+  (--interval); codes die intussen binnenkomen, worden samengevoegd en enkel
+  de nieuwste wordt geschreven (coalescing). Een code die al de huidige
+  toestand is, wordt niet opnieuw verstuurd.
+- Elk bord schrijft in een eigen thread: een traag of vastgelopen bord
+  houdt de andere niet op.
+- GET /status toont per bord: geschreven, samengevoegd, overgeslagen, fouten.
+- Enkel de webapp van de launcher (http://localhost:8000..8100 of 127.0.0.1) mag
+  codes sturen; andere webpagina's krijgen 403 (extra adressen: --origin).
+  Scripts zonder Origin-header (curl, de zelftest) blijven werken.
+
+Gebruik:
+    python serial_bridge.py /dev/ttyACM0 /dev/ttyUSB0         # Windows: COM3 COM4 (pip install pyserial)
+    python serial_bridge.py --demo 3 --traag 150               # pty-simulatoren, één trage kaart
+    python serial_bridge.py --demo 4 --zelftest                 # burst sturen en resultaat controleren
+"""
+
+import os
+import sys
+import json
+import time
+import select
+import asyncio
+import argparse
+import threading
+import urllib.parse
+import concurrent.futures
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import serial   # NL: pyserial – nodig op Windows, optioneel op Linux/macOS
+except ImportError:
+    serial = None
+
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = tty = None
+
+BAUD = 115200
+DEFAULT_PORT = 8765
+VALID_CODES = set("0123456789X")
+MIN_INTERVAL_MS = 20   # NL: ± twee micro:bit-lussen; sneller schrijven vult enkel de buffer van het bord
+WRITE_TIMEOUT_S = 2.0
+REOPEN_S = 2.0
+MAX_BODY = 1024
+LAUNCHER_PORTS = range(8000, 8101)   # NL: find_free_port() van '5 - Lanceer de AI.py'
+
+def launcher_origins(ports: Sequence[int] = LAUNCHER_PORTS) -> set:
+    """NL: Origins waarop de launcher de webapp serveert."""
+    return {f"http://{host}:{port}" for host in ("localhost", "127.0.0.1") for port in ports}
+
+# ======== NL: seriële verbinding (pyserial of POSIX-tty) ========
+
+class SerialLink:
+    """NL: Kleinste gemeenschappelijke deler: write(bytes), read(timeout) en close()."""
+
+    def __init__(self, path: str, baud: int = BAUD):
+        self.path = path
+        self._port = None
+        self._fd = None
+        if serial is not None and not path.startswith("/dev/pts/"):
+            self._port = serial.Serial(path, baud, timeout=0.2, write_timeout=WRITE_TIMEOUT_S)
+            return
+        if termios is None:
+            raise RuntimeError("pyserial ontbreekt: installeer met 'pip install pyserial'.")
+        self._fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        tty.setraw(self._fd)
+        speed = getattr(termios, f"B{baud}", None)
+        if speed is not None:
+            attrs = termios.tcgetattr(self._fd)
+            attrs[4] = attrs[5] = speed
+            termios.tcsetattr(self._fd, termios.TCSANOW, attrs)
+
+    def write(self, data: bytes):
+        if self._port is not None:
+            self._port.write(data)
+            self._port.flush()
+            return
+        view = memoryview(data)
+        while view:
+            if not select.select([], [self._fd], [], WRITE_TIMEOUT_S)[1]:
+                raise TimeoutError("schrijven duurde te lang")
+            view = view[os.write(self._fd, view):]
+
+    def read(self, timeout: float = 0.2) -> bytes:
+        if self._port is not None:
+            return self._port.read(256)
+        if select.select([self._fd], [], [], timeout)[0]:
+            return os.read(self._fd, 4096)
+        return b""
+
+    def close(self):
+        try:
+            if self._port is not None:
+                self._port.close()
+            elif self._fd is not None:
+                os.close(self._fd)
+        except OSError:
+            pass
+
+# ======== NL: één bord ========
+
+class Device:
+    """
+    NL: Eén bord met een 'laatste toestand'-slot.
+    submit() overschrijft de gewenste toestand; de schrijftaak schrijft enkel de nieuwste.
+    """
+
+    def __init__(self, name: str, path: str, verbose: bool = False,
+                 interval_ms: float = MIN_INTERVAL_MS):
+        self.name = name
+        self.path = path
+        self.verbose = verbose
+        self.interval_s = interval_ms / 1000
+        self.link: Optional[SerialLink] = None
+        self.wanted: Optional[str] = None
+        self.current: Optional[str] = None
+        self.written = 0
+        self.coalesced = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_error = ""
+        self._event = asyncio.Event()
+        self._pending = False
+        # NL: één thread per bord: een trage write blokkeert enkel dit bord
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"bord-{name}")
+        self._reader: Optional[threading.Thread] = None
+        self._closing = threading.Event()
+
+    def submit(self, code: str):
+        if self._pending:
+            self.coalesced += 1   # NL: vorige gewenste toestand wordt nooit geschreven
+        elif code == self.current:
+            self.skipped += 1
+            return
+        self.wanted = code
+        self._pending = True
+        self._event.set()
+
+    def open(self) -> bool:
+        try:
+            self.link = SerialLink(self.path)
+        except (OSError, RuntimeError) as e:
+            self.errors += 1
+            self.last_error = str(e)
+            return False
+        self.current = None   # NL: (her)verbonden bord: toestand onbekend → opnieuw sturen
+        self._reader = threading.Thread(target=self._drain, args=(self.link,), daemon=True,
+                                        name=f"lees-{self.name}")
+        self._reader.start()
+        return True
+
+    def _drain(self, link: SerialLink):
+        """NL: Antwoorden van het bord lezen, zodat zijn zendbuffer nooit volloopt."""
+        while not self._closing.is_set():
+            try:
+                data = link.read(0.2)
+            except (OSError, ValueError):
+                return
+            if data and self.verbose:
+                for line in data.decode("utf-8", "ignore").splitlines():
+                    if line.strip():
+                        print(f"📟 {self.name}: {line.strip()}")
+
+    async def run(self):
+        loop = asyncio.get_event_loop()
+        while not self._closing.is_set():
+            if self.link is None and not self.open():
+                await asyncio.sleep(REOPEN_S)
+                continue
+            await self._event.wait()
+            self._event.clear()
+            code = self.wanted
+            self._pending = False
+            if code is None or code == self.current:
+                continue
+            try:
+                await loop.run_in_executor(self._executor, self.link.write, (code + "\n").encode("ascii"))
+            except (OSError, TimeoutError) as e:
+                self.errors += 1
+                self.last_error = str(e)
+                print(f"⚠️ (Brug) {self.name}: schrijven mislukt ({e}) – opnieuw verbinden.")
+                self.link.close()
+                self.link = None
+                self.wanted, self._pending = code, True   # NL: na herverbinden alsnog sturen
+                self._event.set()
+                continue
+            self.current = code
+            self.written += 1
+            await asyncio.sleep(self.interval_s)   # NL: wat nu binnenkomt, wordt samengevoegd
+
+    def status(self) -> dict:
+        return {"path": self.path, "state": self.current, "written": self.written,
+                "coalesced": self.coalesced, "skipped": self.skipped, "errors": self.errors,
+                "connected": self.link is not None, "last_error": self.last_error or None}
+
+    def close(self):
+        self._closing.set()
+        if self.link is not None:
+            self.link.close()
+        self._executor.shutdown(wait=False)
+
+# ======== NL: HTTP-eindpunt ========
+
+class Bridge:
+    """NL: Verdeelt codes over alle borden en biedt een klein HTTP-eindpunt (met CORS)."""
+
+    def __init__(self, devices: Sequence[Device], origins: Optional[set] = None):
+        self.devices: Dict[str, Device] = {d.name: d for d in devices}
+        self.origins = launcher_origins() if origins is None else set(origins)
+        self.received = 0
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self._tasks = [asyncio.ensure_future(d.run()) for d in self.devices.values()]
+
+    def dispatch(self, code: str, device: Optional[str] = None) -> int:
+        targets = [self.devices[device]] if device else list(self.devices.values())
+        self.received += 1
+        for d in targets:
+            d.submit(code)
+        return len(targets)
+
+    def status(self) -> dict:
+        return {"received": self.received, "devices": {n: d.status() for n, d in self.devices.items()}}
+
+    def allowed(self, headers: Dict[str, str]) -> bool:
+        """
+        NL: Mag dit request de borden aansturen? Een browser stuurt bij een POST altijd
+        een Origin mee; die moet van de launcher zijn. Zonder Origin enkel als het geen
+        browserrequest van een andere site is (bv. <img src=".../code?c=1">).
+        """
+        origin = headers.get("origin")
+        if origin is not None:
+            return origin in self.origins
+        return headers.get("sec-fetch-site", "none") in ("none", "same-origin")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """NL: Minimale HTTP/1.1 met keep-alive: POST/GET /code, GET /status, OPTIONS (CORS)."""
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = (lines[0].split(" ") + ["", ""])[:3]
+                headers = {k.strip().lower(): v.strip() for k, _, v in
+                           (l.partition(":") for l in lines[1:] if l)}
+                length = int(headers.get("content-length", "0") or 0)
+                too_large = not 0 <= length <= MAX_BODY
+                body = await reader.readexactly(length) if length and not too_large else b""
+                if too_large:
+                    # NL: de rest van de body niet lezen; de verbinding sluit na dit antwoord
+                    status, doc, cors = "413 Payload Too Large", {"error": f"body groter dan {MAX_BODY} bytes"}, ""
+                elif self.allowed(headers):
+                    status, doc = self.route(method, target, body)
+                    origin = headers.get("origin")
+                    cors = ("" if origin is None else
+                            f"Access-Control-Allow-Origin: {origin}\r\n"
+                            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+                            "Access-Control-Allow-Headers: Content-Type\r\n"
+                            "Access-Control-Allow-Private-Network: true\r\n")
+                else:
+                    status, doc = "403 Forbidden", {"error": "enkel de webapp van de launcher mag codes sturen"}
+                    cors = ""
+                payload = json.dumps(doc, ensure_ascii=False).encode("utf-8") if doc is not None else b""
+                writer.write((f"HTTP/1.1 {status}\r\n" + cors +
+                              ("Connection: close\r\n" if too_large else "") +
+                              "Vary: Origin\r\n"
+                              "Content-Type: application/json; charset=utf-8\r\n"
+                              f"Content-Length: {len(payload)}\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if too_large or headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def route(self, method: str, target: str, body: bytes) -> Tuple[str, Optional[dict]]:
+        path, _, query = target.partition("?")
+        params = {k: v[0] for k, v in urllib.parse.parse_qs(query).items()}
+        if method == "OPTIONS":
+            return "204 No Content", None
+        if path == "/status" and method == "GET":
+            return "200 OK", self.status()
+        if path != "/code" or method not in ("GET", "POST"):
+            return "404 Not Found", {"error": "onbekend eindpunt"}
+        text = body.decode("utf-8", "ignore").strip()
+        if text.startswith("{"):
+            try:
+                params.update(json.loads(text))
+            except ValueError:
+                return "400 Bad Request", {"error": "ongeldige JSON"}
+        elif text:
+            params.setdefault("c", text)
+        code = str(params.get("c", params.get("code", ""))).strip()[:1].upper()
+        device = params.get("device")
+        if code not in VALID_CODES:
+            return "400 Bad Request", {"error": "code moet '0'..'9' of 'X' zijn"}
+        if device and device not in self.devices:
+            return "404 Not Found", {"error": f"onbekend bord: {device}"}
+        return "202 Accepted", {"code": code, "devices": self.dispatch(code, device)}
+
+    def close(self):
+        for task in self._tasks:
+            task.cancel()
+        for d in self.devices.values():
+            d.close()
+
+# ======== NL: zelftest met simulatoren ========
+
+def post_code(port: int, code: str):
+    import urllib.request
+    req = urllib.request.Request(f"http://127.0.0.1:{port}/code", data=code.encode("ascii"), method="POST")
+    with urllib.request.urlopen(req, timeout=5) as res:
+        res.read()
+
+def selftest(port: int, sims, bridge: Bridge, burst: int = 200) -> bool:
+    """NL: Stuur een burst codes en controleer dat elk bord op de laatste code eindigt."""
+    # NL: de burst eindigt op '0', dat verder nergens voorkomt: zo weten we wanneer een bord klaar is
+    codes = [c for _, c in zip(range(burst), "1234X" * burst)] + ["0", "0", "0"]
+    t0 = time.perf_counter()
+    for code in codes:
+        post_code(port, code)
+    sent_s = time.perf_counter() - t0
+    deadline = time.time() + 10
+    while time.time() < deadline and any(not s.events or s.events[-1][1] != codes[-1] for s in sims):
+        time.sleep(0.02)
+    ok = True
+    print(f"📨 {len(codes)} codes verstuurd in {sent_s * 1000:.0f} ms")
+    for sim in sims:
+        d = bridge.devices[sim.name].status()
+        done = sim.events[-1][0] - t0 if sim.events else float("nan")
+        good = bool(sim.events) and sim.events[-1][1] == codes[-1]
+        ok &= good
+        print(f"   {'✅' if good else '❌'} {sim.name:<12} eindtoestand {sim.state}  "
+              f"geschreven {d['written']:>3}  samengevoegd {d['coalesced']:>3}  overgeslagen {d['skipped']:>3}  "
+              f"klaar na {done * 1000:6.0f} ms")
+    return ok
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Seriële brug: codes van de webapp naar veel borden tegelijk.")
+    ap.add_argument("paths", nargs="*", help="seriële poorten (bv. /dev/ttyACM0, COM3); NAAM=PAD mag ook")
+    ap.add_argument("--poort", type=int, default=DEFAULT_PORT, help="HTTP-poort van de brug")
+    ap.add_argument("--demo", type=int, default=0, metavar="N",
+                    help="start N gesimuleerde borden (afwisselend micro:bit/Arduino) i.p.v. echte poorten")
+    ap.add_argument("--traag", type=float, default=0.0, metavar="MS",
+                    help="maak in de demo het eerste bord zoveel ms per lus trager")
+    ap.add_argument("--zelftest", action="store_true", help="stuur een burst codes naar de demo en controleer")
+    ap.add_argument("--interval", type=float, default=MIN_INTERVAL_MS, metavar="MS",
+                    help="minimale tijd tussen twee writes naar hetzelfde bord (samenvoegvenster)")
+    ap.add_argument("--verbose", action="store_true", help="toon de antwoorden van de borden")
+    ap.add_argument("--origin", action="append", default=[], metavar="URL",
+                    help="extra webadres dat codes mag sturen, bv. http://192.168.1.20:8000 (herhaalbaar)")
+    args = ap.parse_args(argv)
+
+    sims = []
+    specs = []
+    for p in args.paths:
+        name, sep, path = p.partition("=")
+        specs.append((name, path) if sep else (os.path.basename(p), p))
+    if args.demo:
+        import device_sim
+        kinds = [("microbit", "arduino")[i % 2] for i in range(args.demo)]
+        sims = device_sim.start_sims(kinds, [args.traag])
+        specs += [(s.name, s.path) for s in sims]
+    if not specs:
+        print("❌ Geef minstens één seriële poort op (of --demo N).")
+        sys.exit(1)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    bridge = Bridge([Device(name, path, verbose=args.verbose, interval_ms=args.interval) for name, path in specs],
+                    launcher_origins() | {o.rstrip("/") for o in args.origin})
+    server = loop.run_until_complete(asyncio.start_server(bridge.handle, "127.0.0.1", args.poort))
+    bridge.start()
+    print(f"🌉 Brug actief op http://localhost:{args.poort}/code → {len(specs)} bord(en):")
+    for name, path in specs:
+        print(f"   🔌 {name}: {path}")
+
+    try:
+        if args.zelftest:
+            fut = loop.run_in_executor(None, selftest, args.poort, sims, bridge)
+            ok = loop.run_until_complete(fut)
+            print("✅ Zelftest geslaagd." if ok else "❌ Zelftest mislukt.")
+        else:
+            print("💡 In de webapp (console): localStorage.setItem('sv_bridge', 'http://localhost:%d')" % args.poort)
+            print("⏹ Ctrl+C om te stoppen.")
+            loop.run_forever()
+            ok = True
+    except KeyboardInterrupt:
+        ok = True
+    finally:
+        server.close()
+        bridge.close()
+        for sim in sims:
+            sim.stop()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
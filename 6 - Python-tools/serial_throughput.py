@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Doorvoerbenchmark: tekstprotocol vs. stille binaire modus (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+De Arduino-sketch antwoordt in tekstmodus op elke code met een 🔔-regel van
+±40 bytes: bij 115200 baud is dat ±3,5 ms zendtijd per opdracht, en zodra de
+zendbuffer (64 bytes) vol is, wacht loop() daarop. In binaire modus ('!B')
+is een opdracht 1 byte en de bevestiging ook 1 byte, zonder logging.
+
+Per modus en per venster (aantal opdrachten dat tegelijk onderweg mag zijn):
+- opdrachten per seconde,
+- latentie write → bevestiging (p50/p99),
+- bytes terug per opdracht.
+Venster 1 = wachten op elke bevestiging (latentie); een groter venster =
+zo snel mogelijk doorsturen (doorvoer).
+
+Tegen de pty-emulatie van de sketch (device_sim.ArduinoSim: setExclusive,
+allOn, allOff) of tegen een echt bord:
+    python serial_throughput.py                      # simulator, 115200 baud
+    python serial_throughput.py --baud 9600 --aantal 200
+    python serial_throughput.py /dev/ttyACM0         # echt bord (Windows: COM3)
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import device_sim
+from device_sim import CMD_OFF, CMD_ALL_ON, NAK
+from serial_bridge import SerialLink, BAUD
+
+CODES = "1234X0"
+DEFAULT_WINDOWS = [1, 16]
+NEGOTIATE_TRIES = 3
+NEGOTIATE_TIMEOUT_S = 0.7   # NL: een Uno herstart bij het openen van de poort; daarom een paar pogingen
+ACK_TIMEOUT_S = 3.0
+
+def encode_binary(code: str) -> int:
+    """NL: Tekstcode → opdrachtbyte van de binaire modus."""
+    if code == "0":
+        return CMD_OFF
+    if code in "Xx":
+        return CMD_ALL_ON
+    return CMD_OFF + int(code)
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+class AckCounter(threading.Thread):
+    """NL: Telt bevestigingen: in tekstmodus elke 🔔/⚠️-regel, in binaire modus elk byte."""
+
+    def __init__(self, link: SerialLink):
+        super().__init__(daemon=True, name="acks")
+        self.link = link
+        self.binary = False
+        self.times: List[float] = []
+        self.naks = 0
+        self.rx_bytes = 0
+        self.seen = b""            # NL: ruwe tekst (voor de onderhandeling)
+        self._buf = b""
+        self._halt = threading.Event()
+        self._new = threading.Condition()
+
+    def run(self):
+        while not self._halt.is_set():
+            try:
+                data = self.link.read(0.05)
+            except (OSError, ValueError):
+                return
+            if not data:
+                continue
+            now = time.perf_counter()
+            with self._new:
+                self.rx_bytes += len(data)
+                if self.binary:
+                    for b in data:
+                        if b >= CMD_OFF:
+                            self.times.append(now)
+                            self.naks += b == NAK
+                        else:
+                            self.seen += bytes([b])
+                else:
+                    self.seen += data
+                    self._buf += data
+                    *lines, self._buf = self._buf.split(b"\n")
+                    for line in lines:
+                        text = line.decode("utf-8", "ignore")
+                        if text.startswith(("🔔", "⚠️")):
+                            self.times.append(now)
+                self._new.notify_all()
+
+    def wait_for(self, n: int, timeout: float) -> bool:
+        deadline = time.perf_counter() + timeout
+        with self._new:
+            while len(self.times) < n:
+                left = deadline - time.perf_counter()
+                if left <= 0:
+                    return False
+                self._new.wait(left)
+        return True
+
+    def reset(self, binary: bool):
+        with self._new:
+            self.binary = binary
+            self.times = []
+            self.naks = 0
+            self.rx_bytes = 0
+            self.seen = b""
+            self._buf = b""
+
+    def stop(self):
+        self._halt.set()
+        self.join(1.0)
+
+def negotiate(link: SerialLink, acks: AckCounter, mode: str = "B") -> bool:
+    """NL: '!B' of '!T' sturen en wachten op hetzelfde antwoord; oudere firmware zwijgt → False."""
+    token = b"!" + mode.encode("ascii")
+    acks.reset(binary=False)
+    for _ in range(NEGOTIATE_TRIES):
+        link.write(token)
+        deadline = time.perf_counter() + NEGOTIATE_TIMEOUT_S
+        while time.perf_counter() < deadline:
+            if token in acks.seen:
+                return True
+            time.sleep(0.01)
+    return False
+
+def run_mode(link: SerialLink, acks: AckCounter, binary: bool, count: int, window: int) -> Dict:
+    """NL: count opdrachten sturen met hoogstens window onbevestigd; doorvoer en latentie meten."""
+    acks.reset(binary=binary)
+    sent: List[float] = []
+    for i in range(count):
+        if i >= window and not acks.wait_for(i - window + 1, ACK_TIMEOUT_S):
+            break
+        code = CODES[i % len(CODES)]
+        t = time.perf_counter()
+        link.write(bytes([encode_binary(code)]) if binary else code.encode("ascii"))
+        sent.append(t)
+    complete = acks.wait_for(len(sent), ACK_TIMEOUT_S)
+    got = acks.times[:len(sent)]
+    latencies = [(a - s) * 1000 for s, a in zip(sent, got)]
+    elapsed = (got[-1] - sent[0]) if got else float("nan")
+    return {
+        "mode": "binair" if binary else "tekst",
+        "window": window,
+        "sent": len(sent),
+        "acked": len(got),
+        "complete": complete,
+        "naks": acks.naks,
+        "cmds_per_s": len(got) / elapsed if got and elapsed > 0 else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "rx_bytes_per_cmd": acks.rx_bytes / max(1, len(got)),
+    }
+
+def benchmark(link: SerialLink, count: int, windows: Sequence[int]) -> List[Dict]:
+    acks = AckCounter(link)
+    acks.start()
+    rows = []
+    try:
+        for window in windows:
+            rows.append(run_mode(link, acks, False, count, window))
+        if negotiate(link, acks, "B"):
+            for window in windows:
+                rows.append(run_mode(link, acks, True, count, window))
+            negotiate(link, acks, "T")   # NL: bord terug in tekstmodus achterlaten
+        else:
+            print("⚠️ Bord antwoordt niet op '!B': firmware zonder binaire modus? Enkel tekst gemeten.")
+    finally:
+        acks.stop()
+    return rows
+
+def print_rows(rows: Sequence[Dict]):
+    print("   modus   venster   opdr./s    p50 ms    p99 ms   bytes terug/opdr.   bevestigd")
+    for r in rows:
+        warn = "" if r["complete"] else "  ⚠️ onvolledig"
+        print(f"   {r['mode']:<7} {r['window']:>7} {r['cmds_per_s']:>9.0f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f}"
+              f" {r['rx_bytes_per_cmd']:>19.1f}   {r['acked']:>4}/{r['sent']:<4}{warn}")
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Vergelijk tekst- en binaire modus van de Arduino-sketch.")
+    ap.add_argument("path", nargs="?", help="seriële poort van een echt bord (zonder: simulator)")
+    ap.add_argument("--aantal", type=int, default=500, help="opdrachten per meting")
+    ap.add_argument("--venster", default=",".join(map(str, DEFAULT_WINDOWS)),
+                    help="opdrachten tegelijk onderweg, kommagescheiden")
+    ap.add_argument("--baud", type=int, default=BAUD, help="baudrate (simulator: 0 = oneindig snel)")
+    ap.add_argument("--out", help="resultaten als JSON bewaren")
+    args = ap.parse_args(argv)
+
+    windows = [int(x) for x in args.venster.split(",") if x.strip()]
+    sim = None
+    try:
+        if args.path:
+            link = SerialLink(args.path, args.baud)
+            time.sleep(2.0)   # NL: Uno herstart bij het openen van de poort
+        else:
+            sim = device_sim.start_sims(["arduino"], baud=args.baud)[0]
+            link = SerialLink(sim.path)
+    except (OSError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    try:
+        rows = benchmark(link, args.aantal, windows)
+    finally:
+        link.close()
+        if sim is not None:
+            sim.stop()
+
+    target = args.path or f"simulator @ {args.baud} baud"
+    print(f"🚀 {args.aantal} opdrachten per meting – {target}")
+    print_rows(rows)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"💾 Resultaten bewaard: {args.out}")
+
+if __name__ == "__main__":
+    main()
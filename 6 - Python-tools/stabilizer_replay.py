@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Stabilisator afstellen zonder camera: opname afspelen (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+sketch.js stuurt een code pas als (vote + sendCodeDebounced):
+- de code de meerderheid heeft in de laatste VOTE_WINDOW frames (≥ de helft),
+- de zekerheid van het huidige frame ≥ CONF_THRESHOLD is,
+- het niet dezelfde code is als minder dan SEND_DEBOUNCE_MS geleden ('0' nooit).
+Een groter venster of een hogere drempel flikkert minder maar reageert trager.
+Deze tool speelt een reeks kansen per frame af door exact die logica, voor
+veel instellingen tegelijk (gevectoriseerd over alle combinaties), en meldt per
+instelling:
+- reactietijd: begin van een voorwerp → bord toont de juiste code (p50/p90),
+  en hoeveel voorwerpen nooit de juiste code kregen,
+- schrijfacties per minuut, waarvan fout (andere code dan wat er ligt),
+- wissels per minuut (het bord springt naar een andere code).
+
+Invoer:
+- een opname uit de browser (sketch.js: localStorage 'sv_record', svMark, svRecording),
+  JSONL: eerste regel {"labels": [...]}, daarna {"t": ms, "p": [...], "truth": label|null};
+- of een map met beelden/videoframes (in volgorde): het model berekent de kansen,
+  de mapnaam geeft de waarheid (bv. opname/03_plastic/0001.jpg); bewaar met --bewaar;
+- of --demo: een synthetische reeks met ruis.
+
+Gebruik:
+    python stabilizer_replay.py opname.jsonl
+    python stabilizer_replay.py frames/ --fps 15 --bewaar opname.jsonl
+    python stabilizer_replay.py --demo --vensters 1,3,5,7 --drempels 0.5,0.65,0.8 --debounce 0,500,1000
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import tm_engine
+from tm_engine import DEFAULT_MODEL_DIR
+
+# NL: standaardwaarden uit sketch.js
+VOTE_WINDOW = 5
+CONF_THRESHOLD = 0.65
+SEND_DEBOUNCE_MS = 500
+
+DEFAULT_WINDOWS = [1, 3, 5, 7, 9]
+DEFAULT_THRESHOLDS = [0.5, 0.6, 0.65, 0.7, 0.8, 0.9]
+DEFAULT_DEBOUNCES = [0, 250, 500, 1000, 2000]
+UNKNOWN = -1   # NL: waarheid niet aangeduid
+EMPTY_WORDS = {"leeg", "niets", "empty", "none"}   # NL: mapnaam voor frames zonder voorwerp
+
+# ======== NL: labels → codes (zoals sketch.js) ========
+
+def canonical(s: str) -> str:
+    s = unicodedata.normalize("NFD", str(s or "").lower().strip())
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return re.sub(r"[^a-z0-9]+", " ", s).strip()
+
+def default_mapping(labels: Sequence[str]) -> Dict[str, str]:
+    """NL: buildDefaultMapping: labels → '1'..'9' in volgorde, mens/human/person → 'X'."""
+    mapping, slot = {}, 1
+    for lbl in labels:
+        key = canonical(lbl)
+        if key not in mapping and slot <= 9:
+            mapping[key] = str(slot)
+            slot += 1
+    for lbl in labels:
+        key = canonical(lbl)
+        if "mens" in key or "human" in key or "person" in key:
+            mapping[key] = "X"
+    return mapping
+
+def code_for_label(lbl: str, mapping: Dict[str, str], default: Optional[str] = "0") -> Optional[str]:
+    """NL: codeForLabel (default=None: onbekend i.p.v. '0', voor mapnamen)."""
+    key = canonical(lbl)
+    if key in mapping:
+        return mapping[key]
+    for k, code in mapping.items():
+        if key.startswith(k) or k in key:
+            return code
+    return default
+
+# ======== NL: invoer ========
+
+class Recording:
+    """NL: t (N,) in ms, probs (N, labels), truth (N,) als code-index of UNKNOWN."""
+
+    def __init__(self, labels: List[str], t: np.ndarray, probs: np.ndarray, truth: List[Optional[str]]):
+        self.labels = labels
+        self.mapping = default_mapping(labels)
+        self.codes = sorted(set(self.mapping.values()) | {"0"})
+        index = {c: i for i, c in enumerate(self.codes)}
+        self.t = np.asarray(t, dtype=np.float64)
+        self.probs = np.asarray(probs, dtype=np.float32)
+        self.truth = np.array([UNKNOWN if c is None else index[c] for c in truth], dtype=np.int64)
+        self.off = index["0"]
+        label_codes = [index[code_for_label(lbl, self.mapping)] for lbl in labels]
+        top = self.probs.argmax(axis=1)   # NL: eerste maximum, zoals de lus in vote()
+        self.frame_code = np.asarray(label_codes, dtype=np.int64)[top]
+        self.conf = self.probs[np.arange(len(top)), top]
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"labels": self.labels}) + "\n")
+            for t, p, truth in zip(self.t, self.probs, self.truth):
+                frame = {"t": round(float(t), 1), "p": [round(float(x), 4) for x in p]}
+                if truth != UNKNOWN:
+                    frame["truth"] = self.codes[truth]
+                f.write(json.dumps(frame) + "\n")
+
+def truth_code(value, mapping: Dict[str, str]) -> Optional[str]:
+    """NL: Waarheid uit een opname: null = niets ('0'), een label of rechtstreeks een code."""
+    if value is None:
+        return "0"
+    value = str(value)
+    if value in set(mapping.values()) | {"0"}:
+        return value
+    return code_for_label(value, mapping, default=None)
+
+def truth_from_folder(path: str, mapping: Dict[str, str]) -> Optional[str]:
+    """NL: Waarheid van een frame uit zijn mapnaam ('03_plastic' → code, 'leeg' → '0', anders onbekend)."""
+    name = os.path.basename(os.path.dirname(path))
+    if set(canonical(name).split()) & EMPTY_WORDS:
+        return "0"
+    return code_for_label(name, mapping, default=None)
+
+def load_recording(path: str) -> Recording:
+    labels, t, probs, truth = None, [], [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if labels is None:
+                labels = [str(lbl) for lbl in row["labels"]]
+                mapping = default_mapping(labels)
+                continue
+            t.append(row["t"])
+            probs.append(row["p"])
+            truth.append(truth_code(row["truth"], mapping) if "truth" in row else None)
+    if not t:
+        raise ValueError(f"Geen frames in {path}")
+    return Recording(labels, t, probs, truth)
+
+def recording_from_images(folder: str, model_dir: str, fps: float, batch: int = 16) -> Recording:
+    """NL: Kansen per frame met de NumPy-engine; waarheid uit de mapnaam (onbekend → niet meegeteld)."""
+    model = tm_engine.load_model(model_dir)
+    paths = tm_engine.walk_images(folder)
+    if not paths:
+        raise ValueError(f"Geen beelden in {folder}")
+    mapping = default_mapping(model.labels)
+    probs = []
+    for i in range(0, len(paths), batch):
+        images = np.stack([tm_engine.load_image(p, model.image_size) for p in paths[i:i + batch]])
+        probs.append(model.predict(images))
+    truth = [truth_from_folder(p, mapping) for p in paths]
+    t = np.arange(len(paths)) * 1000.0 / fps
+    return Recording(model.labels, t, np.concatenate(probs), truth)
+
+def demo_recording(labels: Sequence[str] = ("BIO", "PLASTIC", "METAAL", "PAPIER", "MENS"),
+                   seconds: float = 300, fps: float = 15, seed: int = 7) -> Recording:
+    """NL: Voorwerpen van 2–8 s met lege momenten ertussen; ruis, twijfel en af en toe een fout frame."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * fps)
+    k = len(labels)
+    truth_label = np.full(n, -1)
+    i = 0
+    while i < n:
+        i += int(rng.uniform(1, 3) * fps)                 # NL: leeg
+        length = int(rng.uniform(2, 8) * fps)
+        truth_label[i:i + length] = rng.integers(k)
+        i += length
+    logits = rng.normal(0, 1.0, (n, k))
+    shown = truth_label >= 0
+    logits[shown, truth_label[shown]] += rng.normal(3.0, 1.5, shown.sum())
+    # NL: lege bak: het model kiest toch iets, met een voorkeur die langzaam verschuift
+    drift = np.cumsum(rng.normal(0, 0.3, (n, k)), axis=0) * 0.2
+    logits[~shown] += drift[~shown]
+    glitch = rng.random(n) < 0.05
+    logits[glitch, rng.integers(k, size=glitch.sum())] += 4.0
+    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+    probs = e / e.sum(axis=1, keepdims=True)
+    mapping = default_mapping(labels)
+    truth = ["0" if lbl < 0 else code_for_label(labels[lbl], mapping) for lbl in truth_label]
+    t = np.arange(n) * 1000.0 / fps + rng.normal(0, 5, n).cumsum() * 0.05
+    return Recording(list(labels), np.maximum.accumulate(t), probs, truth)
+
+# ======== NL: stabilisator ========
+
+def majority(codes: np.ndarray, n_codes: int, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    NL: mode() + 'stable' uit vote() voor elk frame tegelijk.
+    Bij gelijke stand wint (zoals in mode()) de code die haar aantal het eerst bereikt.
+    """
+    n = len(codes)
+    onehot = np.zeros((n + 1, n_codes), dtype=np.int64)
+    onehot[np.arange(1, n + 1), codes] = 1
+    cs = onehot.cumsum(axis=0)                          # NL: cs[j] = aantallen in codes[:j]
+    start = np.maximum(0, np.arange(n) - window + 1)
+    counts = cs[1:] - cs[start]
+    best = counts.max(axis=1)
+    # NL: positie van het best-de voorkomen van elke code in het venster
+    occ = np.full((n_codes, n + 1), n, dtype=np.int64)
+    for c in range(n_codes):
+        where = np.flatnonzero(codes == c)
+        occ[c, :len(where)] = where
+    nth = np.clip(cs[start] + best[:, None] - 1, 0, n)
+    reach = np.where(counts == best[:, None], occ[np.arange(n_codes), nth], n + 1)
+    maj = reach.argmin(axis=1)
+    length = np.minimum(np.arange(1, n + 1), window)
+    stable = best >= -(-length // 2)
+    return maj, stable
+
+def replay(rec: Recording, windows: Sequence[int], thresholds: Sequence[float],
+           debounces: Sequence[float]) -> List[Dict]:
+    """NL: Alle combinaties (venster × drempel × debounce) in één doorloop over de frames."""
+    params = [(w, th, db) for w in windows for th in thresholds for db in debounces]
+    n, p = len(rec.t), len(params)
+    want = np.full((n, p), -1, dtype=np.int64)          # NL: te sturen code per frame, of -1
+    by_window = {w: majority(rec.frame_code, len(rec.codes), w) for w in set(windows)}
+    for j, (w, th, _) in enumerate(params):
+        maj, stable = by_window[w]
+        ok = stable & (rec.conf >= th) & (maj != rec.off)
+        want[ok, j] = maj[ok]
+    debounce = np.array([db for _, _, db in params], dtype=np.float64)
+
+    last_code = np.full(p, -1, dtype=np.int64)
+    last_ts = np.full(p, -np.inf)
+    writes = np.zeros(p, dtype=np.int64)
+    wrong = np.zeros(p, dtype=np.int64)
+    switches = np.zeros(p, dtype=np.int64)
+    # NL: reactietijd per voorwerp (segment met dezelfde waarheid ≠ '0')
+    seg_start = np.r_[True, rec.truth[1:] != rec.truth[:-1]]
+    segments = [(i, rec.truth[i]) for i in np.flatnonzero(seg_start)
+                if rec.truth[i] not in (UNKNOWN, rec.off)]
+    latency = np.full((len(segments), p), np.nan)
+    seg_of = np.full(n, -1)
+    for s, (i, _) in enumerate(segments):
+        end = segments[s + 1][0] if s + 1 < len(segments) else n
+        seg_of[i:end] = s
+        seg_of[i:end][rec.truth[i:end] != rec.truth[i]] = -1
+
+    for i in range(n):
+        code, now = want[i], rec.t[i]
+        send = (code >= 0) & ~((code == last_code) & (now - last_ts < debounce))
+        writes += send
+        switches += send & (code != last_code)
+        truth = rec.truth[i]
+        if truth != UNKNOWN:
+            wrong += send & (code != truth)
+        last_code = np.where(send, code, last_code)
+        last_ts = np.where(send, now, last_ts)
+        s = seg_of[i]
+        if s >= 0:
+            hit = (last_code == truth) & np.isnan(latency[s])
+            latency[s, hit] = now - rec.t[segments[s][0]]
+
+    minutes = max((rec.t[-1] - rec.t[0]) / 60000.0, 1e-9)
+    rows = []
+    for j, (w, th, db) in enumerate(params):
+        lat = latency[:, j][~np.isnan(latency[:, j])]
+        rows.append({
+            "window": w, "threshold": th, "debounce_ms": db,
+            "latency_p50_ms": float(np.percentile(lat, 50)) if len(lat) else None,
+            "latency_p90_ms": float(np.percentile(lat, 90)) if len(lat) else None,
+            "objects": len(segments),
+            "missed": int(np.isnan(latency[:, j]).sum()),
+            "writes_per_min": writes[j] / minutes,
+            "wrong_writes": int(wrong[j]),
+            "switches_per_min": switches[j] / minutes,
+            "current": (w, th, db) == (VOTE_WINDOW, CONF_THRESHOLD, SEND_DEBOUNCE_MS),
+        })
+    return rows
+
+def rank(rows: List[Dict]) -> List[Dict]:
+    """NL: Eerst geen voorwerpen missen, dan weinig foute schrijfacties, dan snel, dan weinig verkeer."""
+    inf = float("inf")
+    return sorted(rows, key=lambda r: (r["missed"], r["wrong_writes"],
+                                       r["latency_p50_ms"] if r["latency_p50_ms"] is not None else inf,
+                                       r["writes_per_min"]))
+
+def print_rows(rows: Sequence[Dict]):
+    print("   venster  drempel  debounce   reactie p50/p90 ms   gemist   schrijf/min   fout   wissels/min")
+    for r in rows:
+        lat = ("—" if r["latency_p50_ms"] is None
+               else f"{r['latency_p50_ms']:>6.0f} / {r['latency_p90_ms']:<6.0f}")
+        mark = "  ← sketch.js nu" if r["current"] else ""
+        print(f"   {r['window']:>7} {r['threshold']:>8.2f} {r['debounce_ms']:>9.0f}   {lat:>18}"
+              f"   {r['missed']:>3}/{r['objects']:<3} {r['writes_per_min']:>10.1f} {r['wrong_writes']:>6}"
+              f" {r['switches_per_min']:>12.1f}{mark}")
+
+def parse_list(value: str, cast) -> List:
+    return [cast(x) for x in value.split(",") if x.strip()]
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Speel een opname af door de stabilisator van sketch.js, voor veel instellingen.")
+    ap.add_argument("source", nargs="?", help="opname (.jsonl) of map met frames")
+    ap.add_argument("--demo", action="store_true", help="synthetische opname gebruiken")
+    ap.add_argument("--model", default=DEFAULT_MODEL_DIR, help="model voor een map met frames")
+    ap.add_argument("--fps", type=float, default=15.0, help="beelden per seconde van een map met frames")
+    ap.add_argument("--bewaar", help="berekende kansen als opname (.jsonl) bewaren")
+    ap.add_argument("--vensters", default=",".join(map(str, DEFAULT_WINDOWS)), help="VOTE_WINDOW-waarden")
+    ap.add_argument("--drempels", default=",".join(map(str, DEFAULT_THRESHOLDS)), help="CONF_THRESHOLD-waarden")
+    ap.add_argument("--debounce", default=",".join(map(str, DEFAULT_DEBOUNCES)), help="SEND_DEBOUNCE_MS-waarden")
+    ap.add_argument("--top", type=int, default=10, help="aantal beste instellingen tonen")
+    ap.add_argument("--out", help="alle resultaten als JSON bewaren")
+    args = ap.parse_args(argv)
+
+    try:
+        if args.demo:
+            rec = demo_recording()
+        elif args.source and os.path.isdir(args.source):
+            rec = recording_from_images(args.source, args.model, args.fps)
+        elif args.source:
+            rec = load_recording(args.source)
+        else:
+            print("❌ Geef een opname of een map met frames op, of gebruik --demo.")
+            sys.exit(1)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Opname lezen mislukt: {e}")
+        sys.exit(1)
+    if args.bewaar:
+        rec.save(args.bewaar)
+        print(f"💾 Opname bewaard: {args.bewaar}")
+
+    windows = parse_list(args.vensters, int)
+    thresholds = parse_list(args.drempels, float)
+    debounces = parse_list(args.debounce, float)
+    for extra, values in ((VOTE_WINDOW, windows), (CONF_THRESHOLD, thresholds), (SEND_DEBOUNCE_MS, debounces)):
+        if extra not in values:   # NL: huidige instelling altijd meenemen als referentie
+            values.append(extra)
+    rows = replay(rec, windows, thresholds, debounces)
+    known = int((rec.truth != UNKNOWN).sum())
+    seconds = (rec.t[-1] - rec.t[0]) / 1000
+    print(f"🎞️ {len(rec.t)} frames, {seconds:.0f} s, waarheid voor {known} frames · {len(rows)} instellingen")
+    ranked = rank(rows)
+    print_rows(ranked[:args.top] + [r for r in ranked[args.top:] if r["current"]])
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(ranked, f, indent=2)
+        print(f"💾 Resultaten bewaard: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Batchclassificatie van grote fotomappen (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Labelt duizenden foto's (bv. 's nachts, op een gewone pc) met het model uit
+image_model/, zonder webcam of browser:
+- de mapboom wordt stap voor stap doorlopen (niet eerst volledig ingelezen);
+- een pool van processen doet elk decoderen → bijsnijden/schalen → inferentie
+  op kleine batches; er zijn nooit meer dan 2 batches per proces onderweg;
+- de weights worden één keer gedecodeerd en in gedeeld geheugen gezet: elk
+  proces leest dezelfde bytes (geen kopie per proces, ook niet op Windows);
+- elk resultaat komt meteen als één regel in een JSONL-bestand:
+      {"image": "bak3/0001.jpg", "label": "PLASTIC", "confidence": 0.93,
+       "top": [["PLASTIC", 0.93], ["PAPIER", 0.04], ...], "decode_ms": 41.2, "infer_ms": 38.7}
+  (of {"image": ..., "error": "..."} als een bestand niet te lezen is).
+Onderbroken? Start hetzelfde commando opnieuw: bestanden die al in het
+JSONL-bestand staan (ook met een fout) worden overgeslagen. De volgorde van
+de regels is die van afwerken, niet die van de mappen.
+
+Gebruik:
+    python tm_batch.py "D:/foto's vuilnisbak" --out labels.jsonl
+    python tm_batch.py fotos --model "../4 - HTML-bestanden/image_model/Web-Model" --jobs 4 --batch 8
+
+Vereist: numpy, Pillow en Python 3.8+ (multiprocessing.shared_memory).
+"""
+
+import os
+
+# NL: één rekenthread per proces; de parallelle processen zorgen voor de rest
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+import tm_engine
+from tm_engine import DEFAULT_MODEL_DIR
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:   # NL: Python 3.7
+    shared_memory = None
+
+DEFAULT_BATCH = 8
+IN_FLIGHT_PER_WORKER = 2
+TOP_K = 3
+PROGRESS_EVERY = 100
+ALIGN = 64
+
+# ======== NL: weights in gedeeld geheugen ========
+
+def share_weights(weights: Dict[str, np.ndarray]):
+    """NL: Alle arrays achter elkaar in één SharedMemory-blok; geeft (blok, indeling) terug."""
+    layout, offset = [], 0
+    for name, arr in weights.items():
+        layout.append((name, offset, arr.shape, arr.dtype.str))
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, start, shape, dtype in layout:
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+        view[...] = weights[name]
+    return shm, layout
+
+def attach_weights(shm_name: str, layout: list):
+    """NL: In een werkproces: alleen-lezen views op het gedeelde blok (geen kopie)."""
+    # NL: werkprocessen delen de resource tracker van het hoofdproces: dat ruimt het blok op
+    shm = shared_memory.SharedMemory(name=shm_name)
+    weights = {}
+    for name, start, shape, dtype in layout:
+        arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+        arr.flags.writeable = False
+        weights[name] = arr
+    return shm, weights
+
+# ======== NL: werkprocessen ========
+
+_worker = {}
+
+def _init_worker(shm_name: str, layout: list, data: dict, meta: dict):
+    shm, weights = attach_weights(shm_name, layout)
+    _worker["shm"] = shm   # NL: referentie houden, anders verdwijnt de mapping
+    _worker["model"] = tm_engine.model_from_weights(data, weights, meta)
+
+def classify_paths(items: Sequence[Tuple[str, str]]) -> List[dict]:
+    """NL: Eén batch (relatief pad, absoluut pad): decoderen + voorbewerken, dan één forward pass."""
+    model = _worker["model"]
+    records, images, ok = [], [], []
+    for rel, path in items:
+        t0 = time.perf_counter()
+        try:
+            images.append(tm_engine.load_image(path, model.image_size))
+        except Exception as e:   # NL: kapotte of onleesbare foto: noteren en doorgaan
+            records.append({"image": rel, "error": f"{type(e).__name__}: {e}"})
+            continue
+        ok.append({"image": rel, "decode_ms": round((time.perf_counter() - t0) * 1000, 2)})
+    if images:
+        t0 = time.perf_counter()
+        results = model.classify(np.stack(images))
+        infer_ms = (time.perf_counter() - t0) * 1000 / len(images)
+        for rec, res in zip(ok, results):
+            rec["label"], rec["confidence"] = res[0][0], round(res[0][1], 4)
+            rec["top"] = [[lbl, round(p, 4)] for lbl, p in res[:TOP_K]]
+            rec["infer_ms"] = round(infer_ms, 2)
+            records.append(rec)
+    return records
+
+# ======== NL: hoofdproces ========
+
+def iter_images(root: str) -> Iterator[Tuple[str, str]]:
+    """NL: (pad relatief aan root met '/', absoluut pad), map per map."""
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for path in tm_engine.list_images(dirpath):
+            yield os.path.relpath(path, root).replace(os.sep, "/"), path
+
+def load_done(out_path: str) -> Set[str]:
+    """NL: Bestanden die al in het JSONL-bestand staan; een afgebroken laatste regel telt niet."""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["image"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+def open_output(out_path: str):
+    """NL: Aanvullen; een half geschreven laatste regel (stroomuitval) eerst afsluiten."""
+    f = open(out_path, "a+b")
+    if f.tell():
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+    return f
+
+def chunked(items: Iterator, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run(root: str, out_path: str, model_dir: str = DEFAULT_MODEL_DIR, jobs: Optional[int] = None,
+        batch: int = DEFAULT_BATCH, progress=print) -> Dict:
+    if shared_memory is None:
+        raise RuntimeError("Python 3.8 of nieuwer nodig (multiprocessing.shared_memory).")
+    jobs = jobs or os.cpu_count() or 1
+    data, buffer, meta = tm_engine.read_export(model_dir)
+    weights = tm_engine.decode_weights(data["weightsManifest"], buffer)
+    done = load_done(out_path)
+    todo = ((rel, path) for rel, path in iter_images(root) if rel not in done)
+
+    stats = {"skipped": len(done), "classified": 0, "errors": 0, "decode_ms": 0.0, "infer_ms": 0.0,
+             "weights_mb": sum(a.nbytes for a in weights.values()) / 1e6, "jobs": jobs}
+    shm, layout = share_weights(weights)
+    del weights, buffer
+    t_start = time.perf_counter()
+    # NL: 'spawn' zoals op Windows/macOS, zodat het gedeelde blok overal hetzelfde werkt
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(shm.name, layout, data, meta)) as pool, open_output(out_path) as out:
+            pending, reported = set(), 0
+
+            def drain(block_until: int):
+                nonlocal pending, reported
+                while len(pending) > block_until:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        for rec in fut.result():
+                            out.write((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
+                            if "error" in rec:
+                                stats["errors"] += 1
+                            else:
+                                stats["classified"] += 1
+                                stats["decode_ms"] += rec["decode_ms"]
+                                stats["infer_ms"] += rec["infer_ms"]
+                    out.flush()
+                    n = stats["classified"] + stats["errors"]
+                    if progress and n - reported >= PROGRESS_EVERY:
+                        reported = n
+                        progress(f"⏳ {n} beelden ({n / (time.perf_counter() - t_start):.1f}/s)")
+
+            for chunk in chunked(todo, batch):
+                drain(jobs * IN_FLIGHT_PER_WORKER - 1)
+                pending.add(pool.submit(classify_paths, chunk))
+            drain(0)
+    finally:
+        shm.close()
+        shm.unlink()
+    stats["seconds"] = time.perf_counter() - t_start
+    return stats
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Classificeer een volledige mapboom met het Teachable Machine-model.")
+    ap.add_argument("folder", help="map met foto's (submappen worden meegenomen)")
+    ap.add_argument("--out", default="labels.jsonl", help="JSONL-uitvoer (bestaat ze al: hervatten)")
+    ap.add_argument("--model", default=DEFAULT_MODEL_DIR, help="map met model.json, weights.bin, metadata.json")
+    ap.add_argument("--jobs", type=int, default=None, help="aantal processen (standaard: aantal CPU-kernen)")
+    ap.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="beelden per forward pass")
+    args = ap.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        print(f"❌ Map niet gevonden: {args.folder}")
+        sys.exit(1)
+    try:
+        stats = run(args.folder, args.out, args.model, args.jobs, max(1, args.batch))
+    except KeyboardInterrupt:
+        print(f"\n⏸️ Onderbroken. Start hetzelfde commando opnieuw om verder te gaan ({args.out}).")
+        sys.exit(130)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ Batchclassificatie mislukt: {e}")
+        sys.exit(1)
+
+    n = stats["classified"]
+    rate = (n + stats["errors"]) / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"✅ {n} beelden geclassificeerd, {stats['errors']} fout, {stats['skipped']} al gedaan "
+          f"– {stats['seconds']:.1f} s met {stats['jobs']} processen ({rate:.1f} beelden/s)")
+    if n:
+        print(f"⏱ Per beeld: decoderen {stats['decode_ms'] / n:.1f} ms · inferentie {stats['infer_ms'] / n:.1f} ms "
+              f"· weights gedeeld: {stats['weights_mb']:.1f} MB")
+    print(f"💾 {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark voor Teachable Machine-exports (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Meet voor één image_model/-map:
+- koude laadtijd (JSON parsen + weights decoderen),
+- latentie per beeld (p50/p90/p95/p99),
+- doorvoer bij verschillende batchgroottes,
+- piekgeheugen (RSS),
+- tijd per laag (en per laagtype),
+- top-1 per beeld (+ nauwkeurigheid als de map per klasse is ingedeeld).
+
+Resultaten worden als JSON bewaard. Met --baseline vergelijk je met een eerdere run:
+    python tm_benchmark.py --out basis.json
+    python tm_benchmark.py --model "../4 - HTML-bestanden/image_model/Web-Model" --baseline basis.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+import tm_engine
+import tm_imagecache
+from tm_engine import DEFAULT_MODEL_DIR, DEFAULT_TEST_DIR
+
+try:
+    import resource
+except ImportError:   # NL: Windows heeft geen resource-module
+    resource = None
+
+DEFAULT_BATCH_SIZES = [1, 4, 8, 16]
+REGRESSION_PCT = 10.0   # NL: trager dan dit percentage t.o.v. baseline → waarschuwing
+
+def peak_rss_mb() -> Optional[float]:
+    """NL: Piekgeheugen van dit proces in MB (None als het OS dit niet meldt)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # NL: Linux rapporteert KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    arr = np.asarray(samples, dtype=np.float64) * 1000.0
+    return {
+        "mean_ms": float(arr.mean()),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p90_ms": float(np.percentile(arr, 90)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "p99_ms": float(np.percentile(arr, 99)),
+        "min_ms": float(arr.min()),
+        "max_ms": float(arr.max()),
+    }
+
+def measure_cold_load(model_dir: str) -> Dict[str, float]:
+    """
+    NL: Laadtijd opgesplitst: model.json parsen, shards lezen, decoderen, graaf opbouwen
+    (samen cold_total_ms), plus een tweede, warme load_model() (bestanden in de OS-cache).
+    """
+    t0 = time.perf_counter()
+    with open(os.path.join(model_dir, "model.json"), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    t1 = time.perf_counter()
+    manifest = data["weightsManifest"]
+    buffer = tm_engine.read_weight_shards(model_dir, manifest)
+    t2 = time.perf_counter()
+    weights = tm_engine.decode_weights(manifest, buffer)
+    t3 = time.perf_counter()
+    meta = {}
+    meta_json = os.path.join(model_dir, "metadata.json")
+    if os.path.exists(meta_json):
+        with open(meta_json, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    tm_engine.model_from_weights(data, weights, meta)
+    t4 = time.perf_counter()
+    tm_engine.load_model(model_dir)
+    t5 = time.perf_counter()
+    return {
+        "json_parse_ms": (t1 - t0) * 1000,
+        "weights_read_ms": (t2 - t1) * 1000,
+        "weights_decode_ms": (t3 - t2) * 1000,
+        "graph_build_ms": (t4 - t3) * 1000,
+        "cold_total_ms": (t4 - t0) * 1000,
+        "warm_reload_ms": (t5 - t4) * 1000,
+        "weights_bytes": len(buffer),
+        "model_json_bytes": os.path.getsize(os.path.join(model_dir, "model.json")),
+    }
+
+def true_label(path: str, labels: List[str]) -> Optional[str]:
+    """NL: Klasse afleiden uit de mapnaam (bv. Dataset/PLASTIC/foto.jpg), anders None."""
+    folder = os.path.basename(os.path.dirname(path)).strip().lower()
+    for lbl in labels:
+        if lbl.lower() == folder:
+            return lbl
+    return None
+
+def run_benchmark(model_dir: str, folders: List[str], batch_sizes: List[int],
+                  repeats: int = 3, warmup: int = 2, cache_dir: Optional[str] = None) -> dict:
+    cold = measure_cold_load(model_dir)
+    model = tm_engine.load_model(model_dir)
+
+    paths = []
+    for folder in folders:
+        paths.extend(tm_engine.walk_images(folder) if os.path.isdir(folder) else [folder])
+    if not paths:
+        raise ValueError("Geen afbeeldingen gevonden om te benchmarken.")
+    t0 = time.perf_counter()
+    if cache_dir:
+        # NL: enkel nieuwe/gewijzigde beelden worden gedecodeerd, de rest komt uit de memmap
+        cache, _ = tm_imagecache.open_cache(paths, model.image_size, cache_dir=cache_dir)
+        images = cache.load(paths)
+    else:
+        images = np.stack([tm_engine.load_image(p, model.image_size) for p in paths])
+    decode_ms = (time.perf_counter() - t0) * 1000
+
+    for _ in range(warmup):
+        model.predict(images[:1])
+
+    # NL: latentie per beeld (batch 1) + per-laag-tijden
+    latencies, layer_times = [], {}
+    probs = np.zeros((len(paths), len(model.labels) or 1), dtype=np.float32)
+    for _ in range(repeats):
+        for i in range(len(paths)):
+            t0 = time.perf_counter()
+            out = model.forward(images[i:i + 1], timings=layer_times)
+            latencies.append(time.perf_counter() - t0)
+            probs[i] = out[0]
+
+    n_calls = repeats * len(paths)
+    per_layer = sorted(({"layer": node.name, "type": node.class_name,
+                         "ms": layer_times.get(node.name, 0.0) / n_calls * 1000}
+                        for node in model.nodes if node.name in layer_times),
+                       key=lambda r: -r["ms"])
+    per_type: Dict[str, float] = {}
+    for row in per_layer:
+        per_type[row["type"]] = per_type.get(row["type"], 0.0) + row["ms"]
+
+    # NL: doorvoer bij verschillende batchgroottes (beelden worden herhaald tot de batch vol is)
+    throughput = []
+    for bs in batch_sizes:
+        idx = np.arange(bs) % len(paths)
+        batch = images[idx]
+        model.predict(batch)
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            model.predict(batch)
+        dt = (time.perf_counter() - t0) / repeats
+        throughput.append({"batch_size": bs, "batch_ms": dt * 1000, "images_per_s": bs / dt})
+
+    predictions, correct, known = [], 0, 0
+    for path, row in zip(paths, probs):
+        top = int(np.argmax(row))
+        label = model.labels[top] if top < len(model.labels) else str(top)
+        truth = true_label(path, model.labels)
+        if truth is not None:
+            known += 1
+            correct += int(truth == label)
+        predictions.append({"image": os.path.relpath(path, tm_engine.REPO_DIR), "top1": label,
+                            "confidence": float(row[top]), "truth": truth})
+
+    return {
+        "model_dir": os.path.abspath(model_dir),
+        "labels": model.labels,
+        "image_size": model.image_size,
+        "n_images": len(paths),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "numpy": np.__version__,
+                    "platform": platform.platform(), "cpu_count": os.cpu_count()},
+        "cold_load": cold,
+        "image_decode_ms": decode_ms,
+        "image_cache": cache_dir,
+        "latency": percentiles(latencies),
+        "throughput": throughput,
+        "peak_rss_mb": peak_rss_mb(),
+        "layers": per_layer,
+        "layer_types_ms": dict(sorted(per_type.items(), key=lambda kv: -kv[1])),
+        "accuracy": (correct / known) if known else None,
+        "predictions": predictions,
+    }
+
+def compare_to_baseline(result: dict, baseline: dict) -> dict:
+    """NL: Verschillen t.o.v. een eerdere run (latentie, doorvoer, top-1-overeenkomst)."""
+    base_pred = {p["image"]: p["top1"] for p in baseline.get("predictions", [])}
+    shared = [p for p in result["predictions"] if p["image"] in base_pred]
+    agree = sum(1 for p in shared if base_pred[p["image"]] == p["top1"])
+
+    def pct(new, old):
+        return (new - old) / old * 100 if old else None
+
+    base_tp = {t["batch_size"]: t["images_per_s"] for t in baseline.get("throughput", [])}
+    # NL: oudere baselines hebben enkel full_load_ms: dat was een warme load_model()
+    base_cold = baseline["cold_load"]
+    load_key = "cold_total_ms" if "cold_total_ms" in base_cold else "warm_reload_ms"
+    base_load = base_cold.get(load_key, base_cold.get("full_load_ms"))
+    return {
+        "baseline_model_dir": baseline.get("model_dir"),
+        "p50_delta_pct": pct(result["latency"]["p50_ms"], baseline["latency"]["p50_ms"]),
+        "p95_delta_pct": pct(result["latency"]["p95_ms"], baseline["latency"]["p95_ms"]),
+        "load_delta_pct": pct(result["cold_load"][load_key], base_load),
+        "throughput_delta_pct": {t["batch_size"]: pct(t["images_per_s"], base_tp[t["batch_size"]])
+                                 for t in result["throughput"] if t["batch_size"] in base_tp},
+        "top1_agreement": (agree / len(shared)) if shared else None,
+        "compared_images": len(shared),
+    }
+
+def print_report(result: dict, top_layers: int = 8):
+    cold, lat = result["cold_load"], result["latency"]
+    print(f"\n📊 Benchmark: {result['model_dir']}")
+    print(f"   {result['n_images']} beelden · {result['image_size']}px · labels: {', '.join(result['labels'])}")
+    print(f"⏱ Koud laden: json {cold['json_parse_ms']:.1f} ms · lezen {cold['weights_read_ms']:.1f} ms · "
+          f"decoderen {cold['weights_decode_ms']:.1f} ms · graaf {cold['graph_build_ms']:.1f} ms · "
+          f"totaal {cold['cold_total_ms']:.1f} ms (warm herladen {cold['warm_reload_ms']:.1f} ms)")
+    source = "uit de beeldcache" if result.get("image_cache") else "JPEG decoderen"
+    print(f"🖼️ Beelden inlezen ({source}): {result['image_decode_ms']:.1f} ms")
+    print(f"⏱ Latentie/beeld: p50 {lat['p50_ms']:.1f} · p90 {lat['p90_ms']:.1f} · "
+          f"p95 {lat['p95_ms']:.1f} · p99 {lat['p99_ms']:.1f} ms")
+    for t in result["throughput"]:
+        print(f"🚚 Batch {t['batch_size']:>3}: {t['images_per_s']:.1f} beelden/s ({t['batch_ms']:.1f} ms/batch)")
+    if result["peak_rss_mb"] is not None:
+        print(f"💾 Piekgeheugen: {result['peak_rss_mb']:.0f} MB")
+    print("🧱 Traagste lagen:")
+    for row in result["layers"][:top_layers]:
+        print(f"   {row['ms']:7.2f} ms  {row['type']:<22} {row['layer']}")
+    print("🧱 Per laagtype: " + ", ".join(f"{k} {v:.1f} ms" for k, v in result["layer_types_ms"].items()))
+    if result["accuracy"] is not None:
+        print(f"🎯 Nauwkeurigheid (mapnamen): {result['accuracy'] * 100:.1f}%")
+
+    cmp = result.get("baseline")
+    if cmp:
+        print(f"\n🔁 Vergelijking met baseline ({cmp['baseline_model_dir']}):")
+        for key, name in (("p50_delta_pct", "p50"), ("p95_delta_pct", "p95"), ("load_delta_pct", "laden")):
+            if cmp[key] is not None:
+                flag = "⚠️" if cmp[key] > REGRESSION_PCT else "✅"
+                print(f"   {flag} {name}: {cmp[key]:+.1f}%")
+        if cmp["top1_agreement"] is not None:
+            print(f"   🎯 top-1-overeenkomst: {cmp['top1_agreement'] * 100:.1f}% over {cmp['compared_images']} beelden")
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Benchmark een Teachable Machine-export met de NumPy-engine.")
+    ap.add_argument("folders", nargs="*", help="extra mappen/afbeeldingen (naast 2 - Dataset/Testing)")
+    ap.add_argument("--model", default=DEFAULT_MODEL_DIR, help="image_model/-map om te meten")
+    ap.add_argument("--batch-sizes", default=",".join(map(str, DEFAULT_BATCH_SIZES)),
+                    help="komma-gescheiden batchgroottes voor de doorvoermeting")
+    ap.add_argument("--repeats", type=int, default=3, help="herhalingen per meting")
+    ap.add_argument("--no-testing", action="store_true", help="2 - Dataset/Testing niet meenemen")
+    ap.add_argument("--baseline", help="eerdere JSON-resultaten om mee te vergelijken")
+    ap.add_argument("--cache", nargs="?", const=tm_imagecache.DEFAULT_CACHE_DIR,
+                    help="beelden uit de memory-mapped beeldcache lezen (tm_imagecache.py)")
+    ap.add_argument("--out", help="pad voor het JSON-resultaat (standaard: benchmark_<model>.json)")
+    args = ap.parse_args(argv)
+
+    folders = ([] if args.no_testing else [DEFAULT_TEST_DIR]) + list(args.folders)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b.strip()]
+    try:
+        result = run_benchmark(args.model, folders, batch_sizes, repeats=args.repeats, cache_dir=args.cache)
+    except (OSError, ValueError) as e:
+        print(f"❌ Benchmark mislukt: {e}")
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            result["baseline"] = compare_to_baseline(result, json.load(f))
+
+    print_report(result)
+    out = args.out or f"benchmark_{os.path.basename(os.path.normpath(args.model))}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultaten bewaard in {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Modelbundel (.svmb) voor Slimme Vuilnisbak
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Eén bestand i.p.v. model.json + metadata.json + weights.bin:
+
+    offset 0   vaste kop (24 bytes, little-endian):
+               magic 'SVMB' · versie (u16) · vlaggen (u16)
+               kop-lengte (u32) · kop-lengte ongecomprimeerd (u32)
+               payload-offset (u32) · payload-lengte (u32)
+    offset 24  kop: zlib-gecomprimeerde JSON {"model": model.json, "metadata": metadata.json,
+               "source": sha256 van de originele model.json + weights (zie source_digest)}
+    ...        nullen tot een veelvoud van 64 bytes
+    payload    de weights, exact zoals weights.bin (manifest-volgorde)
+
+De payload start uitgelijnd, zodat zowel Python (memoryview) als de browser
+(Float32Array op de ArrayBuffer) de weights zonder kopie kunnen lezen.
+Enkel standaardbibliotheek: de launcher gebruikt dit bestand ook.
+
+Gebruik:
+    python tm_bundle.py                          # bouwt image_model/model.svmb
+    python tm_bundle.py --model ".../Web-Model" --out web.svmb
+    python tm_bundle.py --info model.svmb
+"""
+
+import os
+import sys
+import json
+import zlib
+import struct
+import hashlib
+import argparse
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+MAGIC = b"SVMB"
+VERSION = 1
+FLAG_ZLIB = 0x1
+ALIGN = 64
+HEADER = struct.Struct("<4sHHIIII")
+BUNDLE_NAME = "model.svmb"
+WEIGHTS_NAME = "weights.bin"
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(TOOLS_DIR), "4 - HTML-bestanden", "image_model")
+
+def source_digest(model_raw: bytes, shards: Sequence[bytes]) -> str:
+    """NL: Inhoudshash van een losse export: model.json zoals op schijf + shards in manifest-volgorde."""
+    digest = hashlib.sha256(model_raw)
+    for shard in shards:
+        digest.update(shard)
+    return digest.hexdigest()
+
+def pack(model: dict, weights: bytes, metadata: Optional[dict] = None, source: Optional[str] = None) -> bytes:
+    """NL: Bouw een bundel uit model.json-data, de weights-buffer en (optioneel) metadata en source_digest."""
+    model = dict(model)
+    specs = [spec for group in model.get("weightsManifest", []) for spec in group.get("weights", [])]
+    model["weightsManifest"] = [{"paths": [WEIGHTS_NAME], "weights": specs}]
+    doc = {"model": model, "metadata": metadata}
+    if source is not None:
+        doc["source"] = source
+    raw = json.dumps(doc, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    header = zlib.compress(raw, 9)
+    payload_offset = -(-(HEADER.size + len(header)) // ALIGN) * ALIGN
+    fixed = HEADER.pack(MAGIC, VERSION, FLAG_ZLIB, len(header), len(raw), payload_offset, len(weights))
+    padding = b"\0" * (payload_offset - HEADER.size - len(header))
+    return b"".join([fixed, header, padding, weights])
+
+def pack_dir(model_dir: str) -> bytes:
+    """NL: Bundel een image_model/-map (alle shards worden achter elkaar gezet)."""
+    with open(os.path.join(model_dir, "model.json"), "rb") as f:
+        model_raw = f.read()
+    model = json.loads(model_raw.decode("utf-8"))
+    parts = []
+    for group in model.get("weightsManifest", []):
+        for rel in group.get("paths", []):
+            with open(os.path.join(model_dir, rel), "rb") as f:
+                parts.append(f.read())
+    metadata = None
+    meta_json = os.path.join(model_dir, "metadata.json")
+    if os.path.exists(meta_json):
+        with open(meta_json, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+    return pack(model, b"".join(parts), metadata, source_digest(model_raw, parts))
+
+def read_header(data: Union[bytes, memoryview]) -> Tuple[dict, memoryview]:
+    """NL: Kop-JSON + weights (zonder kopie) van een bundel; ValueError als ze niet klopt."""
+    view = memoryview(data)
+    if len(view) < HEADER.size:
+        raise ValueError("Bundel is te kort.")
+    magic, version, flags, hlen, raw_len, offset, plen = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Geen Slimme Vuilnisbak-bundel (magic klopt niet).")
+    if version > VERSION:
+        raise ValueError(f"Bundelversie {version} is nieuwer dan deze tool ({VERSION}).")
+    if offset + plen > len(view) or HEADER.size + hlen > offset:
+        raise ValueError("Bundel is beschadigd of afgekapt.")
+    header = bytes(view[HEADER.size:HEADER.size + hlen])
+    if flags & FLAG_ZLIB:
+        header = zlib.decompress(header)
+    if len(header) != raw_len:
+        raise ValueError("Bundelkop heeft een onverwachte lengte.")
+    return json.loads(header.decode("utf-8")), view[offset:offset + plen]
+
+def unpack(data: Union[bytes, memoryview]) -> Tuple[dict, Optional[dict], memoryview]:
+    """NL: Lees een bundel; geeft (model.json-data, metadata, weights) terug — weights zonder kopie."""
+    doc, weights = read_header(data)
+    return doc["model"], doc.get("metadata"), weights
+
+def bundle_source(data: Union[bytes, memoryview]) -> Optional[str]:
+    """NL: source_digest van de export waaruit de bundel gemaakt is (None bij oudere bundels)."""
+    return read_header(data)[0].get("source")
+
+def expand(data: Union[bytes, memoryview]) -> Dict[str, Union[bytes, memoryview]]:
+    """NL: Bundel → {bestandsnaam: inhoud} zoals een gewone image_model/-map (in geheugen)."""
+    model, metadata, weights = unpack(data)
+    files: Dict[str, Union[bytes, memoryview]] = {
+        "model.json": json.dumps(model, separators=(",", ":")).encode("utf-8"),
+        WEIGHTS_NAME: weights,
+    }
+    if metadata is not None:
+        files["metadata.json"] = json.dumps(metadata, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return files
+
+def bundle_id(data: Union[bytes, memoryview]) -> str:
+    """NL: Inhoudshash (16 hex-tekens) voor een onveranderlijke URL."""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Bundel een Teachable Machine-export in één .svmb-bestand.")
+    ap.add_argument("--model", default=DEFAULT_MODEL_DIR, help="image_model/-map om te bundelen")
+    ap.add_argument("--out", help=f"doelbestand (standaard: <model>/{BUNDLE_NAME})")
+    ap.add_argument("--info", metavar="BUNDEL", help="toon de inhoud van een bestaande bundel")
+    args = ap.parse_args(argv)
+
+    if args.info:
+        with open(args.info, "rb") as f:
+            data = f.read()
+        model, metadata, weights = unpack(data)
+        n = sum(len(g["weights"]) for g in model["weightsManifest"])
+        labels = ", ".join((metadata or {}).get("labels", [])) or "—"
+        print(f"📦 {args.info}: {len(data) / 1024:.0f} KB · id {bundle_id(data)}")
+        print(f"   {n} tensors · weights {len(weights) / 1024:.0f} KB · labels: {labels}")
+        return
+
+    try:
+        data = pack_dir(args.model)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Bundelen mislukt: {e}")
+        sys.exit(1)
+    out = args.out or os.path.join(args.model, BUNDLE_NAME)
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, out)
+    print(f"✅ Bundel geschreven: {out} ({len(data) / 1024:.0f} KB, id {bundle_id(data)})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Headless NumPy-engine voor Teachable Machine-modellen (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Werking:
+- Leest image_model/model.json (geneste Sequential/MobileNet-topologie + weightsManifest).
+- Decodeert weights.bin (alle shards) naar NumPy-arrays.
+- Voert de 224×224×3 forward pass uit met gevectoriseerde, gebatchte ops:
+  Conv2D, DepthwiseConv2D, BatchNormalization, ReLU(6), Add, GlobalAveragePooling2D, Dense.
+- Geeft de labels uit metadata.json terug met hun waarschijnlijkheid.
+
+Gebruik:
+    python tm_engine.py foto1.jpg foto2.jpg
+    python tm_engine.py --model "../4 - HTML-bestanden/image_model/Web-Model" foto.jpg
+
+Vereist: numpy (en Pillow om afbeeldingen te lezen).
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# NL: Pillow is enkel nodig om afbeeldingen te openen (niet voor de forward pass zelf)
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TOOLS_DIR)
+DEFAULT_MODEL_DIR = os.path.join(REPO_DIR, "4 - HTML-bestanden", "image_model")
+DEFAULT_TEST_DIR = os.path.join(REPO_DIR, "2 - Dataset", "Testing")
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp"}
+
+# ======== NL: weights decoderen ========
+
+DTYPES = {
+    "float32": np.float32,
+    "int32": np.int32,
+    "bool": np.bool_,
+}
+
+# NL: opslagtypes voor gekwantiseerde weights (TF.js 'quantization'-veld)
+QUANT_DTYPES = {
+    "uint8": np.uint8,
+    "uint16": np.uint16,
+    "float16": np.float16,
+}
+
+def read_weight_shards(model_dir: str, manifest: List[dict]) -> bytes:
+    """NL: Plak alle shards (in manifest-volgorde) aan elkaar tot één buffer."""
+    parts = []
+    for group in manifest:
+        for rel in group.get("paths", []):
+            with open(os.path.join(model_dir, rel), "rb") as f:
+                parts.append(f.read())
+    return b"".join(parts)
+
+def dequantize(raw: np.ndarray, quant: dict) -> np.ndarray:
+    """NL: uint8/uint16 affine (q * scale + min) of float16 terug naar float32."""
+    if quant["dtype"] == "float16":
+        return raw.astype(np.float32)
+    return raw.astype(np.float32) * np.float32(quant["scale"]) + np.float32(quant["min"])
+
+def decode_weights(manifest: List[dict], buffer: bytes) -> Dict[str, np.ndarray]:
+    """NL: Zet de ruwe buffer om naar {naam: array} volgens weightsManifest (ook gekwantiseerd)."""
+    weights = {}
+    offset = 0
+    for group in manifest:
+        for spec in group.get("weights", []):
+            quant = spec.get("quantization")
+            if quant:
+                dtype = QUANT_DTYPES.get(quant.get("dtype"))
+            else:
+                dtype = DTYPES.get(spec["dtype"])
+            if dtype is None:
+                raise ValueError(f"Onbekend dtype in weightsManifest: {spec['dtype']} ({spec['name']})")
+            shape = tuple(spec["shape"])
+            count = int(np.prod(shape)) if shape else 1
+            nbytes = count * np.dtype(dtype).itemsize
+            if offset + nbytes > len(buffer):
+                raise ValueError(f"weights.bin is te kort voor {spec['name']}")
+            arr = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            arr = dequantize(arr, quant) if quant else arr.astype(np.float32, copy=False)
+            weights[spec["name"]] = arr.reshape(shape)
+            offset += nbytes
+    return weights
+
+# ======== NL: topologie platslaan ========
+
+class Node:
+    """NL: Eén laag in de platgeslagen graaf: naam, type, config en namen van de invoer."""
+
+    __slots__ = ("name", "class_name", "config", "inputs")
+
+    def __init__(self, name: str, class_name: str, config: dict, inputs: List[str]):
+        self.name = name
+        self.class_name = class_name
+        self.config = config
+        self.inputs = inputs
+
+    def __repr__(self):
+        return f"Node({self.class_name} {self.name} <- {self.inputs})"
+
+def flatten_topology(layer: dict, inputs: List[str], nodes: List[Node]) -> str:
+    """
+    NL: Zet (geneste) Sequential/Model-lagen om naar een lineaire lijst nodes.
+    Geeft de naam van de uitvoer-tensor terug.
+    """
+    cls = layer["class_name"]
+    cfg = layer["config"]
+
+    if cls == "Sequential":
+        out = inputs[0] if inputs else None
+        for sub in cfg["layers"]:
+            out = flatten_topology(sub, [out] if out else [], nodes)
+        return out
+
+    if cls in ("Model", "Functional"):
+        # NL: functioneel model: invoerlaag koppelen aan de buitenste invoer
+        alias = {}
+        input_names = [spec[0] for spec in cfg.get("input_layers", [])]
+        for sub in cfg["layers"]:
+            name = sub.get("name") or sub["config"]["name"]
+            if sub["class_name"] == "InputLayer":
+                if inputs:
+                    alias[name] = inputs[input_names.index(name)] if name in input_names else inputs[0]
+                else:
+                    nodes.append(Node(name, "InputLayer", sub["config"], []))
+                    alias[name] = name
+                continue
+            srcs = []
+            for inbound in sub.get("inbound_nodes", [])[:1]:
+                for ref in inbound:
+                    srcs.append(alias.get(ref[0], ref[0]))
+            nodes.append(Node(name, sub["class_name"], sub["config"], srcs))
+            alias[name] = name
+        outputs = cfg.get("output_layers", [])
+        return alias[outputs[0][0]] if outputs else nodes[-1].name
+
+    name = cfg["name"]
+    if cls == "InputLayer":
+        nodes.append(Node(name, cls, cfg, []))
+        return name
+    if not inputs:
+        # NL: eerste laag van een Sequential zonder aparte InputLayer
+        nodes.append(Node(name + "_input", "InputLayer", cfg, []))
+        inputs = [name + "_input"]
+    nodes.append(Node(name, cls, cfg, list(inputs)))
+    return name
+
+# ======== NL: gevectoriseerde ops (NHWC, float32) ========
+
+def same_padding(size: int, k: int, s: int, d: int = 1) -> Tuple[int, int]:
+    """NL: TensorFlow 'same'-padding: (voor, na) zodat uitvoer = ceil(size / s)."""
+    k_eff = (k - 1) * d + 1
+    out = -(-size // s)
+    total = max((out - 1) * s + k_eff - size, 0)
+    return total // 2, total - total // 2
+
+def pad_input(x: np.ndarray, cfg: dict, kh: int, kw: int) -> np.ndarray:
+    if cfg.get("padding", "valid") != "same":
+        return x
+    sh, sw = cfg.get("strides", [1, 1])
+    dh, dw = cfg.get("dilation_rate", [1, 1])
+    ph = same_padding(x.shape[1], kh, sh, dh)
+    pw = same_padding(x.shape[2], kw, sw, dw)
+    if ph == (0, 0) and pw == (0, 0):
+        return x
+    return np.pad(x, ((0, 0), ph, pw, (0, 0)))
+
+def conv2d(x: np.ndarray, kernel: np.ndarray, cfg: dict) -> np.ndarray:
+    """NL: Conv2D; 1×1 als matmul, anders im2col via sliding_window_view + tensordot."""
+    kh, kw, cin, cout = kernel.shape
+    sh, sw = cfg.get("strides", [1, 1])
+    dh, dw = cfg.get("dilation_rate", [1, 1])
+    x = pad_input(x, cfg, kh, kw)
+    if kh == 1 and kw == 1:
+        if sh != 1 or sw != 1:
+            x = x[:, ::sh, ::sw, :]
+        n, h, w, _ = x.shape
+        return (x.reshape(-1, cin) @ kernel.reshape(cin, cout)).reshape(n, h, w, cout)
+    win = np.lib.stride_tricks.sliding_window_view(
+        x, ((kh - 1) * dh + 1, (kw - 1) * dw + 1), axis=(1, 2))
+    win = win[:, ::sh, ::sw, :, ::dh, ::dw]          # (n, ho, wo, cin, kh, kw)
+    return np.tensordot(win, kernel, axes=([3, 4, 5], [2, 0, 1]))
+
+def depthwise_conv2d(x: np.ndarray, kernel: np.ndarray, cfg: dict) -> np.ndarray:
+    """NL: Depthwise conv als kh×kw gevectoriseerde multiply-adds over verschoven slices."""
+    kh, kw, cin, mult = kernel.shape
+    sh, sw = cfg.get("strides", [1, 1])
+    dh, dw = cfg.get("dilation_rate", [1, 1])
+    if mult != 1:
+        x = np.repeat(x, mult, axis=3)
+    k = kernel.reshape(kh, kw, cin * mult)
+    x = pad_input(x, cfg, kh, kw)
+    n, h, w, c = x.shape
+    ho = (h - (kh - 1) * dh - 1) // sh + 1
+    wo = (w - (kw - 1) * dw - 1) // sw + 1
+    out = np.zeros((n, ho, wo, c), dtype=np.float32)
+    for i in range(kh):
+        for j in range(kw):
+            r, q = i * dh, j * dw
+            out += x[:, r:r + sh * (ho - 1) + 1:sh, q:q + sw * (wo - 1) + 1:sw, :] * k[i, j]
+    return out
+
+def apply_activation(x: np.ndarray, name: Optional[str]) -> np.ndarray:
+    if not name or name == "linear":
+        return x
+    if name == "relu":
+        return np.maximum(x, 0)
+    if name == "relu6":
+        return np.clip(x, 0, 6)
+    if name == "sigmoid":
+        return 1.0 / (1.0 + np.exp(-x))
+    if name == "tanh":
+        return np.tanh(x)
+    if name == "softmax":
+        e = np.exp(x - x.max(axis=-1, keepdims=True))
+        return e / e.sum(axis=-1, keepdims=True)
+    raise ValueError(f"Activatie niet ondersteund: {name}")
+
+# ======== NL: het model ========
+
+class TMModel:
+    """
+    NL: Teachable Machine-model in NumPy.
+    Gebruik load_model(map) om te laden; predict(batch) geeft waarschijnlijkheden (N, klassen).
+    """
+
+    def __init__(self, nodes: List[Node], weights: Dict[str, np.ndarray],
+                 labels: List[str], image_size: int, output: str):
+        self.nodes = nodes
+        self.weights = weights
+        self.labels = labels
+        self.image_size = image_size
+        self.output = output
+        self._params = {node.name: self._prepare(node) for node in nodes}
+
+    def _w(self, layer: str, param: str) -> Optional[np.ndarray]:
+        return self.weights.get(f"{layer}/{param}")
+
+    def _prepare(self, node: Node) -> dict:
+        """NL: Per laag de gewichten één keer klaarzetten (bv. BN → scale/shift)."""
+        cls, name, cfg = node.class_name, node.name, node.config
+        if cls == "Conv2D":
+            return {"kernel": self._w(name, "kernel"), "bias": self._w(name, "bias")}
+        if cls == "DepthwiseConv2D":
+            return {"kernel": self._w(name, "depthwise_kernel"), "bias": self._w(name, "bias")}
+        if cls == "Dense":
+            return {"kernel": self._w(name, "kernel"), "bias": self._w(name, "bias")}
+        if cls == "BatchNormalization":
+            mean = self._w(name, "moving_mean")
+            var = self._w(name, "moving_variance")
+            gamma = self._w(name, "gamma")
+            beta = self._w(name, "beta")
+            scale = 1.0 / np.sqrt(var + cfg.get("epsilon", 1e-3))
+            if gamma is not None:
+                scale = scale * gamma
+            shift = -mean * scale
+            if beta is not None:
+                shift = shift + beta
+            return {"scale": scale.astype(np.float32), "shift": shift.astype(np.float32)}
+        return {}
+
+    def _run(self, node: Node, args: List[np.ndarray]) -> np.ndarray:
+        cls, cfg, p = node.class_name, node.config, self._params[node.name]
+        x = args[0] if args else None
+        if cls == "Conv2D":
+            y = conv2d(x, p["kernel"], cfg)
+            if p["bias"] is not None:
+                y += p["bias"]
+            return apply_activation(y, cfg.get("activation"))
+        if cls == "DepthwiseConv2D":
+            y = depthwise_conv2d(x, p["kernel"], cfg)
+            if p["bias"] is not None:
+                y += p["bias"]
+            return apply_activation(y, cfg.get("activation"))
+        if cls == "BatchNormalization":
+            return x * p["scale"] + p["shift"]
+        if cls == "ReLU":
+            y = np.maximum(x, cfg.get("threshold", 0) or 0)
+            if cfg.get("max_value") is not None:
+                y = np.minimum(y, cfg["max_value"])
+            return y
+        if cls == "Activation":
+            return apply_activation(x, cfg.get("activation"))
+        if cls == "ZeroPadding2D":
+            pad = cfg.get("padding", [[1, 1], [1, 1]])
+            if isinstance(pad, int):
+                pad = [[pad, pad], [pad, pad]]
+            return np.pad(x, ((0, 0), tuple(pad[0]), tuple(pad[1]), (0, 0)))
+        if cls == "Add":
+            y = args[0].copy()
+            for other in args[1:]:
+                y += other
+            return y
+        if cls == "GlobalAveragePooling2D":
+            return x.mean(axis=(1, 2))
+        if cls == "Flatten":
+            return x.reshape(x.shape[0], -1)
+        if cls == "Dense":
+            y = x @ p["kernel"]
+            if p["bias"] is not None:
+                y += p["bias"]
+            return apply_activation(y, cfg.get("activation"))
+        if cls in ("Dropout", "InputLayer"):
+            return x
+        raise ValueError(f"Laagtype niet ondersteund: {cls} ({node.name})")
+
+    def forward(self, batch: np.ndarray, timings: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        NL: Forward pass op een batch (N, H, W, 3) in [-1, 1].
+        Met een timings-dict wordt per laag de rekentijd (s) opgeteld.
+        """
+        values = {}
+        refs = {}
+        for node in self.nodes:
+            for src in node.inputs:
+                refs[src] = refs.get(src, 0) + 1
+        for node in self.nodes:
+            if node.class_name == "InputLayer":
+                values[node.name] = batch.astype(np.float32, copy=False)
+                continue
+            args = [values[src] for src in node.inputs]
+            if timings is None:
+                values[node.name] = self._run(node, args)
+            else:
+                t0 = time.perf_counter()
+                values[node.name] = self._run(node, args)
+                timings[node.name] = timings.get(node.name, 0.0) + time.perf_counter() - t0
+            # NL: tussenresultaten vrijgeven zodra niemand ze nog nodig heeft
+            for src in node.inputs:
+                refs[src] -= 1
+                if refs[src] == 0 and src != self.output:
+                    del values[src]
+        return values[self.output]
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """NL: Waarschijnlijkheden (N, klassen) voor een voorbewerkte batch."""
+        return self.forward(batch)
+
+    def classify(self, batch: np.ndarray) -> List[List[Tuple[str, float]]]:
+        """NL: Per beeld: lijst (label, kans), hoogste eerst."""
+        probs = self.predict(batch)
+        results = []
+        for row in probs:
+            order = np.argsort(-row)
+            results.append([(self.labels[i] if i < len(self.labels) else str(i), float(row[i])) for i in order])
+        return results
+
+def read_export(model_dir: str) -> Tuple[dict, bytes, dict]:
+    """NL: Lees (model.json-data, weights-buffer, metadata) uit een image_model/-map."""
+    with open(os.path.join(model_dir, "model.json"), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    manifest = data.get("weightsManifest", [])
+    if not manifest:
+        raise ValueError("weightsManifest ontbreekt of is leeg in model.json.")
+    buffer = read_weight_shards(model_dir, manifest)
+    meta = {}
+    meta_json = os.path.join(model_dir, "metadata.json")
+    if os.path.exists(meta_json):
+        with open(meta_json, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    return data, buffer, meta
+
+def model_from_export(data: dict, buffer: bytes, meta: Optional[dict] = None) -> TMModel:
+    """NL: Bouw een TMModel uit reeds ingelezen model.json-data + weights (zonder bestanden)."""
+    return model_from_weights(data, decode_weights(data["weightsManifest"], buffer), meta)
+
+def model_from_weights(data: dict, weights: Dict[str, np.ndarray], meta: Optional[dict] = None) -> TMModel:
+    """NL: Bouw een TMModel uit model.json-data en al gedecodeerde weights (bv. in gedeeld geheugen)."""
+    meta = meta or {}
+    labels = [str(lbl) for lbl in meta.get("labels", [])]
+    image_size = int(meta.get("imageSize", 224))
+
+    topology = data["modelTopology"]
+    if "model_config" in topology:   # NL: Keras-export met extra omhulsel
+        topology = topology["model_config"]
+    nodes: List[Node] = []
+    output = flatten_topology(topology, [], nodes)
+    return TMModel(nodes, weights, labels, image_size, output)
+
+def load_model(model_dir: str = DEFAULT_MODEL_DIR) -> TMModel:
+    """NL: Lees model.json + weights + metadata.json uit een image_model/-map."""
+    return model_from_export(*read_export(model_dir))
+
+def write_export(out_dir: str, data: dict, buffer: bytes, meta: Optional[dict] = None,
+                 weights_name: str = "weights.bin"):
+    """
+    NL: Schrijf model.json + één weights-shard + metadata.json naar out_dir.
+    Alle manifest-groepen worden samengevoegd (buffer moet in dezelfde volgorde staan).
+    Eerst naar tijdelijke bestanden, dan os.replace: lezers zien nooit een half model.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    data = dict(data)
+    specs = [spec for group in data["weightsManifest"] for spec in group.get("weights", [])]
+    data["weightsManifest"] = [{"paths": [weights_name], "weights": specs}]
+    files = [(weights_name, buffer),
+             ("model.json", json.dumps(data, separators=(",", ":")).encode("utf-8"))]
+    if meta is not None:
+        files.append(("metadata.json", json.dumps(meta, separators=(",", ":"), ensure_ascii=False).encode("utf-8")))
+    for name, payload in files:
+        tmp = os.path.join(out_dir, f".{name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, os.path.join(out_dir, name))
+
+# ======== NL: voorbewerking (zoals @teachablemachine/image) ========
+
+def crop_resize(img, size: int) -> np.ndarray:
+    """NL: Midden vierkant bijsnijden en schalen naar size×size: (size, size, 3) uint8."""
+    if Image is None:
+        raise ImportError("Pillow ontbreekt: installeer met 'pip install pillow'.")
+    img = img.convert("RGB")
+    w, h = img.size
+    side = min(w, h)
+    left, top = (w - side) // 2, (h - side) // 2
+    img = img.crop((left, top, left + side, top + side)).resize((size, size), Image.BILINEAR)
+    return np.asarray(img, dtype=np.uint8)
+
+def normalize(pixels: np.ndarray) -> np.ndarray:
+    """NL: uint8-pixels naar [-1, 1] met /127 - 1 (identiek aan tmImage)."""
+    return pixels.astype(np.float32) / 127.0 - 1.0
+
+def preprocess_image(img, size: int) -> np.ndarray:
+    """
+    NL: Midden vierkant bijsnijden, schalen naar size×size en normaliseren
+    naar [-1, 1] met /127 - 1 (identiek aan tmImage).
+    """
+    return normalize(crop_resize(img, size))
+
+def load_image(path: str, size: int) -> np.ndarray:
+    """NL: Open een afbeelding en geef (size, size, 3) float32 terug."""
+    if Image is None:
+        raise ImportError("Pillow ontbreekt: installeer met 'pip install pillow'.")
+    with Image.open(path) as img:
+        return preprocess_image(img, size)
+
+def list_images(folder: str) -> List[str]:
+    """NL: Alle afbeeldingen in een map (niet recursief), natuurlijk gesorteerd (2.jpg vóór 10.jpg)."""
+    names = [n for n in os.listdir(folder) if os.path.splitext(n)[1].lower() in IMAGE_EXTS]
+    key: Callable[[str], tuple] = lambda n: (len(os.path.splitext(n)[0]), n.lower())
+    return [os.path.join(folder, n) for n in sorted(names, key=key)]
+
+def walk_images(root: str) -> List[str]:
+    """NL: Alle afbeeldingen onder root (recursief, verborgen mappen overgeslagen)."""
+    found = []
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        found.extend(list_images(dirpath))
+    return found
+
+# ======== NL: CLI ========
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Classificeer afbeeldingen met het Teachable Machine-model (zonder browser).")
+    ap.add_argument("images", nargs="*", help="afbeeldingen of mappen (standaard: 2 - Dataset/Testing)")
+    ap.add_argument("--model", default=DEFAULT_MODEL_DIR, help="map met model.json, weights.bin, metadata.json")
+    ap.add_argument("--top", type=int, default=1, help="aantal labels per afbeelding")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    model = load_model(args.model)
+    print(f"✅ (Model) Geladen in {(time.perf_counter() - t0) * 1000:.0f} ms: {', '.join(model.labels)}")
+
+    paths = []
+    for item in args.images or [DEFAULT_TEST_DIR]:
+        paths.extend(list_images(item) if os.path.isdir(item) else [item])
+    if not paths:
+        print("❌ Geen afbeeldingen gevonden.")
+        sys.exit(1)
+
+    batch = np.stack([load_image(p, model.image_size) for p in paths])
+    t0 = time.perf_counter()
+    results = model.classify(batch)
+    dt = time.perf_counter() - t0
+    for path, res in zip(paths, results):
+        top = ", ".join(f"{lbl} {prob * 100:.0f}%" for lbl, prob in res[:args.top])
+        print(f"🔎 {os.path.basename(path)}: {top}")
+    print(f"⏱ {len(paths)} beelden in {dt * 1000:.0f} ms ({dt / len(paths) * 1000:.1f} ms/beeld)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Beeldcache voor datasets: één keer decoderen, daarna memory-mapped (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Elke evaluatie decodeert dezelfde JPEG's opnieuw (6.jpg is 540 KB) en snijdt ze
+opnieuw bij naar 224×224. Deze cache doet dat één keer:
+- per beeld: midden bijsnijden + schalen (tm_engine.crop_resize), opgeslagen als
+  uint8 (4× kleiner, genormaliseerd bij het uitlezen) of float32 (al in [-1, 1]);
+- alle beelden als vaste records in één bestand, geopend met np.memmap;
+- index-<size>-<dtype>.json koppelt de sha256 van het bronbestand aan een record;
+  per pad staan ook grootte en mtime, zodat een ongewijzigd bestand niet eens
+  opnieuw gelezen wordt.
+Nieuwe of gewijzigde bestanden worden achteraan toegevoegd; de index wordt pas
+daarna (atomair) herschreven, dus een onderbroken update laat geen kapotte cache
+achter. Records die niemand nog gebruikt, ruim je op met --opruimen.
+
+Batches zijn views op de memmap (geen kopie) zolang de records aaneensluiten,
+wat het geval is voor mappen die in één keer zijn toegevoegd.
+
+Gebruik:
+    python tm_imagecache.py                         # 2 - Dataset/Testing, 224 px, uint8
+    python tm_imagecache.py mijn_dataset --dtype float32 --bench
+    python tm_benchmark.py --cache                  # evaluatie vanuit de cache
+
+Vereist: numpy en Pillow (enkel voor beelden die nog niet in de cache zitten).
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import tm_engine
+from tm_engine import DEFAULT_TEST_DIR
+
+DEFAULT_CACHE_DIR = os.path.join(tm_engine.REPO_DIR, "2 - Dataset", ".beeldcache")
+DTYPES = ("uint8", "float32")
+INDEX_VERSION = 1
+HASH_CHUNK = 1 << 20
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def decode(path: str, size: int, dtype: str) -> np.ndarray:
+    """NL: Eén bronbeeld → record zoals het in de cache komt."""
+    if tm_engine.Image is None:
+        raise ImportError("Pillow ontbreekt: installeer met 'pip install pillow'.")
+    with tm_engine.Image.open(path) as img:
+        pixels = tm_engine.crop_resize(img, size)
+    return pixels if dtype == "uint8" else tm_engine.normalize(pixels)
+
+class ImageCache:
+    """
+    NL: Memory-mapped voorbewerkte beelden voor één (size, dtype).
+    update(paden) vult aan; batches(paden, n) geeft (paden, array) in [-1, 1] terug.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, size: int = 224, dtype: str = "uint8"):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype moet een van {', '.join(DTYPES)} zijn, niet {dtype}")
+        self.cache_dir = cache_dir
+        self.size = size
+        self.dtype = dtype
+        self.shape = self._record_shape()
+        self.record_bytes = int(np.prod(self.shape)) * np.dtype(dtype).itemsize
+        data_name, index_name = self._names()
+        self.data_path = os.path.join(cache_dir, data_name)
+        self.index_path = os.path.join(cache_dir, index_name)
+        self.slots: Dict[str, int] = {}     # NL: sha256 → recordnummer
+        self.files: Dict[str, dict] = {}    # NL: absoluut pad → {sha256, bytes, mtime_ns}
+        self.count = 0
+        self._map: Optional[np.memmap] = None
+        self._load_index()
+
+    # NL: subklassen (bv. tm_retrain.EmbeddingCache) bewaren iets anders per bronbeeld
+    def _record_shape(self) -> Tuple[int, ...]:
+        return (self.size, self.size, 3)
+
+    def _names(self) -> Tuple[str, str]:
+        """NL: (databestand, indexbestand) in cache_dir."""
+        return f"beelden-{self.size}-{self.dtype}.bin", f"index-{self.size}-{self.dtype}.json"
+
+    def _compute(self, paths: Sequence[str], jobs: Optional[int]) -> Iterator[np.ndarray]:
+        """NL: Records voor nieuwe inhoud, in volgorde (parallel: Pillow geeft de GIL vrij)."""
+        size, dtype = self.size, self.dtype
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            yield from pool.map(lambda p: decode(p, size, dtype), paths)
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get("version") != INDEX_VERSION or index.get("size") != self.size:
+            return
+        count = int(index.get("count", 0))
+        # NL: records voorbij het einde van het databestand zijn nooit volledig geschreven
+        have = os.path.getsize(self.data_path) // self.record_bytes if os.path.exists(self.data_path) else 0
+        if have < count:
+            return
+        self.count = count
+        self.slots = dict(index.get("slots", {}))
+        self.files = dict(index.get("files", {}))
+
+    def _save_index(self):
+        index = {"version": INDEX_VERSION, "size": self.size, "dtype": self.dtype,
+                 "count": self.count, "slots": self.slots, "files": self.files}
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+        os.replace(tmp, self.index_path)
+
+    def _hash(self, path: str) -> Tuple[str, bool]:
+        """NL: (sha256, opnieuw gelezen?) – ongewijzigde grootte + mtime → hash uit de index."""
+        st = os.stat(path)
+        known = self.files.get(path)
+        if known and known["bytes"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+            return known["sha256"], False
+        digest = file_sha256(path)
+        self.files[path] = {"sha256": digest, "bytes": st.st_size, "mtime_ns": st.st_mtime_ns}
+        return digest, True
+
+    def update(self, paths: Sequence[str], jobs: Optional[int] = None) -> Dict[str, int]:
+        """NL: Zorg dat elk pad in de cache zit. Enkel nieuwe inhoud wordt gedecodeerd."""
+        paths = [os.path.abspath(p) for p in paths]
+        stats = {"total": len(paths), "hashed": 0, "decoded": 0, "reused": 0}
+        todo: Dict[str, str] = {}           # NL: sha256 → eerste pad met die inhoud
+        for path in paths:
+            digest, hashed = self._hash(path)
+            stats["hashed"] += hashed
+            if digest in self.slots or digest in todo:
+                stats["reused"] += 1
+            else:
+                todo[digest] = path
+        if todo:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.data_path, "r+b" if os.path.exists(self.data_path) else "wb") as f:
+                f.seek(self.count * self.record_bytes)
+                f.truncate()
+                for digest, record in zip(todo, self._compute(list(todo.values()), jobs)):
+                    f.write(np.ascontiguousarray(record, dtype=self.dtype).tobytes())
+                    self.slots[digest] = self.count
+                    self.count += 1
+                    stats["decoded"] += 1
+            self._map = None
+        if todo or stats["hashed"]:
+            self._save_index()
+        return stats
+
+    def array(self) -> np.ndarray:
+        """NL: Alle records als (count,) + shape memmap (alleen-lezen)."""
+        if self._map is None or len(self._map) != self.count:
+            if not self.count:
+                return np.empty((0,) + self.shape, dtype=self.dtype)
+            self._map = np.memmap(self.data_path, dtype=self.dtype, mode="r",
+                                  shape=(self.count,) + self.shape)
+        return self._map
+
+    def slot_of(self, path: str) -> int:
+        path = os.path.abspath(path)
+        info = self.files.get(path)
+        if info is None or info["sha256"] not in self.slots:
+            raise KeyError(f"Niet in de cache (eerst update): {path}")
+        return self.slots[info["sha256"]]
+
+    def raw(self, paths: Sequence[str]) -> np.ndarray:
+        """NL: Records zoals opgeslagen; een view als de records aaneensluiten, anders een kopie."""
+        slots = [self.slot_of(p) for p in paths]
+        data = self.array()
+        if slots and slots == list(range(slots[0], slots[0] + len(slots))):
+            return data[slots[0]:slots[0] + len(slots)]
+        return data[slots]
+
+    def load(self, paths: Sequence[str]) -> np.ndarray:
+        """NL: Batch in [-1, 1] zoals tm_engine.load_image (float32-cache: zonder kopie)."""
+        raw = self.raw(paths)
+        return raw if self.dtype == "float32" else tm_engine.normalize(raw)
+
+    def batches(self, paths: Sequence[str], batch_size: int) -> Iterator[Tuple[List[str], np.ndarray]]:
+        for i in range(0, len(paths), batch_size):
+            chunk = list(paths[i:i + batch_size])
+            yield chunk, self.load(chunk)
+
+    def compact(self) -> int:
+        """NL: Records zonder pad in de index weggooien; geeft het aantal verwijderde terug."""
+        live = {info["sha256"] for path, info in self.files.items() if os.path.exists(path)}
+        self.files = {p: info for p, info in self.files.items() if info["sha256"] in live}
+        keep = sorted((slot, digest) for digest, slot in self.slots.items() if digest in live)
+        removed = self.count - len(keep)
+        if not removed:
+            return 0
+        data = self.array()
+        tmp = self.data_path + ".tmp"
+        with open(tmp, "wb") as f:
+            for slot, _ in keep:
+                f.write(data[slot].tobytes())
+        self._map = data = None
+        os.replace(tmp, self.data_path)
+        self.slots = {digest: i for i, (_, digest) in enumerate(keep)}
+        self.count = len(keep)
+        self._save_index()
+        return removed
+
+def open_cache(paths: Sequence[str], size: int, dtype: str = "uint8",
+               cache_dir: str = DEFAULT_CACHE_DIR) -> Tuple[ImageCache, Dict[str, int]]:
+    """NL: Cache openen en aanvullen met paths (voor evaluatiescripts)."""
+    cache = ImageCache(cache_dir, size, dtype)
+    return cache, cache.update(paths)
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Decodeer een dataset één keer naar een memory-mapped beeldcache.")
+    ap.add_argument("folders", nargs="*", help="mappen/afbeeldingen (standaard: 2 - Dataset/Testing)")
+    ap.add_argument("--cache", default=DEFAULT_CACHE_DIR, help="map voor de cache")
+    ap.add_argument("--size", type=int, default=224, help="zijde in pixels (imageSize van het model)")
+    ap.add_argument("--dtype", choices=DTYPES, default="uint8", help="opslagtype per pixel")
+    ap.add_argument("--jobs", type=int, default=None, help="parallelle decoders")
+    ap.add_argument("--opruimen", action="store_true", help="records van verdwenen/gewijzigde bestanden verwijderen")
+    ap.add_argument("--bench", action="store_true", help="vergelijk JPEG-decoderen met lezen uit de cache")
+    args = ap.parse_args(argv)
+
+    paths = []
+    for item in args.folders or [DEFAULT_TEST_DIR]:
+        paths.extend(tm_engine.walk_images(item) if os.path.isdir(item) else [item])
+    if not paths:
+        print("❌ Geen afbeeldingen gevonden.")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    try:
+        cache, stats = open_cache(paths, args.size, args.dtype, args.cache)
+    except (OSError, ValueError) as e:
+        print(f"❌ Cache bijwerken mislukt: {e}")
+        sys.exit(1)
+    dt = time.perf_counter() - t0
+    print(f"🗂️ {stats['total']} beelden: {stats['decoded']} gedecodeerd, {stats['reused']} uit de cache "
+          f"({stats['hashed']} opnieuw gehasht) in {dt * 1000:.0f} ms")
+    if args.opruimen:
+        print(f"🧹 {cache.compact()} ongebruikte records verwijderd")
+    mb = cache.count * cache.record_bytes / 1e6
+    print(f"💾 {cache.data_path}: {cache.count} records, {mb:.1f} MB")
+
+    if args.bench:
+        t0 = time.perf_counter()
+        decoded = np.stack([tm_engine.load_image(p, args.size) for p in paths])
+        t_decode = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        cached = ImageCache(args.cache, args.size, args.dtype).load(paths)
+        t_cache = time.perf_counter() - t0
+        same = np.array_equal(decoded, cached)
+        print(f"⏱ Decoderen {t_decode * 1000:.1f} ms · uit de cache {t_cache * 1000:.1f} ms "
+              f"({t_decode / max(t_cache, 1e-9):.0f}×) · {'identiek ✅' if same else 'VERSCHILLEND ⚠️'}")
+
+if __name__ == "__main__":
+    main()
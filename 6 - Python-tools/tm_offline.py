@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline-build voor Slimme Vuilnisbak (vendoren, inhoudshashes, service worker)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Werking:
+1) Vendoren: elke CDN-<script> in index.html moet een vaste versie hebben
+   (bv. @tensorflow/tfjs@4.22.0, nooit @latest). Die bestanden worden één keer
+   gedownload naar 4 - HTML-bestanden/vendor/ en vastgelegd in vendor/lock.json
+   (sha256). Een volgende download die niet overeenkomt, wordt geweigerd.
+2) Bouwen naar 4 - HTML-bestanden/offline/:
+   - scripts, CSS, vendor-bestanden en het model krijgen een inhoudshash in de
+     naam (sketch.3f9a1c2e.js, weights.8b04d1aa.bin, ...) onder offline/assets/;
+   - index.html verwijst naar die namen; sketch.js krijgt de modelpaden via
+     window.SVB_ASSETS;
+   - sw.js (service worker) zet alles bij het eerste bezoek in de cache.
+   Daarna laden app én model van de lokale schijf, ook zonder netwerk.
+
+De bronbestanden blijven ongewijzigd: na een nieuwe export of aanpassing
+gewoon opnieuw bouwen. Enkel standaardbibliotheek.
+
+Gebruik:
+    python tm_offline.py                     # vendoren (indien nodig) + bouwen
+    python tm_offline.py --geen-download     # enkel bouwen met bestaande vendor/
+    # open daarna http://localhost:8000/offline/ (of: launcher met --offline)
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+import urllib.request
+from typing import Dict, List, Optional, Sequence, Tuple
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HTML_DIR = os.path.join(os.path.dirname(TOOLS_DIR), "4 - HTML-bestanden")
+VENDOR_DIR_NAME = "vendor"
+OFFLINE_DIR_NAME = "offline"
+ASSETS_DIR_NAME = "assets"
+LOCK_NAME = "lock.json"
+HASH_LEN = 8
+DOWNLOAD_TIMEOUT_S = 60
+
+# NL: lokale bestanden uit index.html die meegaan in de build
+LOCAL_EXTS = {".js", ".css", ".ico", ".png", ".svg", ".webp", ".woff2"}
+
+CDN_SCRIPT_RE = re.compile(r'<script\s+src="(https://cdn\.jsdelivr\.net/npm/[^"]+)"\s*>\s*</script>')
+ATTR_RE = re.compile(r'\b(src|href)="([^"#?]+)"')
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LEN]
+
+def hashed_name(name: str, data: bytes) -> str:
+    """NL: 'sketch.js' → 'sketch.<hash>.js'."""
+    base, ext = os.path.splitext(os.path.basename(name))
+    return f"{base}.{content_hash(data)}{ext}"
+
+def write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+# ======== NL: vendoren ========
+
+def vendor_name(url: str) -> str:
+    """NL: 'https://cdn.jsdelivr.net/npm/@tensorflow/tfjs@4.22.0/dist/tf.min.js' → 'tfjs@4.22.0-tf.min.js'."""
+    path = url.split("/npm/", 1)[1]
+    package, _, rest = path.partition("/dist/")
+    return f"{package.split('/')[-1]}-{os.path.basename(rest or path)}"
+
+def cdn_scripts(index_html: str) -> List[str]:
+    """NL: Alle CDN-scripts uit index.html; weigert niet-vastgepinde versies."""
+    urls = CDN_SCRIPT_RE.findall(index_html)
+    unpinned = [u for u in urls if not re.search(r"@\d+\.\d+\.\d+/", u)]
+    if unpinned:
+        raise ValueError("Geen vaste versie in index.html (gebruik bv. @4.22.0 i.p.v. @latest): "
+                         + ", ".join(unpinned))
+    return urls
+
+def load_lock(vendor_dir: str) -> Dict[str, dict]:
+    try:
+        with open(os.path.join(vendor_dir, LOCK_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def vendor_scripts(html_dir: str, urls: Sequence[str], download: bool = True) -> Dict[str, str]:
+    """
+    NL: Zorg dat elke CDN-URL lokaal in vendor/ staat en overeenkomt met lock.json.
+    Geeft {url: pad relatief aan html_dir} terug.
+    """
+    vendor_dir = os.path.join(html_dir, VENDOR_DIR_NAME)
+    lock = load_lock(vendor_dir)
+    result = {}
+    for url in urls:
+        name = vendor_name(url)
+        path = os.path.join(vendor_dir, name)
+        pinned = lock.get(url, {}).get("sha256")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+        elif not download:
+            raise ValueError(f"{VENDOR_DIR_NAME}/{name} ontbreekt (start zonder --geen-download).")
+        else:
+            print(f"⬇️ (Vendor) {url}")
+            try:
+                with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT_S) as res:
+                    data = res.read()
+            except OSError as e:
+                raise ValueError(f"Download mislukt ({e}). Zet het bestand desnoods zelf in "
+                                 f"{VENDOR_DIR_NAME}/{name}.")
+        digest = hashlib.sha256(data).hexdigest()
+        if pinned and pinned != digest:
+            raise ValueError(f"{name}: sha256 verschilt van {LOCK_NAME} – bestand geweigerd.")
+        if not os.path.exists(path):
+            write_atomic(path, data)
+        lock[url] = {"file": name, "sha256": digest, "bytes": len(data)}
+        result[url] = f"{VENDOR_DIR_NAME}/{name}"
+    write_atomic(os.path.join(vendor_dir, LOCK_NAME),
+                 (json.dumps(lock, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+    return result
+
+# ======== NL: bouwen ========
+
+def build_model(model_dir: str) -> Tuple[Dict[str, bytes], Dict[str, str]]:
+    """
+    NL: Model met inhoudshashes: weights eerst (model.json verwijst ernaar),
+    dan model.json zelf. Geeft ({assetnaam: bytes}, {'model': naam, 'metadata': naam}).
+    """
+    with open(os.path.join(model_dir, "model.json"), "r", encoding="utf-8") as f:
+        model = json.load(f)
+    files, renamed = {}, {}
+    for group in model.get("weightsManifest", []):
+        for rel in group.get("paths", []):
+            if rel not in renamed:
+                with open(os.path.join(model_dir, rel), "rb") as f:
+                    data = f.read()
+                renamed[rel] = hashed_name(rel, data)
+                files[renamed[rel]] = data
+        group["paths"] = [renamed[rel] for rel in group["paths"]]
+    model_raw = json.dumps(model, separators=(",", ":")).encode("utf-8")
+    names = {"model": hashed_name("model.json", model_raw)}
+    files[names["model"]] = model_raw
+
+    meta_path = os.path.join(model_dir, "metadata.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, "rb") as f:
+            meta_raw = f.read()
+        names["metadata"] = hashed_name("metadata.json", meta_raw)
+        files[names["metadata"]] = meta_raw
+    return files, names
+
+def service_worker(cache_id: str, precache: Sequence[str]) -> bytes:
+    """NL: sw.js: alles vooraf in de cache, assets cache-first, index.html network-first."""
+    urls = json.dumps(list(precache), indent=2)
+    return f"""// NL: Gegenereerd door 6 - Python-tools/tm_offline.py – niet met de hand aanpassen.
+const CACHE = 'svb-{cache_id}';
+const PRECACHE = {urls};
+
+self.addEventListener('install', (event) => {{
+  event.waitUntil(caches.open(CACHE).then((c) => c.addAll(PRECACHE)).then(() => self.skipWaiting()));
+}});
+
+// Oude builds opruimen zodra deze versie actief wordt
+self.addEventListener('activate', (event) => {{
+  event.waitUntil(
+    caches.keys()
+      .then((keys) => Promise.all(keys.filter((k) => k.startsWith('svb-') && k !== CACHE).map((k) => caches.delete(k))))
+      .then(() => self.clients.claim())
+  );
+}});
+
+self.addEventListener('fetch', (event) => {{
+  const req = event.request;
+  if (req.method !== 'GET' || new URL(req.url).origin !== location.origin) return;
+
+  // Pagina zelf: vers als het netwerk er is, anders uit de cache
+  if (req.mode === 'navigate') {{
+    event.respondWith(
+      fetch(req)
+        .then((res) => {{ caches.open(CACHE).then((c) => c.put('./', res.clone())); return res; }})
+        .catch(() => caches.match('./'))
+    );
+    return;
+  }}
+
+  // Assets dragen een inhoudshash in hun naam: wat in de cache zit, is altijd juist
+  event.respondWith(caches.match(req, {{ ignoreSearch: true }}).then((hit) => hit || fetch(req)));
+}});
+""".encode("utf-8")
+
+def rewrite_index(index_html: str, mapping: Dict[str, str], model_names: Dict[str, str]) -> str:
+    """NL: Verwijzingen vervangen, modelpaden + service worker injecteren."""
+    def repl(m):
+        attr, value = m.group(1), m.group(2)
+        key = value[2:] if value.startswith("./") else value
+        return f'{attr}="{mapping[key]}"' if key in mapping else m.group(0)
+
+    html = ATTR_RE.sub(repl, index_html)
+    assets = {k: f"{ASSETS_DIR_NAME}/{v}" for k, v in model_names.items()}
+    assets["bundle"] = None   # NL: offline-build gebruikt de losse bestanden met hash
+    config = (f"<script>window.SVB_ASSETS = {json.dumps(assets)};</script>\n"
+              "  <script>if ('serviceWorker' in navigator) navigator.serviceWorker.register('sw.js');</script>\n  ")
+    first_script = html.find("<script")
+    if first_script < 0:
+        raise ValueError("index.html bevat geen <script>-tags.")
+    return html[:first_script] + config + html[first_script:]
+
+def build_offline(html_dir: str, out_dir: str, vendored: Dict[str, str]) -> Tuple[List[str], int]:
+    """NL: Bouw de offline-map; geeft (precache-lijst, totaal aantal bytes)."""
+    with open(os.path.join(html_dir, "index.html"), "r", encoding="utf-8", newline="") as f:
+        index_html = f.read()
+
+    files: Dict[str, bytes] = {}
+    mapping: Dict[str, str] = {}
+    for url, rel in vendored.items():
+        with open(os.path.join(html_dir, rel), "rb") as f:
+            data = f.read()
+        name = hashed_name(rel, data)
+        files[name] = data
+        mapping[url] = f"{ASSETS_DIR_NAME}/{name}"
+
+    for _, value in ATTR_RE.findall(index_html):
+        rel = value[2:] if value.startswith("./") else value
+        path = os.path.join(html_dir, rel)
+        if "://" in rel or rel in mapping or os.path.splitext(rel)[1].lower() not in LOCAL_EXTS:
+            continue
+        if not os.path.isfile(path):
+            print(f"⚠️ (Build) {rel} staat in index.html maar bestaat niet – overgeslagen.")
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        name = hashed_name(rel, data)
+        files[name] = data
+        mapping[rel] = f"{ASSETS_DIR_NAME}/{name}"
+
+    model_files, model_names = build_model(os.path.join(html_dir, "image_model"))
+    files.update(model_files)
+
+    html = rewrite_index(index_html, mapping, model_names)
+    assets_dir = os.path.join(out_dir, ASSETS_DIR_NAME)
+    for name, data in files.items():
+        target = os.path.join(assets_dir, name)
+        if not os.path.exists(target):   # NL: zelfde naam = zelfde inhoud
+            write_atomic(target, data)
+    for name in os.listdir(assets_dir):
+        if name not in files:
+            os.remove(os.path.join(assets_dir, name))   # NL: assets van oudere builds
+
+    precache = ["./"] + [f"{ASSETS_DIR_NAME}/{n}" for n in sorted(files)]
+    cache_id = content_hash("\n".join(precache).encode("utf-8") + html.encode("utf-8"))
+    write_atomic(os.path.join(out_dir, "sw.js"), service_worker(cache_id, precache))
+    write_atomic(os.path.join(out_dir, "index.html"), html.encode("utf-8"))
+    return precache, sum(len(d) for d in files.values())
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Bouw een offline versie van de webapp (vendoren, inhoudshashes, service worker).")
+    ap.add_argument("--html", default=DEFAULT_HTML_DIR, help="map met index.html (bron)")
+    ap.add_argument("--out", help=f"doelmap (standaard: <html>/{OFFLINE_DIR_NAME})")
+    ap.add_argument("--geen-download", action="store_true", help="niets downloaden; vendor/ moet al compleet zijn")
+    args = ap.parse_args(argv)
+    out_dir = args.out or os.path.join(args.html, OFFLINE_DIR_NAME)
+    if os.path.abspath(out_dir) == os.path.abspath(args.html):
+        print("❌ Kies een andere --out dan de bronmap (de bronbestanden blijven ongewijzigd).")
+        sys.exit(1)
+
+    try:
+        with open(os.path.join(args.html, "index.html"), "r", encoding="utf-8") as f:
+            urls = cdn_scripts(f.read())
+        vendored = vendor_scripts(args.html, urls, download=not args.geen_download)
+        precache, total = build_offline(args.html, out_dir, vendored)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Offline-build mislukt: {e}")
+        sys.exit(1)
+
+    print(f"✅ Offline-build klaar: {out_dir}")
+    print(f"   {len(precache) - 1} assets ({total / 1024:.0f} KB) met inhoudshash, service worker: sw.js")
+    print("💡 Open via de launcher (--offline) of http://localhost:8000/offline/ – na het eerste bezoek werkt alles zonder netwerk.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline graaf-optimalisatie voor Teachable Machine-exports (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Werking (op model.json + weights.bin, zonder TensorFlow):
+- BatchNormalization na Conv2D/DepthwiseConv2D wordt in de kernel + bias gevouwen
+  (kernel · γ/√(var+ε), bias · γ/√(var+ε) + β − mean · γ/√(var+ε)).
+- Een ReLU(6) direct na zo'n conv wordt de activatie van de conv zelf ('relu6'/'relu').
+- Een expliciete ZeroPadding2D vóór een 'valid'-conv verdwijnt als 'same'-padding
+  voor die invoergrootte exact dezelfde rand geeft.
+- De numerieke gelijkwaardigheid wordt gecontroleerd op 2 - Dataset/Testing;
+  bij een afwijking boven --tolerance wordt er niets geschreven.
+
+Let op: de padding-stap geldt voor de vaste invoergrootte uit metadata.json (imageSize).
+Gekwantiseerde weights worden als float32 weggeschreven; kwantiseer daarna opnieuw.
+
+Gebruik:
+    python tm_optimize.py --out "../4 - HTML-bestanden/image_model-opt"
+"""
+
+import os
+import sys
+import copy
+import time
+import argparse
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import tm_engine
+from tm_engine import DEFAULT_MODEL_DIR, DEFAULT_TEST_DIR
+
+CONV_TYPES = ("Conv2D", "DepthwiseConv2D")
+DEFAULT_TOLERANCE = 1e-4
+
+# ======== NL: hulpfuncties op de topologie ========
+
+def functional_models(layer: dict) -> Iterator[dict]:
+    """NL: Alle functionele (Model/Functional) configs in een geneste topologie."""
+    cls = layer.get("class_name")
+    cfg = layer.get("config", {})
+    if cls in ("Model", "Functional"):
+        yield cfg
+    if isinstance(cfg, dict):
+        for sub in cfg.get("layers", []):
+            yield from functional_models(sub)
+
+def layer_inputs(layer: dict) -> List[str]:
+    nodes = layer.get("inbound_nodes", [])
+    return [ref[0] for ref in nodes[0]] if nodes else []
+
+def rename_refs(cfg: dict, old: str, new: str):
+    """NL: Alle verwijzingen naar laag 'old' laten wijzen naar 'new'."""
+    for layer in cfg["layers"]:
+        for inbound in layer.get("inbound_nodes", []):
+            for ref in inbound:
+                if ref[0] == old:
+                    ref[0] = new
+    for ref in cfg.get("output_layers", []):
+        if ref[0] == old:
+            ref[0] = new
+
+def consumer_map(cfg: dict) -> Dict[str, List[str]]:
+    users: Dict[str, List[str]] = {}
+    for layer in cfg["layers"]:
+        for src in layer_inputs(layer):
+            users.setdefault(src, []).append(layer["name"])
+    for ref in cfg.get("output_layers", []):
+        users.setdefault(ref[0], []).append("<output>")
+    return users
+
+def infer_shapes(nodes: List[tm_engine.Node], image_size: int) -> Dict[str, Tuple[int, ...]]:
+    """NL: Statische vorm (zonder batch) per laag, vertrekkend van image_size×image_size×3."""
+    shapes: Dict[str, Tuple[int, ...]] = {}
+    for node in nodes:
+        cfg = node.config
+        if node.class_name == "InputLayer":
+            shapes[node.name] = (image_size, image_size, 3)
+            continue
+        h, w, c = (shapes[node.inputs[0]] + (None, None))[:3] if node.inputs else (None, None, None)
+        if node.class_name in CONV_TYPES:
+            kh, kw = cfg["kernel_size"]
+            sh, sw = cfg.get("strides", [1, 1])
+            dh, dw = cfg.get("dilation_rate", [1, 1])
+            if cfg.get("padding") == "same":
+                h, w = -(-h // sh), -(-w // sw)
+            else:
+                h = (h - (kh - 1) * dh - 1) // sh + 1
+                w = (w - (kw - 1) * dw - 1) // sw + 1
+            c = cfg["filters"] if node.class_name == "Conv2D" else c * cfg.get("depth_multiplier", 1)
+            shapes[node.name] = (h, w, c)
+        elif node.class_name == "ZeroPadding2D":
+            (pt, pb), (pl, pr) = cfg["padding"]
+            shapes[node.name] = (h + pt + pb, w + pl + pr, c)
+        elif node.class_name == "GlobalAveragePooling2D":
+            shapes[node.name] = (c,)
+        elif node.class_name == "Dense":
+            shapes[node.name] = (cfg["units"],)
+        else:
+            shapes[node.name] = shapes[node.inputs[0]]
+    return shapes
+
+# ======== NL: de drie vouwstappen ========
+
+def fold_batchnorm(cfg: dict, weights: Dict[str, np.ndarray]) -> int:
+    by_name = {layer["name"]: layer for layer in cfg["layers"]}
+    users = consumer_map(cfg)
+    folded = 0
+    for bn in list(cfg["layers"]):
+        if bn["class_name"] != "BatchNormalization":
+            continue
+        srcs = layer_inputs(bn)
+        conv = by_name.get(srcs[0]) if len(srcs) == 1 else None
+        if conv is None or conv["class_name"] not in CONV_TYPES or users.get(conv["name"]) != [bn["name"]]:
+            continue
+        if conv["config"].get("activation", "linear") not in ("linear", None):
+            continue
+
+        name, c = conv["name"], conv["config"]
+        kname = f"{name}/kernel" if conv["class_name"] == "Conv2D" else f"{name}/depthwise_kernel"
+        b = bn["name"]
+        var = weights.pop(f"{b}/moving_variance")
+        mean = weights.pop(f"{b}/moving_mean")
+        gamma = weights.pop(f"{b}/gamma", None)
+        beta = weights.pop(f"{b}/beta", None)
+        scale = 1.0 / np.sqrt(var.astype(np.float64) + bn["config"].get("epsilon", 1e-3))
+        if gamma is not None:
+            scale = scale * gamma
+        shift = -mean * scale + (beta if beta is not None else 0.0)
+
+        kernel = weights[kname].astype(np.float64)
+        if conv["class_name"] == "Conv2D":
+            kernel = kernel * scale
+        else:
+            kh, kw, cin, mult = kernel.shape
+            kernel = kernel * scale.reshape(cin, mult)
+        bias = weights.get(f"{name}/bias")
+        bias = shift if bias is None else bias * scale + shift
+        weights[kname] = kernel.astype(np.float32)
+        weights[f"{name}/bias"] = np.asarray(bias, dtype=np.float32)
+        c["use_bias"] = True
+        c.setdefault("bias_initializer", {"class_name": "Zeros", "config": {}})
+
+        cfg["layers"].remove(bn)
+        rename_refs(cfg, b, name)
+        users[name] = users.pop(b, [])
+        folded += 1
+    return folded
+
+def fold_relu(cfg: dict) -> int:
+    by_name = {layer["name"]: layer for layer in cfg["layers"]}
+    users = consumer_map(cfg)
+    folded = 0
+    for relu in list(cfg["layers"]):
+        if relu["class_name"] != "ReLU":
+            continue
+        rc = relu["config"]
+        if rc.get("negative_slope") or rc.get("threshold"):
+            continue
+        max_value = rc.get("max_value")
+        if max_value not in (None, 6, 6.0):
+            continue
+        srcs = layer_inputs(relu)
+        conv = by_name.get(srcs[0]) if len(srcs) == 1 else None
+        if conv is None or conv["class_name"] not in CONV_TYPES or users.get(conv["name"]) != [relu["name"]]:
+            continue
+        if conv["config"].get("activation", "linear") not in ("linear", None):
+            continue
+        conv["config"]["activation"] = "relu" if max_value is None else "relu6"
+        cfg["layers"].remove(relu)
+        rename_refs(cfg, relu["name"], conv["name"])
+        users[conv["name"]] = users.pop(relu["name"], [])
+        folded += 1
+    return folded
+
+def fold_padding(cfg: dict, shapes: Dict[str, Tuple[int, ...]]) -> int:
+    by_name = {layer["name"]: layer for layer in cfg["layers"]}
+    users = consumer_map(cfg)
+    folded = 0
+    for pad in list(cfg["layers"]):
+        if pad["class_name"] != "ZeroPadding2D":
+            continue
+        targets = users.get(pad["name"], [])
+        conv = by_name.get(targets[0]) if len(targets) == 1 else None
+        srcs = layer_inputs(pad)
+        if conv is None or conv["class_name"] not in CONV_TYPES or len(srcs) != 1:
+            continue
+        c = conv["config"]
+        if c.get("padding") != "valid" or srcs[0] not in shapes:
+            continue
+        h, w = shapes[srcs[0]][:2]
+        kh, kw = c["kernel_size"]
+        sh, sw = c.get("strides", [1, 1])
+        dh, dw = c.get("dilation_rate", [1, 1])
+        want = [list(tm_engine.same_padding(h, kh, sh, dh)), list(tm_engine.same_padding(w, kw, sw, dw))]
+        have = pad["config"]["padding"]
+        if isinstance(have, int):
+            have = [[have, have], [have, have]]
+        if [list(p) for p in have] != want:
+            continue
+        c["padding"] = "same"
+        cfg["layers"].remove(pad)
+        rename_refs(cfg, pad["name"], srcs[0])
+        folded += 1
+    return folded
+
+# ======== NL: volledige optimalisatie ========
+
+def optimize_export(data: dict, buffer: bytes, image_size: int) -> Tuple[dict, bytes, dict]:
+    """NL: Geoptimaliseerde (model.json-data, weights-buffer, statistiek)."""
+    manifest = data["weightsManifest"]
+    weights = tm_engine.decode_weights(manifest, buffer)
+    order = [spec["name"] for group in manifest for spec in group["weights"]]
+
+    new_data = copy.deepcopy(data)
+    topology = new_data["modelTopology"]
+    if "model_config" in topology:
+        topology = topology["model_config"]
+    nodes: List[tm_engine.Node] = []
+    tm_engine.flatten_topology(topology, [], nodes)
+    shapes = infer_shapes(nodes, image_size)
+
+    stats = {"layers_before": len(nodes), "batchnorm": 0, "relu": 0, "padding": 0}
+    for cfg in functional_models(topology):
+        stats["batchnorm"] += fold_batchnorm(cfg, weights)
+        stats["relu"] += fold_relu(cfg)
+        stats["padding"] += fold_padding(cfg, shapes)
+    nodes = []
+    tm_engine.flatten_topology(topology, [], nodes)
+    stats["layers_after"] = len(nodes)
+
+    # NL: manifest in de oorspronkelijke volgorde; nieuwe bias direct na zijn kernel
+    specs, parts, seen = [], [], set()
+    for name in order:
+        if name not in weights or name in seen:
+            continue
+        names = [name]
+        layer = name.rsplit("/", 1)[0]
+        if name.endswith("kernel") and f"{layer}/bias" in weights and f"{layer}/bias" not in order:
+            names.append(f"{layer}/bias")
+        for n in names:
+            arr = np.ascontiguousarray(weights[n], dtype=np.float32)
+            specs.append({"name": n, "shape": list(arr.shape), "dtype": "float32"})
+            parts.append(arr.tobytes())
+            seen.add(n)
+    new_data["weightsManifest"] = [{"paths": ["weights.bin"], "weights": specs}]
+    return new_data, b"".join(parts), stats
+
+def median_latency_ms(model: tm_engine.TMModel, images: np.ndarray, repeats: int = 3) -> float:
+    samples = []
+    model.predict(images[:1])
+    for _ in range(repeats):
+        for i in range(len(images)):
+            t0 = time.perf_counter()
+            model.predict(images[i:i + 1])
+            samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1000
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Vouw BatchNorm/ReLU/padding in de convoluties van een Teachable Machine-export.")
+    ap.add_argument("--model", default=DEFAULT_MODEL_DIR, help="bron: image_model/-map")
+    ap.add_argument("--out", required=True, help="doelmap voor het geoptimaliseerde model")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                    help="max. absoluut verschil in waarschijnlijkheid t.o.v. het origineel")
+    ap.add_argument("folders", nargs="*", help="extra testmappen (naast 2 - Dataset/Testing)")
+    args = ap.parse_args(argv)
+
+    if os.path.abspath(args.out) == os.path.abspath(args.model):
+        print("❌ Kies een andere --out dan de bronmap (het origineel blijft de referentie).")
+        sys.exit(1)
+
+    data, buffer, meta = tm_engine.read_export(args.model)
+    image_size = int(meta.get("imageSize", 224))
+    new_data, new_buffer, stats = optimize_export(data, buffer, image_size)
+    print(f"🧩 (Optimaliseren) {stats['batchnorm']}× BatchNorm, {stats['relu']}× ReLU, "
+          f"{stats['padding']}× padding gevouwen · lagen {stats['layers_before']} → {stats['layers_after']}")
+
+    reference = tm_engine.model_from_export(data, buffer, meta)
+    candidate = tm_engine.model_from_export(new_data, new_buffer, meta)
+    paths = []
+    for folder in [DEFAULT_TEST_DIR] + list(args.folders):
+        paths.extend(tm_engine.walk_images(folder) if os.path.isdir(folder) else [folder])
+    images = np.stack([tm_engine.load_image(p, image_size) for p in paths])
+    ref, cand = reference.predict(images), candidate.predict(images)
+    max_diff = float(np.abs(ref - cand).max())
+    same_top1 = bool(np.all(np.argmax(ref, axis=1) == np.argmax(cand, axis=1)))
+    print(f"🎯 Gelijkwaardigheid op {len(images)} beelden: max. verschil {max_diff:.2e}, "
+          f"top-1 {'identiek' if same_top1 else 'VERSCHILLEND'}")
+
+    print(f"📦 weights: {len(buffer) / 1024:.0f} KB → {len(new_buffer) / 1024:.0f} KB")
+    print(f"⏱ NumPy-latentie/beeld: {median_latency_ms(reference, images):.1f} ms → "
+          f"{median_latency_ms(candidate, images):.1f} ms")
+
+    if max_diff > args.tolerance or not same_top1:
+        print("❌ Geweigerd: het geoptimaliseerde model wijkt af. Er is niets geschreven.")
+        sys.exit(2)
+
+    tm_engine.write_export(args.out, new_data, new_buffer, meta or None)
+    print(f"✅ Geoptimaliseerd model geschreven naar: {args.out}")
+
+if __name__ == "__main__":
+    main()
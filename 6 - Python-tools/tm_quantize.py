@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Weights kwantiseren voor Teachable Machine-exports (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Werking:
+- Leest een image_model/-map (float32 weights).
+- Herschrijft weightsManifest + weights.bin naar float16 of uint8 (affine: q * scale + min),
+  in het 'quantization'-formaat dat TF.js zelf begrijpt (geen extra code in de browser).
+- Vergelijkt top-1 van het origineel en de gekwantiseerde versie op 2 - Dataset/Testing
+  en weigert te schrijven als de overeenkomst onder --min-agreement zakt.
+- Meldt de bespaarde bytes (ruw en gzip) en de winst in laadtijd.
+
+Gebruik:
+    python tm_quantize.py --mode uint8 --out "../4 - HTML-bestanden/image_model-uint8"
+    python tm_quantize.py --mode float16 --min-agreement 1.0 --out /tmp/model-f16
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import argparse
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import tm_engine
+from tm_engine import DEFAULT_MODEL_DIR, DEFAULT_TEST_DIR
+
+MODES = ("float16", "uint8")
+MIN_ELEMENTS = 1024   # NL: kleine tensors (BN, bias) blijven float32: weinig winst, veel risico
+FLOAT16_MAX = 65504.0
+CLASSROOM_MBIT = 20.0   # NL: typische bandbreedte per toestel op klas-wifi
+
+def quantize_tensor(arr: np.ndarray, mode: str) -> Tuple[bytes, Optional[dict]]:
+    """NL: Kwantiseer één tensor; geeft (bytes, quantization-entry) of (float32-bytes, None)."""
+    arr = np.ascontiguousarray(arr, dtype=np.float32)
+    if mode == "float16":
+        if np.abs(arr).max(initial=0.0) > FLOAT16_MAX:
+            return arr.tobytes(), None
+        return arr.astype(np.float16).tobytes(), {"dtype": "float16"}
+
+    lo, hi = float(arr.min(initial=0.0)), float(arr.max(initial=0.0))
+    scale = (hi - lo) / 255.0 if hi > lo else 1.0
+    q = np.clip(np.round((arr - lo) / scale), 0, 255).astype(np.uint8)
+    return q.tobytes(), {"dtype": "uint8", "scale": scale, "min": lo}
+
+def quantize_export(data: dict, buffer: bytes, mode: str,
+                    min_elements: int = MIN_ELEMENTS) -> Tuple[dict, bytes, int]:
+    """NL: Nieuwe model.json-data + buffer met gekwantiseerde weights (+ aantal gekwantiseerde tensors)."""
+    manifest = data["weightsManifest"]
+    weights = tm_engine.decode_weights(manifest, buffer)
+    specs, parts, n_quant = [], [], 0
+    for group in manifest:
+        for spec in group["weights"]:
+            arr = weights[spec["name"]]
+            new_spec = {k: v for k, v in spec.items() if k != "quantization"}
+            if spec["dtype"] == "float32" and arr.size >= min_elements:
+                raw, quant = quantize_tensor(arr, mode)
+            else:
+                raw, quant = np.ascontiguousarray(arr, dtype=tm_engine.DTYPES[spec["dtype"]]).tobytes(), None
+            if quant:
+                new_spec["quantization"] = quant
+                n_quant += 1
+            specs.append(new_spec)
+            parts.append(raw)
+    out = dict(data)
+    out["weightsManifest"] = [{"paths": ["weights.bin"], "weights": specs}]
+    return out, b"".join(parts), n_quant
+
+def load_time_ms(data: dict, buffer: bytes, repeats: int = 5) -> float:
+    """NL: Mediane tijd om model.json te parsen en de weights te decoderen."""
+    text = json.dumps(data)
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        parsed = json.loads(text)
+        tm_engine.decode_weights(parsed["weightsManifest"], buffer)
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1000
+
+def top1_agreement(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """NL: Aandeel beelden waarop beide modellen hetzelfde top-1-label kiezen."""
+    return float(np.mean(np.argmax(reference, axis=1) == np.argmax(candidate, axis=1)))
+
+def load_eval_images(folders: List[str], size: int) -> np.ndarray:
+    paths = []
+    for folder in folders:
+        paths.extend(tm_engine.walk_images(folder) if os.path.isdir(folder) else [folder])
+    if not paths:
+        raise ValueError("Geen testbeelden gevonden voor de nauwkeurigheidscontrole.")
+    return np.stack([tm_engine.load_image(p, size) for p in paths])
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Kwantiseer een Teachable Machine-export (float16/uint8) met nauwkeurigheidscontrole.")
+    ap.add_argument("--model", default=DEFAULT_MODEL_DIR, help="bron: image_model/-map (float32)")
+    ap.add_argument("--out", required=True, help="doelmap voor model.json + weights.bin + metadata.json")
+    ap.add_argument("--mode", choices=MODES, default="uint8", help="opslagtype voor de weights")
+    ap.add_argument("--min-agreement", type=float, default=0.9,
+                    help="minimale top-1-overeenkomst met het float-model (0..1)")
+    ap.add_argument("--min-elements", type=int, default=MIN_ELEMENTS,
+                    help="enkel tensors met minstens zoveel elementen kwantiseren")
+    ap.add_argument("--mbit", type=float, default=CLASSROOM_MBIT,
+                    help="bandbreedte (Mbit/s) om de downloadtijd in te schatten")
+    ap.add_argument("folders", nargs="*", help="extra testmappen (naast 2 - Dataset/Testing)")
+    args = ap.parse_args(argv)
+
+    if os.path.abspath(args.out) == os.path.abspath(args.model):
+        print("❌ Kies een andere --out dan de bronmap (het origineel blijft de referentie).")
+        sys.exit(1)
+
+    data, buffer, meta = tm_engine.read_export(args.model)
+    qdata, qbuffer, n_quant = quantize_export(data, buffer, args.mode, args.min_elements)
+    print(f"🧮 (Kwantiseren) {n_quant} tensors → {args.mode}")
+
+    reference = tm_engine.model_from_export(data, buffer, meta)
+    candidate = tm_engine.model_from_export(qdata, qbuffer, meta)
+    images = load_eval_images([DEFAULT_TEST_DIR] + list(args.folders), reference.image_size)
+    agreement = top1_agreement(reference.predict(images), candidate.predict(images))
+    print(f"🎯 Top-1-overeenkomst met float32: {agreement * 100:.1f}% over {len(images)} beelden "
+          f"(drempel {args.min_agreement * 100:.1f}%)")
+
+    size_old, size_new = len(buffer), len(qbuffer)
+    gz_old, gz_new = len(gzip.compress(buffer, 6)), len(gzip.compress(qbuffer, 6))
+    load_old, load_new = load_time_ms(data, buffer), load_time_ms(qdata, qbuffer)
+    print(f"📦 weights: {size_old / 1024:.0f} KB → {size_new / 1024:.0f} KB "
+          f"({(1 - size_new / size_old) * 100:.0f}% kleiner; gzip {gz_old / 1024:.0f} → {gz_new / 1024:.0f} KB)")
+    print(f"⏱ Laden (parse + decode): {load_old:.1f} ms → {load_new:.1f} ms")
+    per_ms = args.mbit * 1e6 / 8 / 1000
+    print(f"⏱ Download @ {args.mbit:g} Mbit/s (gzip): {gz_old / per_ms:.0f} ms → {gz_new / per_ms:.0f} ms per toestel")
+
+    if agreement < args.min_agreement:
+        print("❌ Geweigerd: nauwkeurigheid zakt onder de drempel. Er is niets geschreven.")
+        sys.exit(2)
+
+    tm_engine.write_export(args.out, qdata, qbuffer, meta or None)
+    print(f"✅ Gekwantiseerd model geschreven naar: {args.out}")
+
+if __name__ == "__main__":
+    main()
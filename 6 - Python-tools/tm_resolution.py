@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Modelvarianten op lagere resolutie (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Teachable Machine exporteert altijd voor 224×224. MobileNet is volledig
+convolutioneel (met GlobalAveragePooling op het einde), dus dezelfde weights
+werken ook op 192, 160 of 128 px – met ongeveer (N/224)² van het rekenwerk.
+Deze tool:
+- maakt per resolutie een variant naast het origineel: image_model/160px/
+  (of image_model/Web-Model-160px/), met dezelfde weights.bin, de invoervorm in
+  model.json aangepast en imageSize in metadata.json;
+- meet per variant de latentie per beeld en de top-1 op 2 - Dataset/Testing
+  (overeenkomst met 224 px, en nauwkeurigheid als de map per klasse is ingedeeld);
+- toont een tabel en bewaart alles in image_model/varianten.json, samen met
+  een korte tijdsmeting (probe) van deze machine.
+De launcher doet bij het starten dezelfde probe en kiest de grootste variant
+die op die machine binnen het tijdsbudget per beeld blijft (--resolutie).
+
+Enkel standaardbibliotheek voor de launcher; meten vereist numpy en Pillow.
+
+Gebruik:
+    python tm_resolution.py                                  # 192/160/128 van image_model/
+    python tm_resolution.py --sizes 192,160 --budget 80
+    python tm_resolution.py --model "../4 - HTML-bestanden/image_model/Web-Model"
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import shutil
+import argparse
+from typing import List, Optional, Sequence, Tuple
+
+DEFAULT_SIZES = (192, 160, 128)
+REPORT_NAME = "varianten.json"
+REPORT_VERSION = 1
+FRAME_BUDGET_MS = 100.0     # NL: ±10 beelden/s: de stabilisator (5 beelden) reageert binnen een halve seconde
+MIN_AGREEMENT = 0.9         # NL: varianten die vaker van 224 px afwijken, kiest de launcher nooit
+PROBE_LOOPS = 200_000
+
+# ======== NL: varianten afleiden (standaardbibliotheek) ========
+
+def variant_name(base: str, size: int) -> str:
+    """NL: '' + 160 → '160px'; 'Web-Model' + 160 → 'Web-Model-160px' (submap van image_model/)."""
+    return f"{base}-{size}px" if base else f"{size}px"
+
+def resize_inputs(node, size: int) -> int:
+    """NL: Zet elke beeldinvoer (batch_input_shape [None, H, W, C]) op size×size; geeft het aantal terug."""
+    found = 0
+    if isinstance(node, dict):
+        shape = node.get("batch_input_shape")
+        if isinstance(shape, list) and len(shape) == 4:
+            node["batch_input_shape"] = [shape[0], size, size, shape[3]]
+            found += 1
+        for value in node.values():
+            found += resize_inputs(value, size)
+    elif isinstance(node, list):
+        for value in node:
+            found += resize_inputs(value, size)
+    return found
+
+def _write_atomic(path: str, payload: bytes):
+    tmp = os.path.join(os.path.dirname(path), "." + os.path.basename(path) + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+def derive_variant(model_dir: str, out_dir: str, size: int) -> dict:
+    """
+    NL: Schrijf een variant van model_dir voor size×size naar out_dir.
+    De weights worden byte voor byte gekopieerd; model.json komt als laatste,
+    zodat het modelregister van de launcher nooit een halve variant ziet.
+    """
+    with open(os.path.join(model_dir, "model.json"), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    meta = {}
+    meta_path = os.path.join(model_dir, "metadata.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    original = int(meta.get("imageSize", 224))
+    if size % 32 or not 32 <= size < original:
+        raise ValueError(f"resolutie {size} moet een veelvoud van 32 zijn, kleiner dan {original}")
+
+    data = copy.deepcopy(data)
+    if not resize_inputs(data["modelTopology"], size):
+        raise ValueError("geen beeldinvoer (batch_input_shape) gevonden in model.json")
+    meta = dict(meta, imageSize=size)
+    meta["modelName"] = f"{meta.get('modelName', 'tm-my-image-model')}-{size}px"
+
+    os.makedirs(out_dir, exist_ok=True)
+    for group in data.get("weightsManifest", []):
+        for rel in group.get("paths", []):
+            tmp = os.path.join(out_dir, "." + os.path.basename(rel) + ".tmp")
+            shutil.copyfile(os.path.join(model_dir, rel), tmp)
+            os.replace(tmp, os.path.join(out_dir, rel))
+    _write_atomic(os.path.join(out_dir, "metadata.json"),
+                  json.dumps(meta, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+    _write_atomic(os.path.join(out_dir, "model.json"), json.dumps(data, separators=(",", ":")).encode("utf-8"))
+    return meta
+
+# ======== NL: probe en keuze (ook gebruikt door de launcher) ========
+
+def timing_probe_ms(repeats: int = 5) -> float:
+    """NL: Snelste van een paar runs van een vaste rekenlus (±20 ms): hoe snel is deze machine?"""
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        acc = 0.0
+        for i in range(PROBE_LOOPS):
+            acc += (i & 7) * 0.5
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+def load_report(root: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(root, REPORT_NAME), "r", encoding="utf-8") as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return report if isinstance(report, dict) and report.get("version") == REPORT_VERSION else None
+
+def save_report(root: str, base: str, rows: List[dict], probe_ms: float, budget_ms: float):
+    """NL: Resultaten voor één basismodel toevoegen aan varianten.json (andere basismodellen blijven)."""
+    report = load_report(root) or {"version": REPORT_VERSION, "models": {}}
+    report["models"][base] = {"probe_ms": round(probe_ms, 2), "budget_ms": budget_ms,
+                              "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "variants": rows}
+    _write_atomic(os.path.join(root, REPORT_NAME),
+                  json.dumps(report, indent=1, ensure_ascii=False).encode("utf-8"))
+
+def choose_variant(entry: dict, probe_ms: float, min_agreement: float = MIN_AGREEMENT) -> Tuple[str, float]:
+    """
+    NL: (naam, geschatte ms per beeld) van de grootste variant binnen het budget.
+    De gemeten latenties worden geschaald met probe hier / probe bij het meten.
+    Past niets, dan de snelste variant die nog genoeg overeenkomt met 224 px.
+    """
+    scale = probe_ms / entry["probe_ms"] if entry.get("probe_ms") else 1.0
+    rows = [r for i, r in enumerate(entry["variants"]) if i == 0 or r["agreement"] >= min_agreement]
+    rows.sort(key=lambda r: -r["size"])
+    for row in rows:
+        if row["latency_ms"] * scale <= entry["budget_ms"]:
+            return row["name"], row["latency_ms"] * scale
+    fastest = min(rows, key=lambda r: r["latency_ms"])
+    return fastest["name"], fastest["latency_ms"] * scale
+
+# ======== NL: meten (numpy + Pillow) ========
+
+def measure(models: List[Tuple[str, str]], paths: List[str], repeats: int = 3) -> List[dict]:
+    """NL: Per (naam, map): latentie per beeld (mediaan, batch 1) en top-1 t.o.v. het eerste model."""
+    import numpy as np
+    import tm_engine
+    from tm_benchmark import true_label
+
+    rows, reference = [], None
+    for name, model_dir in models:
+        model = tm_engine.load_model(model_dir)
+        images = np.stack([tm_engine.load_image(p, model.image_size) for p in paths])
+        model.predict(images[:1])   # NL: opwarmen
+        samples = []
+        for _ in range(repeats):
+            for img in images:
+                t0 = time.perf_counter()
+                model.predict(img[None])
+                samples.append(time.perf_counter() - t0)
+        top = model.predict(images).argmax(axis=1)
+        reference = top if reference is None else reference
+        truth = [true_label(p, model.labels) for p in paths]
+        known = [(t, model.labels[k]) for t, k in zip(truth, top) if t is not None]
+        rows.append({"name": name, "size": model.image_size,
+                     "latency_ms": round(float(np.median(samples)) * 1000, 2),
+                     "agreement": round(float(np.mean(top == reference)), 4),
+                     "accuracy": round(sum(t == p for t, p in known) / len(known), 4) if known else None})
+    return rows
+
+def print_table(rows: List[dict], budget_ms: float):
+    base = rows[0]["latency_ms"]
+    print(f"{'variant':<22} {'px':>4} {'ms/beeld':>9} {'sneller':>8} {'top-1 = 224':>12} {'nauwkeurig':>11}")
+    for r in rows:
+        acc = f"{r['accuracy'] * 100:.1f}%" if r["accuracy"] is not None else "—"
+        mark = " ✅" if r["latency_ms"] <= budget_ms else ""
+        print(f"{r['name'] or 'image_model':<22} {r['size']:>4} {r['latency_ms']:>9.1f} {base / r['latency_ms']:>7.2f}× "
+              f"{r['agreement'] * 100:>11.1f}% {acc:>11}{mark}")
+
+def main(argv: Optional[Sequence[str]] = None):
+    from tm_engine import DEFAULT_MODEL_DIR, DEFAULT_TEST_DIR, walk_images
+
+    ap = argparse.ArgumentParser(description="Maak modelvarianten op lagere resolutie en vergelijk latentie en top-1.")
+    ap.add_argument("--model", default=DEFAULT_MODEL_DIR, help="bron: image_model/ of een submap ervan")
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="resoluties (veelvouden van 32)")
+    ap.add_argument("--budget", type=float, default=FRAME_BUDGET_MS, help="ms per beeld waarbinnen de launcher moet blijven")
+    ap.add_argument("--repeats", type=int, default=3, help="metingen per beeld")
+    ap.add_argument("folders", nargs="*", help="testmappen (standaard: 2 - Dataset/Testing)")
+    args = ap.parse_args(argv)
+
+    model_dir = os.path.normpath(args.model)
+    if os.path.basename(model_dir) == "image_model":
+        root, base = model_dir, ""
+    else:
+        root, base = os.path.dirname(model_dir), os.path.basename(model_dir)
+    paths = []
+    for folder in args.folders or [DEFAULT_TEST_DIR]:
+        paths.extend(walk_images(folder) if os.path.isdir(folder) else [folder])
+    if not paths:
+        print("❌ Geen testbeelden gevonden.")
+        sys.exit(1)
+
+    models = [(base, model_dir)]
+    try:
+        for size in sorted({int(s) for s in args.sizes.split(",") if s.strip()}, reverse=True):
+            name = variant_name(base, size)
+            derive_variant(model_dir, os.path.join(root, name), size)
+            models.append((name, os.path.join(root, name)))
+            print(f"🧩 {name}: {size}×{size}")
+        rows = measure(models, paths, max(1, args.repeats))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Varianten maken mislukt: {e}")
+        sys.exit(1)
+
+    probe = timing_probe_ms()
+    print(f"\n📊 {len(paths)} testbeelden · budget {args.budget:.0f} ms per beeld (✅ = past op deze machine)")
+    print_table(rows, args.budget)
+    save_report(root, base, rows, probe, args.budget)
+    name, est = choose_variant(load_report(root)["models"][base], probe)
+    print(f"\n💾 {os.path.join(root, REPORT_NAME)} · probe {probe:.1f} ms")
+    print(f"🚀 De launcher zou hier '{name or 'image_model'}' kiezen (±{est:.0f} ms per beeld).")
+
+if __name__ == "__main__":
+    main()
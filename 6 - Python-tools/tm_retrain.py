@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Eigen klassen hertrainen zonder Teachable Machine online (Slimme Vuilnisbak)
+© 2025 Robbe Wulgaert · AI in de Klas — Hergebruik toegestaan met bronvermelding
+
+Een Teachable Machine-model bestaat uit twee delen:
+- een bevroren MobileNet (sequential_1) die elk beeld omzet naar een embedding
+  van 1280 getallen – dat is bijna al het rekenwerk;
+- een klein Dense-hoofd (sequential_3) dat uit die embedding de klasse kiest.
+Voor nieuwe klassen moet enkel het hoofd opnieuw getraind worden. Deze tool:
+- berekent de embedding van elke foto één keer en bewaart ze in een cache
+  (tm_imagecache, sleutel = sha256 van het bestand); een foto toevoegen of
+  verwijderen kost dus één forward pass of niets;
+- traint het hoofd in NumPy zoals Teachable Machine (Dense 100 relu → Dense
+  softmax, Adam lr 0.001, batch 16, 50 epochs, 15% validatie);
+- schrijft model.json + weights.bin + metadata.json: de MobileNet-bytes blijven
+  ongewijzigd, enkel het hoofd en de labels zijn nieuw (een gekwantiseerd hoofd
+  wordt opnieuw op dezelfde manier gekwantiseerd).
+De klassen zijn de submappen van de dataset (zoals 2 - Dataset in Teachable
+Machine), alfabetisch of in de volgorde van --klassen. Die volgorde bepaalt
+ook de codes '1', '2', ... die sketch.js naar de micro:bit stuurt.
+
+Gebruik:
+    python tm_retrain.py "../2 - Dataset/Mijn klassen" --out "../4 - HTML-bestanden/image_model-nieuw"
+    python tm_retrain.py mijn_fotos --klassen BLIK,KARTON,REST --epochs 80 --out /tmp/model
+
+Vereist: numpy en Pillow (enkel voor foto's die nog niet in de cache zitten).
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import hashlib
+import argparse
+import itertools
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import tm_engine
+import tm_quantize
+from tm_engine import DEFAULT_MODEL_DIR
+from tm_imagecache import DEFAULT_CACHE_DIR, ImageCache
+
+# NL: standaardwaarden van de Teachable Machine-trainer
+EPOCHS = 50
+BATCH_SIZE = 16
+LEARNING_RATE = 0.001
+VALIDATION = 0.15
+EMBED_BATCH = 16
+ADAM_BETAS = (0.9, 0.999)
+ADAM_EPS = 1e-7   # NL: zoals tf.train.adam
+
+# ======== NL: model.json opsplitsen in MobileNet + hoofd ========
+
+def split_topology(data: dict) -> Tuple[dict, List[dict]]:
+    """NL: (Sequential zonder hoofd, Dense-configs van het hoofd) uit model.json-data."""
+    topology = data["modelTopology"]
+    if "model_config" in topology:
+        topology = topology["model_config"]
+    layers = topology["config"]["layers"] if topology["class_name"] == "Sequential" else []
+    if len(layers) < 2:
+        raise ValueError("Verwacht een Sequential van MobileNet + Dense-hoofd (Teachable Machine-export).")
+    head = layers[-1]
+    dense = head["config"]["layers"] if head["class_name"] == "Sequential" else [head]
+    if not dense or any(layer["class_name"] != "Dense" for layer in dense):
+        raise ValueError("Het hoofd van dit model bestaat niet enkel uit Dense-lagen.")
+    if dense[-1]["config"].get("activation") != "softmax":
+        raise ValueError("De laatste Dense-laag heeft geen softmax.")
+    backbone = {"class_name": "Sequential", "config": dict(topology["config"], layers=layers[:-1])}
+    return backbone, [layer["config"] for layer in dense]
+
+def raw_tensors(manifest: List[dict], buffer: bytes) -> Dict[str, Tuple[dict, bytes]]:
+    """NL: {naam: (spec, ruwe bytes)} in manifest-volgorde, zonder te dekwantiseren."""
+    tensors, offset = {}, 0
+    for group in manifest:
+        for spec in group.get("weights", []):
+            quant = spec.get("quantization")
+            dtype = tm_engine.QUANT_DTYPES.get(quant.get("dtype")) if quant else tm_engine.DTYPES.get(spec["dtype"])
+            if dtype is None:
+                raise ValueError(f"Onbekend dtype in weightsManifest: {spec['dtype']} ({spec['name']})")
+            nbytes = int(np.prod(spec["shape"])) * np.dtype(dtype).itemsize
+            tensors[spec["name"]] = (spec, buffer[offset:offset + nbytes])
+            offset += nbytes
+    return tensors
+
+def head_names(dense: List[dict]) -> List[str]:
+    names = []
+    for cfg in dense:
+        names.append(f"{cfg['name']}/kernel")
+        if cfg.get("use_bias", True):
+            names.append(f"{cfg['name']}/bias")
+    return names
+
+def load_backbone(model_dir: str) -> Tuple[tm_engine.TMModel, str, dict, bytes, dict]:
+    """NL: (MobileNet-model zonder hoofd, id van de MobileNet-weights, data, buffer, meta)."""
+    data, buffer, meta = tm_engine.read_export(model_dir)
+    backbone, dense = split_topology(data)
+    skip = set(head_names(dense))
+    # NL: de id verandert enkel als de MobileNet zelf verandert, niet bij een nieuw hoofd
+    h = hashlib.sha1(json.dumps(backbone, sort_keys=True).encode("utf-8"))
+    for name, (_, raw) in raw_tensors(data["weightsManifest"], buffer).items():
+        if name not in skip:
+            h.update(name.encode("utf-8"))
+            h.update(raw)
+    weights = {name: arr for name, arr in tm_engine.decode_weights(data["weightsManifest"], buffer).items()
+               if name not in skip}
+    nodes: List[tm_engine.Node] = []
+    output = tm_engine.flatten_topology(backbone, [], nodes)
+    model = tm_engine.TMModel(nodes, weights, [], int(meta.get("imageSize", 224)), output)
+    return model, h.hexdigest()[:16], data, buffer, meta
+
+# ======== NL: embedding-cache ========
+
+class EmbeddingCache(ImageCache):
+    """
+    NL: Zoals ImageCache, maar per foto de MobileNet-embedding (float32) in plaats van pixels.
+    Eén bestandspaar per MobileNet (backbone_id): een ander basismodel start een nieuwe cache.
+    """
+
+    def __init__(self, backbone: tm_engine.TMModel, backbone_id: str, dim: int,
+                 cache_dir: str = DEFAULT_CACHE_DIR):
+        self.backbone = backbone
+        self.backbone_id = backbone_id
+        self.dim = dim
+        super().__init__(cache_dir, backbone.image_size, "float32")
+
+    def _record_shape(self) -> Tuple[int, ...]:
+        return (self.dim,)
+
+    def _names(self) -> Tuple[str, str]:
+        return f"embeddings-{self.backbone_id}.bin", f"index-embeddings-{self.backbone_id}.json"
+
+    def _compute(self, paths: Sequence[str], jobs: Optional[int]) -> Iterator[np.ndarray]:
+        images = super()._compute(paths, jobs)   # NL: float32-beelden in [-1, 1]
+        while True:
+            chunk = list(itertools.islice(images, EMBED_BATCH))
+            if not chunk:
+                return
+            yield from self.backbone.forward(np.stack(chunk))
+
+# ======== NL: dataset ========
+
+def find_classes(root: str, names: Optional[Sequence[str]] = None) -> List[Tuple[str, List[str]]]:
+    """NL: [(label, foto's)] per submap van root; names kiest en ordent de submappen."""
+    folders = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)) and not d.startswith("."))
+    if names:
+        lookup = {d.lower(): d for d in folders}
+        missing = [n for n in names if n.lower() not in lookup]
+        if missing:
+            raise ValueError(f"Geen map voor klasse(n): {', '.join(missing)} (gevonden: {', '.join(folders)})")
+        folders = [lookup[n.lower()] for n in names]
+    classes = [(d, tm_engine.walk_images(os.path.join(root, d))) for d in folders]
+    empty = [label for label, paths in classes if not paths]
+    if empty:
+        raise ValueError(f"Geen foto's in: {', '.join(empty)}")
+    if len(classes) < 2:
+        raise ValueError("Minstens twee klassen (submappen met foto's) nodig.")
+    return classes
+
+def split_validation(y: np.ndarray, fraction: float, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """NL: Per klasse een deel apart voor validatie (minstens één trainingsfoto per klasse)."""
+    train, val = [], []
+    for k in np.unique(y):
+        idx = rng.permutation(np.flatnonzero(y == k))
+        n_val = min(int(round(len(idx) * fraction)), len(idx) - 1)
+        val.extend(idx[:n_val])
+        train.extend(idx[n_val:])
+    return np.array(train, dtype=np.int64), np.array(val, dtype=np.int64)
+
+# ======== NL: hoofd trainen (NumPy) ========
+
+def init_kernel(cfg: dict, fan_in: int, fan_out: int, rng: np.random.Generator) -> np.ndarray:
+    """NL: kernel_initializer uit model.json (Teachable Machine: VarianceScaling fan_in, normaal)."""
+    init = cfg.get("kernel_initializer") or {}
+    icfg = init.get("config", {}) if init.get("class_name") == "VarianceScaling" else {}
+    fan = {"fan_in": fan_in, "fan_out": fan_out, "fan_avg": (fan_in + fan_out) / 2}[icfg.get("mode", "fan_in")]
+    var = float(icfg.get("scale", 1.0)) / max(fan, 1)
+    if icfg.get("distribution", "normal") == "uniform":
+        limit = np.sqrt(3 * var)
+        return rng.uniform(-limit, limit, (fan_in, fan_out)).astype(np.float32)
+    # NL: afgeknotte normaalverdeling (±2σ), herschaald zoals Keras
+    std = np.sqrt(var) / 0.87962566103423978
+    w = rng.standard_normal((fan_in, fan_out))
+    bad = np.abs(w) > 2
+    while bad.any():
+        w[bad] = rng.standard_normal(int(bad.sum()))
+        bad = np.abs(w) > 2
+    return (w * std).astype(np.float32)
+
+def head_forward(dense: List[dict], params: Dict[str, np.ndarray], x: np.ndarray) -> List[np.ndarray]:
+    """NL: Activaties na elke laag (de laatste = softmax-kansen)."""
+    outs = []
+    for cfg in dense:
+        y = x @ params[f"{cfg['name']}/kernel"]
+        if cfg.get("use_bias", True):
+            y = y + params[f"{cfg['name']}/bias"]
+        x = tm_engine.apply_activation(y, cfg.get("activation"))
+        outs.append(x)
+    return outs
+
+def accuracy(dense: List[dict], params: Dict[str, np.ndarray], x: np.ndarray, y: np.ndarray) -> float:
+    return float((head_forward(dense, params, x)[-1].argmax(axis=1) == y).mean()) if len(y) else float("nan")
+
+def train_head(dense: List[dict], x: np.ndarray, y: np.ndarray, n_classes: int, epochs: int = EPOCHS,
+               batch_size: int = BATCH_SIZE, lr: float = LEARNING_RATE, validation: float = VALIDATION,
+               seed: int = 0, progress=None) -> Tuple[List[dict], Dict[str, np.ndarray], dict]:
+    """
+    NL: Train een nieuw hoofd (zelfde lagen, laatste laag met n_classes uitgangen).
+    Categorical cross-entropy + Adam; geeft (Dense-configs, weights, statistiek) terug.
+    """
+    for cfg in dense[:-1]:
+        if cfg.get("activation") not in ("relu", "linear", None):
+            raise ValueError(f"Activatie niet ondersteund in het hoofd: {cfg.get('activation')} ({cfg['name']})")
+    dense = [dict(cfg) for cfg in dense]
+    dense[-1]["units"] = n_classes
+    rng = np.random.default_rng(seed)
+    params, fan_in = {}, x.shape[1]
+    for cfg in dense:
+        params[f"{cfg['name']}/kernel"] = init_kernel(cfg, fan_in, cfg["units"], rng)
+        if cfg.get("use_bias", True):
+            params[f"{cfg['name']}/bias"] = np.zeros(cfg["units"], dtype=np.float32)
+        fan_in = cfg["units"]
+
+    train, val = split_validation(y, validation, rng)
+    m = {k: np.zeros_like(v) for k, v in params.items()}
+    v = {k: np.zeros_like(p) for k, p in params.items()}
+    (b1, b2), step = ADAM_BETAS, 0
+    onehot = np.eye(n_classes, dtype=np.float32)
+    for epoch in range(epochs):
+        order = rng.permutation(train)
+        for i in range(0, len(order), batch_size):
+            idx = order[i:i + batch_size]
+            xb = x[idx]
+            outs = head_forward(dense, params, xb)
+            delta = (outs[-1] - onehot[y[idx]]) / len(idx)   # NL: softmax + cross-entropy
+            grads = {}
+            for j in range(len(dense) - 1, -1, -1):
+                name = dense[j]["name"]
+                inp = outs[j - 1] if j else xb
+                grads[f"{name}/kernel"] = inp.T @ delta
+                if dense[j].get("use_bias", True):
+                    grads[f"{name}/bias"] = delta.sum(axis=0)
+                if j:
+                    delta = delta @ params[f"{name}/kernel"].T
+                    if dense[j - 1].get("activation") == "relu":
+                        delta = delta * (outs[j - 1] > 0)
+            step += 1
+            corr = lr * np.sqrt(1 - b2 ** step) / (1 - b1 ** step)
+            for k, g in grads.items():
+                m[k] = b1 * m[k] + (1 - b1) * g
+                v[k] = b2 * v[k] + (1 - b2) * g * g
+                params[k] = (params[k] - corr * m[k] / (np.sqrt(v[k]) + ADAM_EPS)).astype(np.float32)
+        if progress and (epoch + 1) % 10 == 0:
+            progress(f"   epoch {epoch + 1}/{epochs}: train {accuracy(dense, params, x[train], y[train]):.1%}"
+                     + (f" · validatie {accuracy(dense, params, x[val], y[val]):.1%}" if len(val) else ""))
+    stats = {"train": len(train), "val": len(val),
+             "train_acc": accuracy(dense, params, x[train], y[train]),
+             "val_acc": accuracy(dense, params, x[val], y[val])}
+    return dense, params, stats
+
+# ======== NL: export ========
+
+def export_model(out_dir: str, data: dict, buffer: bytes, meta: dict, dense: List[dict],
+                 params: Dict[str, np.ndarray], labels: List[str], model_name: Optional[str] = None):
+    """NL: MobileNet-bytes ongewijzigd overnemen, hoofd vervangen, labels in metadata.json."""
+    new_data = copy.deepcopy(data)
+    _, old_dense = split_topology(new_data)   # NL: verwijst naar de configs in new_data
+    for cfg, new in zip(old_dense, dense):
+        cfg["units"] = new["units"]
+    specs, parts = [], []
+    for name, (spec, raw) in raw_tensors(data["weightsManifest"], buffer).items():
+        if name in params:
+            arr = np.ascontiguousarray(params[name], dtype=np.float32)
+            quant = spec.get("quantization")
+            spec = {"name": name, "shape": list(arr.shape), "dtype": "float32"}
+            if quant:   # NL: gekwantiseerd basismodel → nieuw hoofd op dezelfde manier
+                raw, quant = tm_quantize.quantize_tensor(arr, quant["dtype"])
+                if quant:
+                    spec["quantization"] = quant
+            else:
+                raw = arr.tobytes()
+        specs.append(spec)
+        parts.append(raw)
+    new_data["weightsManifest"] = [{"paths": ["weights.bin"], "weights": specs}]
+    new_meta = dict(meta, labels=list(labels),
+                    timeStamp=datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"))
+    if model_name:
+        new_meta["modelName"] = model_name
+    tm_engine.write_export(out_dir, new_data, b"".join(parts), new_meta)
+
+# ======== NL: CLI ========
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Hertrain het Dense-hoofd van een Teachable Machine-model voor eigen klassen.")
+    ap.add_argument("dataset", help="map met één submap per klasse")
+    ap.add_argument("--out", required=True, help="doelmap voor model.json + weights.bin + metadata.json")
+    ap.add_argument("--model", default=DEFAULT_MODEL_DIR, help="basismodel (image_model/-map)")
+    ap.add_argument("--klassen", default="", help="komma-gescheiden submappen, in deze volgorde (standaard: alle, alfabetisch)")
+    ap.add_argument("--naam", default=None, help="modelName in metadata.json")
+    ap.add_argument("--epochs", type=int, default=EPOCHS, help="aantal epochs")
+    ap.add_argument("--batch", type=int, default=BATCH_SIZE, help="batchgrootte tijdens het trainen")
+    ap.add_argument("--lr", type=float, default=LEARNING_RATE, help="learning rate (Adam)")
+    ap.add_argument("--validatie", type=float, default=VALIDATION, help="deel per klasse voor validatie")
+    ap.add_argument("--seed", type=int, default=0, help="seed voor initialisatie en schudden")
+    ap.add_argument("--cache", default=DEFAULT_CACHE_DIR, help="map voor de embedding-cache")
+    ap.add_argument("--jobs", type=int, default=None, help="parallelle decoders")
+    ap.add_argument("--opruimen", action="store_true", help="embeddings van verdwenen foto's uit de cache verwijderen")
+    args = ap.parse_args(argv)
+
+    if not os.path.isdir(args.dataset):
+        print(f"❌ Map niet gevonden: {args.dataset}")
+        sys.exit(1)
+    try:
+        classes = find_classes(args.dataset, [n.strip() for n in args.klassen.split(",") if n.strip()])
+        backbone, backbone_id, data, buffer, meta = load_backbone(args.model)
+        _, dense = split_topology(data)
+        dim = raw_tensors(data["weightsManifest"], buffer)[f"{dense[0]['name']}/kernel"][0]["shape"][0]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Voorbereiden mislukt: {e}")
+        sys.exit(1)
+    labels = [label for label, _ in classes]
+    paths = [p for _, ps in classes for p in ps]
+    y = np.array([k for k, (_, ps) in enumerate(classes) for _ in ps], dtype=np.int64)
+    print(f"📂 {len(paths)} foto's in {len(labels)} klassen: "
+          + ", ".join(f"{label} ({len(ps)})" for label, ps in classes))
+
+    t0 = time.perf_counter()
+    try:
+        cache = EmbeddingCache(backbone, backbone_id, dim, args.cache)
+        stats = cache.update(paths, args.jobs)
+        x = np.array(cache.raw(paths), dtype=np.float32)
+    except (OSError, ValueError) as e:
+        print(f"❌ Embeddings berekenen mislukt: {e}")
+        sys.exit(1)
+    print(f"🧠 Embeddings: {stats['decoded']} berekend, {stats['reused']} uit de cache "
+          f"in {time.perf_counter() - t0:.1f} s")
+    if args.opruimen:
+        print(f"🧹 {cache.compact()} ongebruikte embeddings verwijderd")
+
+    t0 = time.perf_counter()
+    new_dense, params, result = train_head(dense, x, y, len(labels), args.epochs, max(1, args.batch),
+                                           args.lr, args.validatie, args.seed, progress=print)
+    val = f" · validatie {result['val_acc']:.1%} ({result['val']} foto's)" if result["val"] else ""
+    print(f"🏋️ Hoofd getraind in {time.perf_counter() - t0:.1f} s: "
+          f"train {result['train_acc']:.1%} ({result['train']} foto's){val}")
+
+    try:
+        export_model(args.out, data, buffer, meta, new_dense, params, labels, args.naam)
+    except OSError as e:
+        print(f"❌ Schrijven mislukt: {e}")
+        sys.exit(1)
+    print(f"💾 {args.out}: labels {', '.join(labels)}")
+
+if __name__ == "__main__":
+    main()